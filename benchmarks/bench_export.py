@@ -0,0 +1,115 @@
+# benchmarks/bench_export.py
+# Peak memory and throughput of the streaming answer export (GET
+# /export/answers) for exports of growing size, next to the same rows loaded
+# with .all() and encoded in one piece. Every export runs in a fresh process
+# so its peak RSS is its own.
+#
+#   python benchmarks/bench_export.py [--rows 1000,100000,1000000] [--formats csv,ndjson,parquet]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ANSWERS_PER_INTERVIEW = 4
+
+
+def seed(rows):
+    """One skill per export size ("bench<rows>"), so a skill filter selects exactly `rows` answers."""
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func, insert, select, text
+    from flask_service.prestart import prestart
+    from common.db import engine
+    from flask_service.models import Candidate, Interview, InterviewAnswer, InterviewResult
+
+    prestart()
+    skill = f"bench{rows}"
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(Interview).where(Interview.skill == skill)).scalar():
+            return
+        conn.execute(insert(Candidate), [{"name": "bench", "email": "bench@example.com"}])
+        candidate_id = conn.execute(select(func.max(Candidate.id))).scalar()
+        first_id = (conn.execute(select(func.max(Interview.id))).scalar() or 0) + 1
+        interviews = -(-rows // ANSWERS_PER_INTERVIEW)
+        start = datetime(2024, 1, 1)
+        for offset in range(0, interviews, 10000):
+            ids = range(first_id + offset, first_id + min(offset + 10000, interviews))
+            conn.execute(insert(Interview), [
+                {"id": i, "candidate_id": candidate_id, "skill": skill, "status": "done",
+                 "started_at": start + timedelta(minutes=i), "completed_at": start + timedelta(minutes=i, seconds=30)}
+                for i in ids])
+            conn.execute(insert(InterviewAnswer), [
+                {"interview_id": i, "question_id": q, "answer_text": f"answer {i}/{q}: list comprehension, generators " * 2,
+                 "scored": True, "score": 70.0 + q, "evaluator_notes": "3/3 keywords matched"}
+                for i in ids for q in range(1, ANSWERS_PER_INTERVIEW + 1)])
+            conn.execute(insert(InterviewResult), [
+                {"interview_id": i, "total_score": 72.5, "verdict": "pass",
+                 "created_at": start + timedelta(minutes=i, seconds=40)} for i in ids])
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+
+
+def child(rows, fmt, mode):
+    """Run one export in this process and print its numbers as JSON."""
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "fastapi_service"))
+    import export
+    from common.db import session_scope
+
+    flt = export.ExportFilter(skill=f"bench{rows}")
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    size = 0
+    if mode == "stream":
+        for chunk in export.stream_export("answers", fmt, flt):
+            size += len(chunk)
+    else:
+        # everything fetched first, then encoded as a single batch
+        with session_scope() as db:
+            everything = db.execute(export._export_query("answers", flt)).all()
+        names = [name for name, _, _ in export.COLUMNS["answers"]]
+        encode = {"csv": lambda b: export._csv(names, b), "ndjson": lambda b: export._ndjson(names, b),
+                  "parquet": lambda b: export._parquet(export.COLUMNS["answers"], b)}[fmt]
+        size = sum(len(chunk) for chunk in encode(iter([everything])))
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "bytes": size, "rss_mib": (peak - baseline) / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="1000,100000,1000000", help="comma-separated answer counts")
+    parser.add_argument("--formats", default="csv,ndjson,parquet")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    if args.child:
+        child(int(args.child[0]), args.child[1], args.child[2])
+        return
+
+    sizes = [int(r) for r in args.rows.split(",")]
+    for rows in sizes:
+        seed(rows)
+    print("answers export; peak RSS growth over the process baseline")
+    print(f"{'rows':>9} {'format':>8} {'mode':>9} {'seconds':>8} {'rows/s':>9} {'MiB out':>8} {'peak MiB':>9}")
+    for rows in sizes:
+        for fmt in args.formats.split(","):
+            for mode in ("stream", "buffered"):
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", str(rows), fmt, mode],
+                                     env=os.environ, check=True, capture_output=True, text=True).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{rows:>9} {fmt:>8} {mode:>9} {r['seconds']:>8.2f} {rows / r['seconds']:>9.0f} "
+                      f"{r['bytes'] / 2**20:>8.1f} {r['rss_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_group_commit.py
+# Throughput and latency of POST /answers/create under concurrent load, with
+# a commit per request versus group commit (ANSWER_GROUP_COMMIT=1) at a few
+# batch delays. Each mode runs the Flask service under gunicorn as in
+# production; on Postgres the number of commits is read from pg_stat_database.
+#
+#   python benchmarks/bench_group_commit.py [--concurrency 64] [--requests 4000] [--delays 2,5,10]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def commits(env):
+    """Committed transactions in the database so far (Postgres only)."""
+    if not env["DATABASE_URL"].startswith("postgresql"):
+        return None
+    from sqlalchemy import create_engine, text
+    engine = create_engine(env["DATABASE_URL"])
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()")).scalar()
+    engine.dispose()
+    return count
+
+
+def start_server(env):
+    port = free_port()
+    env = dict(env, FLASK_PORT=str(port))
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "flask_service/gunicorn.conf.py",
+                             "flask_service.wsgi:app"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{base}/metrics/pool", timeout=1).raise_for_status()
+            return proc, base
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+def run(base, interview_id, concurrency, requests):
+    latencies, errors = [], []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        with httpx.Client(base_url=base, timeout=30) as http:
+            while True:
+                with lock:
+                    n = next(counter, None)
+                if n is None:
+                    return
+                start = time.perf_counter()
+                r = http.post("/answers/create", json={"interview_id": interview_id, "question_id": 1,
+                                                      "answer_text": f"list comprehension for x in range({n})"})
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    (latencies if r.status_code == 200 else errors).append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--delays", default="2,5,10", help="comma-separated ANSWER_BATCH_DELAY_MS values")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    args = parser.parse_args()
+
+    env = dict(os.environ, EXTRACT_PROCESSES="0", PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(),
+               FLASK_WEB_WORKERS=str(args.workers),
+               FLASK_WEB_THREADS=str(max(1, args.concurrency // args.workers)),
+               # the evaluator is not running; fail fast if anything calls it
+               FASTAPI_URL="http://127.0.0.1:9")
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    subprocess.run([sys.executable, "-m", "flask_service.prestart"], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+
+    modes = [("commit per request", {"ANSWER_GROUP_COMMIT": "0"})] + [
+        (f"group, {d} ms", {"ANSWER_GROUP_COMMIT": "1", "ANSWER_BATCH_DELAY_MS": d}) for d in args.delays.split(",")]
+    interview_id = None
+    print(f"{args.requests} answers from {args.concurrency} clients, {args.workers} gunicorn workers")
+    print(f"{'mode':>20} {'answers/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'commits':>8}")
+    for name, overrides in modes:
+        proc, base = start_server(dict(env, **overrides))
+        try:
+            if interview_id is None:
+                candidate = httpx.post(f"{base}/candidates/create", json={"name": "bench", "email": "b@example.com"})
+                interview_id = httpx.post(f"{base}/interviews/create", json={
+                    "candidate_id": candidate.json()["id"], "skill": "python"}).json()["id"]
+            # warm up connections and the writer thread
+            run(base, interview_id, args.concurrency, args.concurrency * 2)
+            before = commits(env)
+            seconds, latencies, errors = run(base, interview_id, args.concurrency, args.requests)
+            after = commits(env)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{name:>20} {len(latencies) / seconds:>10.0f} {statistics.median(latencies):>8.1f} "
+              f"{percentile(latencies, 99):>8.1f} {len(errors):>7} "
+              f"{'' if before is None else after - before:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_keyset_pagination.py
+# Latency of fetching page N of GET /interviews?status=... with the keyset
+# cursor, next to the same page fetched with LIMIT/OFFSET.
+#
+#   python benchmarks/bench_keyset_pagination.py [--interviews 1000000] [--limit 50]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func, insert, select, text
+    from flask_service.app import app
+    from flask_service.prestart import prestart
+    from common.db import engine
+    from flask_service.models import Candidate, Interview
+
+    prestart()
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(Interview)).scalar() < args.interviews:
+            conn.execute(insert(Candidate), [{"name": "bench", "email": "bench@example.com"}])
+            candidate_id = conn.execute(select(func.max(Candidate.id))).scalar()
+            start = datetime(2024, 1, 1)
+            statuses = ("done", "done", "done", "completed", "in_progress")
+            for offset in range(0, args.interviews, 50000):
+                conn.execute(insert(Interview), [
+                    {"candidate_id": candidate_id, "skill": ("python", "ml", "sql")[i % 3],
+                     "status": statuses[i % len(statuses)], "started_at": start + timedelta(minutes=i)}
+                    for i in range(offset, min(offset + 50000, args.interviews))])
+        if conn.dialect.name == "postgresql":
+            # planner statistics for the freshly loaded table
+            conn.execute(text("ANALYZE interviews"))
+
+    client = app.test_client()
+    limit = args.limit
+    base = select(Interview.id).where(Interview.status == "done").order_by(Interview.id.desc())
+    print(f"{args.interviews} interviews, status=done, {limit} per page (median milliseconds)")
+    print(f"{'page':>7} {'offset SQL':>11} {'keyset SQL':>11} {'GET /interviews':>16}")
+    with engine.connect() as conn:
+        for page in (1, 100, 1000, 10000):
+            skip = (page - 1) * limit
+            if page > 1:
+                cursor = conn.execute(base.offset(skip - 1).limit(1)).scalar()
+                if cursor is None:
+                    break
+            else:
+                cursor = None
+
+            def by_offset():
+                conn.execute(base.offset(skip).limit(limit)).all()
+
+            def by_keyset():
+                stmt = base if cursor is None else base.where(Interview.id < cursor)
+                conn.execute(stmt.limit(limit)).all()
+
+            url = f"/interviews?status=done&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+            assert client.get(url).status_code == 200
+            print(f"{page:>7} {timed(by_offset, args.repeat):>11.2f} {timed(by_keyset, args.repeat):>11.2f} "
+                  f"{timed(lambda: client.get(url), args.repeat):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_keyword_matcher.py
+# Compares the compiled KeywordMatcher against the original per-keyword
+# substring scan and against a per-keyword word-bounded regex (the naive way
+# to get the same whole-word semantics). Lists of up to SCAN_MAX_KEYWORDS
+# keywords take the matcher's str.find path, longer ones the tokenizing path.
+#
+#   python benchmarks/bench_keyword_matcher.py [--chars 12000] [--repeat 200]
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fastapi_service"))
+from scoring import compile_keywords  # noqa: E402
+
+
+def per_call(fn, number):
+    # best of a few rounds: the cells are microseconds, so noise adds up
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def legacy_count(answer_text, expected_keywords):
+    # the pre-compiled-matcher implementation of score_answer_text's keyword step
+    expected = [k.strip().lower() for k in expected_keywords.split(",") if k.strip()]
+    ans_lower = answer_text.lower()
+    return sum(1 for k in expected if k and k in ans_lower)
+
+
+def regex_count(answer_text, expected_keywords):
+    expected = [k.strip().lower() for k in expected_keywords.split(",") if k.strip()]
+    ans_lower = answer_text.lower()
+    return sum(1 for k in expected if re.search(r"(?<!\w)" + re.escape(k) + r"(?:e?s)?(?!\w)", ans_lower))
+
+
+def make_case(rng, vocab, n_keywords, chars):
+    keywords = rng.sample(vocab, n_keywords) + ["list comprehension", "inner join"]
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(vocab))
+    return ",".join(keywords), " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, default=12000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocab = [f"term{i}" for i in range(5000)] + ["for", "in", "join", "list", "inner", "decorator"]
+    print(f"answer length ~{args.chars} chars, {args.repeat} runs per cell (microseconds per answer)")
+    print(f"{'keywords':>8} {'substring':>10} {'regex':>10} {'compiled':>10} {'vs substring':>13} {'vs regex':>9}")
+    for n in (1, 3, 5, 8, 25, 100, 400):
+        keywords, answer = make_case(rng, vocab, n, args.chars)
+        matcher = compile_keywords(None, keywords)
+        matcher.count(answer)
+        t_sub = per_call(lambda: legacy_count(answer, keywords), args.repeat)
+        t_re = per_call(lambda: regex_count(answer, keywords), max(1, args.repeat // 10))
+        t_new = per_call(lambda: compile_keywords(None, keywords).count(answer), args.repeat)
+        print(f"{n + 2:>8} {t_sub * 1e6:>10.1f} {t_re * 1e6:>10.1f} {t_new * 1e6:>10.1f} "
+              f"{t_sub / t_new:>12.1f}x {t_re / t_new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
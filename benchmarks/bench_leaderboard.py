@@ -0,0 +1,127 @@
+# benchmarks/bench_leaderboard.py
+# Latency of the leaderboard reads (top-K, rank of a candidate, skill stats)
+# at a million results, next to the same answers computed from
+# interview_results, plus the cost the leaderboard adds to a result write.
+#
+#   python benchmarks/bench_leaderboard.py [--results 1000000] [--skills 3]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=1000000)
+    parser.add_argument("--skills", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("EVAL_WORKERS", "0")
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "fastapi_service"))
+    from sqlalchemy import func, insert, select, text
+    from flask_service.models import create_tables, Candidate
+    from common.db import engine, session_scope
+    from models import Interview, InterviewResult
+    from results import upsert_results, verdict_for
+    import leaderboard
+
+    create_tables()
+    skills = [f"skill{i}" for i in range(args.skills)]
+    rng = random.Random(7)
+    batch = 2000
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(InterviewResult)).scalar()
+    if existing < args.results:
+        with engine.begin() as conn:
+            conn.execute(insert(Candidate), [{"name": f"c{i}", "email": "bench@example.com"}
+                                             for i in range(args.results // 10 + 1)])
+            first_candidate = conn.execute(select(func.min(Candidate.id))).scalar()
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        for offset in range(existing, args.results, batch):
+            n = min(batch, args.results - offset)
+            with session_scope() as db:
+                db.execute(insert(Interview), [
+                    {"candidate_id": first_candidate + (offset + i) // 10, "skill": skills[(offset + i) % len(skills)],
+                     "status": "done"} for i in range(n)])
+                top_id = db.execute(select(func.max(Interview.id))).scalar()
+                rows = []
+                for interview_id in range(top_id - n + 1, top_id + 1):
+                    score = round(min(100.0, max(0.0, rng.gauss(55, 18))), 2)
+                    rows.append({"interview_id": interview_id, "total_score": score, "verdict": verdict_for(score),
+                                 "created_at": now})
+                upsert_results(db, rows)
+                db.commit()
+        print(f"loaded {args.results - existing} results in batches of {batch} "
+              f"in {time.perf_counter() - start:.1f} s (results + leaderboard)")
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+
+    skill = skills[0]
+    with session_scope() as db:
+        probe = db.execute(select(Interview.id, Interview.candidate_id).where(Interview.skill == skill)
+                           .order_by(Interview.id).offset(args.results // (2 * len(skills))).limit(1)).one()
+        score = db.execute(select(InterviewResult.total_score)
+                           .where(InterviewResult.interview_id == probe.id)).scalar()
+        from_results = (select(InterviewResult.interview_id, InterviewResult.total_score)
+                        .join(Interview, Interview.id == InterviewResult.interview_id)
+                        .where(Interview.skill == skill))
+        cases = [
+            ("top 10", lambda: leaderboard.top(db, skill, 10),
+             lambda: db.execute(from_results.order_by(InterviewResult.total_score.desc()).limit(10)).all()),
+            ("top 100", lambda: leaderboard.top(db, skill, 100),
+             lambda: db.execute(from_results.order_by(InterviewResult.total_score.desc()).limit(100)).all()),
+            ("rank of candidate", lambda: leaderboard.rank_of(db, skill, candidate_id=probe.candidate_id),
+             lambda: db.execute(select(func.count()).select_from(from_results.where(
+                 InterviewResult.total_score > score).subquery())).scalar()),
+            ("skill stats", lambda: leaderboard.skill_stats(db, skill),
+             lambda: db.execute(select(func.count(), func.avg(InterviewResult.total_score))
+                                .join(Interview, Interview.id == InterviewResult.interview_id)
+                                .where(Interview.skill == skill)).one()),
+        ]
+        print(f"{args.results} results over {len(skills)} skills (median milliseconds)")
+        print(f"{'query':>18} {'leaderboard':>12} {'from results':>13}")
+        for name, fast, slow in cases:
+            print(f"{name:>18} {timed(fast, args.repeat):>12.2f} {timed(slow, max(3, args.repeat // 5)):>13.2f}")
+
+        def write(with_leaderboard):
+            s = round(rng.uniform(0, 100), 2)
+            row = {"interview_id": probe.id, "total_score": s, "verdict": verdict_for(s),
+                   "created_at": datetime.utcnow()}
+            if with_leaderboard:
+                upsert_results(db, [row])
+            else:
+                from results import upsert_statement
+                db.execute(upsert_statement(db.get_bind().dialect.name, [row]))
+            db.commit()
+
+        print(f"one result write: {timed(lambda: write(False), args.repeat):.2f} ms without the leaderboard, "
+              f"{timed(lambda: write(True), args.repeat):.2f} ms with it")
+        # leave the probe consistent with its leaderboard entry
+        write(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_question_bank.py
+# Latency of GET /interviews/<id>/questions with a cold question index (reloaded
+# on every request, i.e. the old "query the bank each time" cost) versus the
+# warm in-memory index.
+#
+#   python benchmarks/bench_question_bank.py [--requests 2000] [--questions 200]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=200, help="questions per skill")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, ROOT)
+    from flask_service.app import app
+    from flask_service.prestart import prestart
+    from common.db import session_scope
+    from common.question_bank import question_bank
+    from flask_service.models import Candidate, Interview, InterviewQuestion
+
+    prestart()
+    with session_scope() as db:
+        for skill in ("python", "ml", "sql", "go"):
+            db.add_all(InterviewQuestion(skill=skill, text=f"{skill} question {i}", expected_keywords="a,b,c")
+                       for i in range(args.questions))
+        cand = Candidate(name="bench", email="bench@example.com")
+        db.add(cand)
+        db.flush()
+        iv = Interview(candidate_id=cand.id, skill="python")
+        db.add(iv)
+        db.commit()
+        interview_id = iv.id
+    question_bank.invalidate()
+
+    client = app.test_client()
+    url = f"/interviews/{interview_id}/questions"
+    results = {}
+    for mode in ("cold", "warm"):
+        samples = []
+        for _ in range(args.requests):
+            if mode == "cold":
+                question_bank.invalidate()
+            start = time.perf_counter()
+            resp = client.get(url)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert resp.status_code == 200
+        results[mode] = samples
+
+    print(f"{args.requests} requests, {args.questions} questions per skill (milliseconds)")
+    print(f"{'mode':>6} {'p50':>8} {'p99':>8} {'mean':>8}")
+    for mode, samples in results.items():
+        print(f"{mode:>6} {percentile(samples, 50):>8.3f} {percentile(samples, 99):>8.3f} {statistics.mean(samples):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
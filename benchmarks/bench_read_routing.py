@@ -0,0 +1,165 @@
+# benchmarks/bench_read_routing.py
+# Read/write routing with a read replica. Seeds interviews on the primary,
+# brings the replica up to date, then:
+#   - reads every interview's questions, dashboard and result, the results
+#     listing and the leaderboard, and counts the statements each database ran;
+#   - submits an answer and re-scores each interview, then reads the dashboard
+#     and result straight back, with the read-your-writes window on and with
+#     it set to 0, and counts the reads that missed the write.
+#
+#   python benchmarks/bench_read_routing.py [--interviews 200] [--window 1.0]
+#
+# Runs against DATABASE_URL and REPLICA_DATABASE_URL, or two throwaway SQLite
+# files when they are unset. With SQLite files the replica is a copy of the
+# primary taken after seeding and never updated, i.e. a replica that lags
+# behind by the whole benchmark; with a real replica the stale reads are
+# whatever its lag produces.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def sqlite_path(url):
+    return url[len("sqlite:///"):] if url.startswith("sqlite:///") else None
+
+
+def replicate(primary_url, replica_url, engine):
+    """Bring the replica up to date: a copy for SQLite files, else wait for replication."""
+    import sqlite3
+    from sqlalchemy import create_engine, func, select
+    from flask_service.models import Interview
+    if sqlite_path(primary_url) and sqlite_path(replica_url):
+        with sqlite3.connect(sqlite_path(primary_url)) as src, sqlite3.connect(sqlite_path(replica_url)) as dst:
+            src.backup(dst)
+        return
+    replica = create_engine(replica_url)
+    with engine.connect() as conn:
+        target = conn.execute(select(func.max(Interview.id))).scalar()
+    deadline = time.time() + 60
+    with replica.connect() as conn:
+        while conn.execute(select(func.max(Interview.id))).scalar() != target:
+            if time.time() > deadline:
+                raise RuntimeError("replica did not catch up within 60 s")
+            time.sleep(0.2)
+            conn.rollback()
+    replica.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=200)
+    parser.add_argument("--window", type=float, default=1.0, help="READ_YOUR_WRITES_SECONDS")
+    args = parser.parse_args()
+
+    if bool(os.getenv("DATABASE_URL")) != bool(os.getenv("REPLICA_DATABASE_URL")):
+        parser.error("set both DATABASE_URL and REPLICA_DATABASE_URL, or neither")
+    if not os.getenv("DATABASE_URL"):
+        tmp = tempfile.mkdtemp()
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "primary.db")
+        os.environ["REPLICA_DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "replica.db")
+    os.environ.update(READ_YOUR_WRITES_SECONDS=str(args.window), EVAL_WORKERS="0", EXTRACT_PROCESSES="0")
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "fastapi_service"))
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from flask_service.prestart import prestart
+    from common.db import engine, replica_engine
+    from common.metrics import DB_READ_ROUTING
+    from common.read_routing import recent_writes
+    from flask_service.app import app as flask_app
+    from flask_service.routes import dashboard_cache
+    import models as evaluator_models
+    import results
+    import main as evaluator
+
+    prestart()
+    evaluator_models.create_tables()
+    statements = {"primary": 0, "replica": 0}
+
+    def counter(name):
+        def count(*_):
+            statements[name] += 1
+        return count
+
+    event.listen(engine, "before_cursor_execute", counter("primary"))
+    event.listen(replica_engine, "before_cursor_execute", counter("replica"))
+
+    flask = flask_app.test_client()
+    fastapi = TestClient(evaluator.app)
+    candidate = flask.post("/candidates/create", json={"name": "bench", "email": "bench@example.com"}).json
+    interview_ids = []
+    question_id = None
+    for n in range(args.interviews):
+        interview_id = flask.post("/interviews/create", json={"candidate_id": candidate["id"], "skill": "python"}).json["id"]
+        if question_id is None:
+            question_id = flask.get(f"/interviews/{interview_id}/questions").json["questions"][0]["id"]
+        flask.post("/answers/create", json={"interview_id": interview_id, "question_id": question_id,
+                                            "answer_text": f"list comprehension and generators {n}"})
+        fastapi.post(f"/evaluate/interview/{interview_id}")
+        interview_ids.append(interview_id)
+    replicate(os.environ["DATABASE_URL"], os.environ["REPLICA_DATABASE_URL"], engine)
+    # let the seeding writes age out of the read-your-writes window
+    time.sleep(args.window)
+
+    def routed():
+        # read sessions so far, both services: {(database, reason): count}
+        counts = {}
+        for sample in DB_READ_ROUTING.collect()[0].samples:
+            if sample.name.endswith("_total"):
+                key = (sample.labels["database"], sample.labels["reason"])
+                counts[key] = counts.get(key, 0) + sample.value
+        return counts
+
+    def delta(before, after):
+        keys = set(before) | set(after)
+        return {k: after.get(k, 0) - before.get(k, 0) for k in keys if after.get(k, 0) - before.get(k, 0)}
+
+    print(f"{args.interviews} interviews, read-your-writes window {args.window} s")
+    print(f"{'phase':>28} {'sessions to replica':>20} {'to primary':>11} {'stmts primary':>14} "
+          f"{'stmts replica':>14} {'stale reads':>12}")
+
+    def report(name, before_routed, before_statements, stale):
+        moved = delta(before_routed, routed())
+        to_replica = sum(v for (db, _), v in moved.items() if db == "replica")
+        to_primary = sum(v for (db, _), v in moved.items() if db == "primary")
+        print(f"{name:>28} {to_replica:>20.0f} {to_primary:>11.0f} "
+              f"{statements['primary'] - before_statements['primary']:>14} "
+              f"{statements['replica'] - before_statements['replica']:>14} {stale:>12}")
+
+    # read-heavy traffic, nothing written recently
+    dashboard_cache.clear()
+    results.response_cache.clear()
+    before_routed, before_statements = routed(), dict(statements)
+    for interview_id in interview_ids:
+        flask.get(f"/interviews/{interview_id}/questions")
+        flask.get(f"/interviews/{interview_id}")
+        fastapi.get(f"/results/{interview_id}")
+    fastapi.get("/results", params={"limit": 50})
+    fastapi.get("/leaderboard/python")
+    report("reads", before_routed, before_statements, 0)
+
+    # a write, then the same interview read straight back
+    for name, window in (("write, read back", args.window), ("write, read back, window 0", 0.0)):
+        recent_writes.window = window
+        before_routed, before_statements = routed(), dict(statements)
+        stale = 0
+        for n, interview_id in enumerate(interview_ids):
+            answer_id = flask.post("/answers/create", json={
+                "interview_id": interview_id, "question_id": question_id,
+                "answer_text": f"decorators and context managers {name} {n}"}).json["id"]
+            fastapi.post(f"/evaluate/interview/{interview_id}")
+            dashboard = flask.get(f"/interviews/{interview_id}").json
+            result = fastapi.get(f"/results/{interview_id}").json()
+            seen = {a["answer_id"] for a in dashboard["answers"]}
+            scored = {d["answer_id"] for d in result["details"]}
+            stale += (answer_id not in seen) + (answer_id not in scored)
+        report(name, before_routed, before_statements, stale)
+    fastapi.close()
+
+
+if __name__ == "__main__":
+    main()
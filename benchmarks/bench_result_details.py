@@ -0,0 +1,133 @@
+# benchmarks/bench_result_details.py
+# GET /results/{id} handler time with details stored as rows and the body
+# cached per result version (warm and cold), next to the previous handler:
+# the details as a JSON text blob, json.loads'ed and encoded by FastAPI on
+# every read. Also times "every result where question Q scored under S" in
+# SQL against parsing every blob.
+#
+#   python benchmarks/bench_result_details.py [--results 20000] [--answers 10] [--repeat 2000]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=20000)
+    parser.add_argument("--answers", type=int, default=10, help="answers per interview")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "fastapi_service"))
+    from sqlalchemy import Column, Integer, MetaData, Table, Text, func, insert, select, text
+    from flask_service.prestart import prestart
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from flask_service.models import Candidate
+    from common.db import SessionLocal, engine
+    from models import Interview
+    import results
+    import main as evaluator
+
+    prestart()
+    # the previous layout: one JSON text blob per result
+    blobs = Table("bench_result_blobs", MetaData(), Column("interview_id", Integer, primary_key=True),
+                  Column("details", Text))
+    blobs.create(engine, checkfirst=True)
+    rng = random.Random(7)
+    with SessionLocal() as db:
+        existing = db.execute(select(func.count()).select_from(blobs)).scalar()
+        if existing < args.results:
+            db.execute(insert(Candidate), [{"name": "bench", "email": "bench@example.com"}])
+            candidate_id = db.execute(select(func.max(Candidate.id))).scalar()
+            for offset in range(existing, args.results, 2000):
+                n = min(2000, args.results - offset)
+                db.execute(insert(Interview), [{"candidate_id": candidate_id, "skill": "python", "status": "done"}
+                                               for _ in range(n)])
+                top_id = db.execute(select(func.max(Interview.id))).scalar()
+                rows = []
+                for interview_id in range(top_id - n + 1, top_id + 1):
+                    details = [{"answer_id": interview_id * 100 + q, "question_id": q,
+                                "score": round(rng.uniform(0, 100), 2), "notes": "2/3 keywords matched; length_bonus=4.1"}
+                               for q in range(1, args.answers + 1)]
+                    total = round(sum(d["score"] for d in details) / len(details), 2)
+                    rows.append({"interview_id": interview_id, "total_score": total,
+                                 "verdict": results.verdict_for(total), "details": details, "created_at": datetime.utcnow()})
+                results.upsert_results(db, rows)
+                db.execute(insert(blobs), [{"interview_id": r["interview_id"], "details": json.dumps(r["details"])}
+                                           for r in rows])
+                db.commit()
+            if engine.dialect.name == "postgresql":
+                db.execute(text("ANALYZE"))
+                db.commit()
+
+        ids = db.execute(select(blobs.c.interview_id)).scalars().all()
+        picks = iter(rng.choice(ids) for _ in range(args.repeat * 10))
+
+        def previous():
+            interview_id = next(picks)
+            res = db.execute(results.result_query(interview_id)).first()
+            blob = db.execute(select(blobs.c.details).where(blobs.c.interview_id == interview_id)).scalar()
+            JSONResponse(jsonable_encoder({
+                "interview_id": res.interview_id, "total_score": res.total_score, "verdict": res.verdict,
+                "details": json.loads(blob), "created_at": res.created_at.isoformat()}))
+
+        def cold():
+            results.response_cache.clear()
+            evaluator.get_results(next(picks))
+
+        hot_id = ids[0]
+        evaluator.get_results(hot_id)
+
+        def warm():
+            evaluator.get_results(hot_id)
+
+        print(f"{args.results} results x {args.answers} answers, median milliseconds per read")
+        print(f"{'previous (blob)':>22} {timed(previous, args.repeat):>8.3f}")
+        print(f"{'rows, cache miss':>22} {timed(cold, args.repeat):>8.3f}")
+        print(f"{'rows, cache hit':>22} {timed(warm, args.repeat):>8.3f}")
+
+        question, below = 7, 30.0
+
+        def in_sql():
+            return evaluator.list_results(verdict=None, question_id=question, question_score_lt=below,
+                                          question_score_gte=None, cursor=None, limit=500, db=db)
+
+        def parse_blobs():
+            # what the blob layout allows: read and parse every result
+            matches = []
+            for interview_id, blob in db.execute(select(blobs.c.interview_id, blobs.c.details)):
+                if any(d["question_id"] == question and d["score"] < below for d in json.loads(blob)):
+                    matches.append(interview_id)
+            return matches
+
+        print(f"question {question} under {below}: {len(parse_blobs())} of {len(ids)} results, "
+              f"the newest 500 listed")
+        print(f"{'SQL on details rows':>22} {timed(in_sql, 20):>8.3f}")
+        print(f"{'parse every blob':>22} {timed(parse_blobs, 3):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
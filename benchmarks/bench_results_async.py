@@ -0,0 +1,146 @@
+# benchmarks/bench_results_async.py
+# Throughput and latency of the evaluator's result and evaluation endpoints
+# under concurrent load, with EVALUATOR_DB_MODE=sync (threadpool + blocking
+# sessions) versus EVALUATOR_DB_MODE=async (asyncio engine).
+#
+#   python benchmarks/bench_results_async.py [--concurrency 64] [--requests 4000]
+#
+# Each mode runs in its own uvicorn process. Runs against DATABASE_URL, or a
+# throwaway SQLite file when it is unset (async mode then needs aiosqlite).
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SERVICE = os.path.join(ROOT, "fastapi_service")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed(interviews):
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, SERVICE)
+    from sqlalchemy import insert
+    from common.db import engine, SessionLocal
+    from models import Base, Interview, InterviewAnswer, InterviewQuestion
+    from evaluation import run_interview_evaluation
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(InterviewQuestion), [
+            {"id": i, "skill": "python", "text": f"question {i}", "expected_keywords": "list,dict,generator,decorator"}
+            for i in range(1, 6)])
+        conn.execute(insert(Interview), [
+            {"id": i, "candidate_id": 1, "skill": "python", "status": "completed"} for i in range(1, interviews + 1)])
+        conn.execute(insert(InterviewAnswer), [
+            {"interview_id": i, "question_id": q, "answer_text": "a generator yields items of a list lazily " * 4}
+            for i in range(1, interviews + 1) for q in range(1, 6)])
+    with SessionLocal() as db:
+        for i in range(1, interviews + 1):
+            run_interview_evaluation(db, i)
+    engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port):
+    env = dict(os.environ, EVALUATOR_DB_MODE=mode, EVAL_WORKERS="0", BULK_PROCESSES="0",
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")])))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/metrics/pool", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"uvicorn ({mode}) did not start")
+
+
+async def drive(port, requests, concurrency, interviews, evaluate_share):
+    samples = []
+    errors = 0
+    queue = asyncio.Queue()
+    rnd = random.Random(0)
+    for _ in range(requests):
+        iid = rnd.randint(1, interviews)
+        if rnd.random() < evaluate_share:
+            queue.put_nowait(("POST", f"/evaluate/interview/{iid}"))
+        else:
+            queue.put_nowait(("GET", f"/results/{iid}"))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                method, url = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    resp = await client.request(method, url)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                samples.append((time.perf_counter() - start) * 1000)
+                if resp.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return samples, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--interviews", type=int, default=500)
+    parser.add_argument("--evaluate-share", type=float, default=0.1,
+                        help="fraction of requests that re-evaluate an interview instead of reading its result")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    seed(args.interviews)
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.evaluate_share:.0%} evaluations (latency in milliseconds)")
+    print(f"{'mode':>6} {'req/s':>9} {'p50':>8} {'p99':>8} {'mean':>8} {'errors':>7}")
+    for mode in ("sync", "async"):
+        port = free_port()
+        proc = start_server(mode, port)
+        try:
+            # warm up connections and the question bank before measuring
+            asyncio.run(drive(port, args.concurrency * 2, args.concurrency, args.interviews, 0))
+            samples, errors, elapsed = asyncio.run(
+                drive(port, args.requests, args.concurrency, args.interviews, args.evaluate_share))
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{mode:>6} {len(samples) / elapsed:>9.1f} {percentile(samples, 50):>8.2f} "
+              f"{percentile(samples, 99):>8.2f} {statistics.mean(samples):>8.2f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
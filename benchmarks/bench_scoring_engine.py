@@ -0,0 +1,60 @@
+# benchmarks/bench_scoring_engine.py
+# Per-answer scoring (score_answer_text in a loop) versus one batched call
+# to the keyword engine, over answers spread across a set of questions.
+#
+#   python benchmarks/bench_scoring_engine.py [--answers 20000] [--questions 50] [--repeat 5]
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fastapi_service"))
+from engines import Answer, get_engine  # noqa: E402
+from scoring import score_answer_text  # noqa: E402
+
+
+def make_answers(rng, n_answers, n_questions, words_per_answer):
+    vocab = [f"term{i}" for i in range(2000)] + ["list", "dict", "generator", "decorator", "join", "index"]
+    questions = []
+    for q in range(n_questions):
+        keywords = rng.sample(vocab, rng.randint(3, 12)) + ["list comprehension"]
+        questions.append((q, "python", ",".join(keywords)))
+    answers = []
+    for _ in range(n_answers):
+        q, skill, keywords = rng.choice(questions)
+        text = " ".join(rng.choice(vocab) for _ in range(rng.randint(1, words_per_answer)))
+        answers.append(Answer(q, skill, text, keywords))
+    return answers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--words", type=int, default=80, help="maximum words per answer")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    answers = make_answers(random.Random(11), args.answers, args.questions, args.words)
+    engine = get_engine("keyword")
+
+    def per_answer():
+        return [score_answer_text(a.answer_text, a.expected_keywords, a.question_id) for a in answers]
+
+    def batched():
+        return engine.score_batch(answers)
+
+    assert per_answer() == batched()
+    t_single = min(timeit.repeat(per_answer, number=1, repeat=args.repeat))
+    t_batch = min(timeit.repeat(batched, number=1, repeat=args.repeat))
+    print(f"{args.answers} answers over {args.questions} questions, best of {args.repeat}")
+    print(f"{'path':>10} {'seconds':>9} {'answers/sec':>12}")
+    print(f"{'per-answer':>10} {t_single:>9.3f} {args.answers / t_single:>12.0f}")
+    print(f"{'batched':>10} {t_batch:>9.3f} {args.answers / t_batch:>12.0f}")
+    print(f"batched / per-answer throughput: {t_single / t_batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_semantic_engine.py
+# Single-core throughput of the semantic scoring engine: a cold pass (every
+# answer vectorized) and a warm pass (answer vectors from the content-hash
+# cache), next to the keyword engine on the same answers.
+#
+#   python benchmarks/bench_semantic_engine.py [--answers 20000] [--questions 50] [--batch 1000]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fastapi_service"))
+os.environ.setdefault("SEMANTIC_INDEX_DIR", tempfile.mkdtemp())
+from engines import Answer, get_engine  # noqa: E402
+from common.question_bank import Question  # noqa: E402
+
+
+def make_workload(rng, n_answers, n_questions, words_per_answer):
+    vocab = [f"term{i}" for i in range(3000)] + (
+        "function decorator wrap list comprehension generator yield iterate lazy memory join index "
+        "query table row column overfitting regularization validation model training data").split()
+    questions = []
+    for q in range(n_questions):
+        reference = " ".join(rng.choice(vocab) for _ in range(rng.randint(30, 80)))
+        questions.append(Question(q, "python", f"question {q}", ",".join(rng.sample(vocab, 5)), reference))
+    answers = []
+    for _ in range(n_answers):
+        q = rng.choice(questions)
+        text = " ".join(rng.choice(vocab) for _ in range(rng.randint(10, words_per_answer)))
+        answers.append(Answer(q.id, q.skill, text, q.expected_keywords, q.reference_answer))
+    return questions, answers
+
+
+def run(engine, answers, batch):
+    start = time.perf_counter()
+    for i in range(0, len(answers), batch):
+        engine.score_batch(answers[i:i + batch])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--words", type=int, default=150, help="maximum words per answer")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    questions, answers = make_workload(random.Random(5), args.answers, args.questions, args.words)
+    semantic = get_engine("semantic")
+    start = time.perf_counter()
+    semantic.prepare(questions)
+    prepare_seconds = time.perf_counter() - start
+
+    results = [
+        ("keyword", run(get_engine("keyword"), answers, args.batch)),
+        ("semantic cold", run(semantic, answers, args.batch)),
+        ("semantic warm", run(semantic, answers, args.batch)),
+    ]
+    print(f"{args.answers} answers over {args.questions} questions, batches of {args.batch}, one core")
+    print(f"reference matrix for {len(questions)} questions prepared in {prepare_seconds * 1000:.1f} ms")
+    print(f"{'engine':>14} {'seconds':>9} {'answers/sec':>12}")
+    for name, seconds in results:
+        print(f"{name:>14} {seconds:>9.3f} {args.answers / seconds:>12.0f}")
+    print(f"embedding cache: {semantic.cache.hits} hits, {semantic.cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_startup.py
+# Startup time of the production servers: the one-off prestart step, then
+# gunicorn with N workers until the first request is answered and until every
+# worker has logged that it is ready.
+#
+#   python benchmarks/bench_startup.py [--workers 1,2,4] [--repeat 3]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SERVICES = {
+    # name: (cwd, prestart command, gunicorn arguments, port variable, workers variable, health path, ready line)
+    "flask": (ROOT, [sys.executable, "-m", "flask_service.prestart"],
+              ["-c", "flask_service/gunicorn.conf.py", "flask_service.wsgi:app"],
+              "FLASK_PORT", "FLASK_WEB_WORKERS", "/", "ready in"),
+    "evaluator": (os.path.join(ROOT, "fastapi_service"), [sys.executable, "prestart.py"],
+                  ["-c", "gunicorn.conf.py", "main:app"],
+                  "FASTAPI_PORT", "FASTAPI_WEB_WORKERS", "/metrics/pool", "Application startup complete"),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def timed_prestart(service, env):
+    cwd, command = SERVICES[service][:2]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def timed_boot(service, workers, env):
+    """(seconds to the first answered request, seconds until every worker is ready)."""
+    cwd, _, args, port_var, workers_var, health, ready_line = SERVICES[service]
+    port = free_port()
+    env = dict(env, **{port_var: str(port), workers_var: str(workers)})
+    ready = []
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", *args], cwd=cwd, env=env,
+                            stderr=subprocess.PIPE, text=True)
+
+    def read_log():
+        for line in proc.stderr:
+            if ready_line in line:
+                ready.append(time.perf_counter() - start)
+
+    reader = threading.Thread(target=read_log, daemon=True)
+    reader.start()
+    first = None
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline and (first is None or len(ready) < workers):
+            if first is None:
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}{health}", timeout=1).raise_for_status()
+                    first = time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+            time.sleep(0.01)
+        if first is None or len(ready) < workers:
+            raise RuntimeError(f"{service} with {workers} workers did not start")
+        return first, max(ready[:workers])
+    finally:
+        proc.terminate()
+        proc.wait()
+        reader.join(5)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    env = dict(os.environ, EVAL_WORKERS=os.getenv("EVAL_WORKERS", "1"), BULK_PROCESSES="0",
+               PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(),
+               # the evaluator runs from its own directory and imports common/ from the repo root
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")])))
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    print("median seconds over", args.repeat, "runs")
+    print(f"{'service':>10} {'workers':>8} {'prestart':>9} {'first request':>14} {'all ready':>10}")
+    for service in SERVICES:
+        # the first prestart migrates an empty database; later ones find it up to date
+        first_prestart = timed_prestart(service, env)
+        prestart = statistics.median(timed_prestart(service, env) for _ in range(args.repeat))
+        print(f"{service:>10} {'':>8} {first_prestart:>9.3f} (empty database), {prestart:.3f} (up to date)")
+        for workers in (int(w) for w in args.workers.split(",")):
+            runs = [timed_boot(service, workers, env) for _ in range(args.repeat)]
+            print(f"{service:>10} {workers:>8} {'':>9} {statistics.median(r[0] for r in runs):>14.3f} "
+                  f"{statistics.median(r[1] for r in runs):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+# benchmarks/loadtest.py
+# End-to-end load test without Docker: boots the Flask service and the FastAPI
+# evaluator in this process (werkzeug and uvicorn on background threads, real
+# HTTP between them), seeds synthetic candidates, interviews and answers, then
+# drives the full flow from --concurrency client threads:
+#
+#   create candidate -> create interview -> questions -> answers -> complete
+#   -> wait for the evaluation job -> dashboard
+#
+#   python benchmarks/loadtest.py [--flows 200] [--concurrency 8] [--seed-candidates 1000]
+#                                 [--output loadtest.json] [--compare previous.json]
+#
+# Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+# Reports throughput, p50/p95/p99 per request type and database queries per
+# request (from each service's http_request_db_queries histogram) and writes
+# them as JSON; --compare prints the change against an earlier run.
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SKILLS = ("python", "ml", "sql")
+WORDS = ("list comprehension for in decorator function wrap generator yield overfitting regularization "
+         "validation inner join left join rows index model data iterable filter").split()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(rng, candidates, interviews_per_candidate):
+    """Background rows so the flow runs against tables of a realistic size."""
+    from sqlalchemy import insert, select
+    from common.db import engine
+    from flask_service.models import Candidate, Interview, InterviewAnswer, InterviewQuestion
+
+    with engine.begin() as conn:
+        questions = {s: [r[0] for r in conn.execute(
+            select(InterviewQuestion.id).where(InterviewQuestion.skill == s))] for s in SKILLS}
+        first = conn.execute(select(Candidate.id).order_by(Candidate.id.desc()).limit(1)).scalar() or 0
+        conn.execute(insert(Candidate), [
+            {"id": first + i, "name": f"seed {i}", "email": f"seed{i}@example.com"}
+            for i in range(1, candidates + 1)])
+        for start in range(1, candidates + 1, 1000):
+            batch = [(first + c, rng.choice(SKILLS), rng.choice(("in_progress", "completed", "done")))
+                     for c in range(start, min(start + 1000, candidates + 1))
+                     for _ in range(interviews_per_candidate)]
+            ids = [conn.execute(insert(Interview).values(candidate_id=c, skill=s, status=st)).inserted_primary_key[0]
+                   for c, s, st in batch]
+            conn.execute(insert(InterviewAnswer), [
+                {"interview_id": iid, "question_id": q,
+                 "answer_text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))}
+                for iid, (_, skill, _) in zip(ids, batch) for q in questions[skill]])
+
+
+class Servers:
+    """The two apps served over HTTP from background threads of this process."""
+
+    def __init__(self, flask_app, fastapi_app):
+        import uvicorn
+        from werkzeug.serving import make_server
+
+        self.fastapi_port = int(os.environ["FASTAPI_URL"].rsplit(":", 1)[1])
+        config = uvicorn.Config(fastapi_app, host="127.0.0.1", port=self.fastapi_port, log_level="warning")
+        self.uvicorn = uvicorn.Server(config)
+        self.uvicorn.install_signal_handlers = lambda: None
+        self.werkzeug = make_server("127.0.0.1", free_port(), flask_app, threaded=True)
+        self.flask_url = f"http://127.0.0.1:{self.werkzeug.server_port}"
+        self.fastapi_url = os.environ["FASTAPI_URL"]
+        self._threads = [threading.Thread(target=self.uvicorn.run, daemon=True),
+                         threading.Thread(target=self.werkzeug.serve_forever, daemon=True)]
+
+    def __enter__(self):
+        for t in self._threads:
+            t.start()
+        deadline = time.time() + 30
+        while not self.uvicorn.started:
+            if time.time() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.werkzeug.shutdown()
+        self.uvicorn.should_exit = True
+        for t in self._threads:
+            t.join(10)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # request type -> [milliseconds]
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, ms, ok):
+        with self._lock:
+            self.samples.setdefault(name, []).append(ms)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def run_flow(session, servers, recorder, rng, answers_per_question, poll_seconds, eval_timeout):
+    """One candidate through the whole flow; False if a step failed."""
+
+    def call(service, method, route, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, timeout=60, **kwargs)
+            ok = resp.status_code < 400
+        except Exception:
+            resp, ok = None, False
+        recorder.add(f"{service} {method} {route}", (time.perf_counter() - start) * 1000, ok)
+        if not ok:
+            raise RuntimeError(f"{method} {url} failed")
+        return resp
+
+    flask, evaluator = servers.flask_url, servers.fastapi_url
+    try:
+        cand = call("flask", "POST", "/candidates/create", f"{flask}/candidates/create",
+                    json={"name": "load test", "email": "load@example.com"}).json()
+        iv = call("flask", "POST", "/interviews/create", f"{flask}/interviews/create",
+                  json={"candidate_id": cand["id"], "skill": rng.choice(SKILLS)}).json()
+        questions = call("flask", "GET", "/interviews/<int:interview_id>/questions",
+                         f"{flask}/interviews/{iv['id']}/questions").json()["questions"]
+        for q in questions:
+            for _ in range(answers_per_question):
+                call("flask", "POST", "/answers/create", f"{flask}/answers/create",
+                     json={"interview_id": iv["id"], "question_id": q["id"],
+                           "answer_text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))})
+        completed = time.perf_counter()
+        job = call("flask", "PUT", "/interviews/<int:interview_id>/complete",
+                   f"{flask}/interviews/{iv['id']}/complete").json()
+        deadline = time.time() + eval_timeout
+        while True:
+            status = call("evaluator", "GET", "/jobs/{job_id}", f"{evaluator}/jobs/{job['job_id']}").json()["status"]
+            if status in ("done", "failed") or time.time() > deadline:
+                break
+            time.sleep(poll_seconds)
+        # complete -> job finished, as a caller waiting for the verdict sees it
+        recorder.add("flow evaluation turnaround", (time.perf_counter() - completed) * 1000, status == "done")
+        call("flask", "GET", "/interviews/<int:interview_id>", f"{flask}/interviews/{iv['id']}")
+        return status == "done"
+    except RuntimeError:
+        return False
+
+
+def db_queries_by_route(registries):
+    """{"<service> <method> <route>": (sum, count)} of http_request_db_queries."""
+    totals = {}
+    for service, registry in registries.items():
+        for family in registry.collect():
+            if family.name != "http_request_db_queries":
+                continue
+            for s in family.samples:
+                if s.name.endswith("_sum") or s.name.endswith("_count"):
+                    key = f"{service} {s.labels['method']} {s.labels['route']}"
+                    total = totals.setdefault(key, [0.0, 0.0])
+                    total[0 if s.name.endswith("_sum") else 1] += s.value
+    return totals
+
+
+def drive(servers, args, flows, seed_offset):
+    import requests
+
+    recorder = Recorder()
+    counter = iter(range(flows))
+    lock = threading.Lock()
+    done = []
+
+    def client(n):
+        rng = random.Random(seed_offset + n)
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                done.append(run_flow(session, servers, recorder, rng, args.answers_per_question,
+                                     args.poll_ms / 1000, args.eval_timeout))
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(args.concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, done, time.perf_counter() - start
+
+
+def report(args, recorder, done, elapsed, queries_before, queries_after):
+    requests_ = {}
+    for name, samples in sorted(recorder.samples.items()):
+        entry = {
+            "count": len(samples),
+            "errors": recorder.errors.get(name, 0),
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "mean_ms": round(statistics.mean(samples), 3),
+        }
+        before = queries_before.get(name, (0.0, 0.0))
+        after = queries_after.get(name)
+        if after and after[1] > before[1]:
+            entry["db_queries_per_request"] = round((after[0] - before[0]) / (after[1] - before[1]), 2)
+        requests_[name] = entry
+    # calls one service makes to the other (complete -> enqueue) only show up server side
+    for name, (total, count) in sorted(queries_after.items()):
+        before = queries_before.get(name, (0.0, 0.0))
+        if name not in requests_ and count > before[1] and not name.endswith(" unmatched"):
+            requests_[name] = {"count": int(count - before[1]), "internal": True,
+                               "db_queries_per_request": round((total - before[0]) / (count - before[1]), 2)}
+    total_requests = sum(len(s) for n, s in recorder.samples.items() if not n.startswith("flow "))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                  capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+    from common.db import engine
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "revision": revision,
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "config": vars(args),
+        "elapsed_seconds": round(elapsed, 3),
+        "flows": len(done),
+        "flows_failed": done.count(False),
+        "flows_per_second": round(len(done) / elapsed, 2),
+        "requests": total_requests,
+        "requests_per_second": round(total_requests / elapsed, 2),
+        "by_request": requests_,
+    }
+
+
+def print_report(result, previous=None):
+    print(f"{result['flows']} flows ({result['flows_failed']} failed) in {result['elapsed_seconds']} s: "
+          f"{result['flows_per_second']} flows/s, {result['requests_per_second']} requests/s "
+          f"[{result['database']}, concurrency {result['config']['concurrency']}]")
+    print(f"{'request':<58} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for name, r in result["by_request"].items():
+        if r.get("internal"):
+            print(f"{name:<58} {r['count']:>6} {'':>4} {'':>8} {'':>8} {'':>8} {r['db_queries_per_request']:>8}")
+            continue
+        print(f"{name:<58} {r['count']:>6} {r['errors']:>4} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r.get('db_queries_per_request', ''):>8}")
+    if previous:
+        print(f"\nchange against {previous.get('revision')} ({previous.get('timestamp')}):")
+        print(f"  flows/s {previous['flows_per_second']} -> {result['flows_per_second']}, "
+              f"requests/s {previous['requests_per_second']} -> {result['requests_per_second']}")
+        for name, r in result["by_request"].items():
+            old = previous["by_request"].get(name)
+            if not old:
+                continue
+            line = f"  {name:<56}"
+            if "p95_ms" in r and "p95_ms" in old:
+                line += f" p95 {old['p95_ms']:>8.2f} -> {r['p95_ms']:>8.2f} ms"
+            if "db_queries_per_request" in r and "db_queries_per_request" in old:
+                line += f" queries {old['db_queries_per_request']} -> {r['db_queries_per_request']}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flows", type=int, default=200, help="candidates taken through the whole flow")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--warmup", type=int, default=5, help="flows run before measuring")
+    parser.add_argument("--answers-per-question", type=int, default=1)
+    parser.add_argument("--seed-candidates", type=int, default=1000, help="background candidates")
+    parser.add_argument("--seed-interviews", type=int, default=3, help="background interviews per candidate")
+    parser.add_argument("--poll-ms", type=float, default=25, help="job status polling interval")
+    parser.add_argument("--eval-timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest.json")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    # the Flask service reaches the in-process evaluator over HTTP
+    os.environ["FASTAPI_URL"] = f"http://127.0.0.1:{free_port()}"
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    os.environ.setdefault("BULK_PROCESSES", "0")
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "fastapi_service"))
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    from flask_service.app import app as flask_app, start_background
+    from flask_service.prestart import prestart
+    from flask_service import metrics as flask_metrics
+    from main import app as fastapi_app
+    from prestart import prestart as evaluator_prestart
+    import metrics as evaluator_metrics
+
+    prestart()
+    evaluator_prestart()
+    start_background()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    seed(rng, args.seed_candidates, args.seed_interviews)
+    print(f"seeded {args.seed_candidates} candidates, {args.seed_candidates * args.seed_interviews} interviews "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    registries = {"flask": flask_metrics.registry, "evaluator": evaluator_metrics.registry}
+    with Servers(flask_app, fastapi_app) as servers:
+        if args.warmup:
+            drive(servers, args, args.warmup, seed_offset=10000 + args.seed)
+        queries_before = db_queries_by_route(registries)
+        recorder, done, elapsed = drive(servers, args, args.flows, seed_offset=args.seed)
+        queries_after = db_queries_by_route(registries)
+
+    result = report(args, recorder, done, elapsed, queries_before, queries_after)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(result, previous)
+    print(f"\nwritten to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# common/__init__.py
+# Code shared by flask_service and fastapi_service: the database engine and
+# session layer, cross-process notifications, the question index, read/write
+# routing, the request metrics plumbing and the HTTP client between services
+# (also used by the Streamlit frontend). The Docker images copy this package
+# next to the service code; outside Docker, run each service with the
+# repository root on PYTHONPATH.
@@ -0,0 +1,191 @@
+# common/db.py
+# The engine and session layer of both services: connection settings, the
+# instrumented pool, the primary and optional replica engines, sessions,
+# pool status and per-request query counters.
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import quote_plus
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
+POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
+POSTGRES_DB = os.getenv("POSTGRES_DB", "interviewdb")
+POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
+POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
+
+DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql://{POSTGRES_USER}:{quote_plus(POSTGRES_PASSWORD)}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+# connection pool settings (per process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Postgres advisory lock held while either service changes the schema, so
+# replicas starting together run their DDL one after the other
+SCHEMA_LOCK_KEY = 724100
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that also records checkouts, time spent waiting and timeouts."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.stats = {"checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "timeouts": 0}
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.stats["checkouts"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+        return conn
+
+
+def _make_engine(url):
+    if url.startswith("sqlite") and ":memory:" in url:
+        # in-memory SQLite keeps its single-connection pool
+        return create_engine(url, echo=False, future=True)
+    return create_engine(
+        url, echo=False, future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+engine = _make_engine(DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# optional read replica: read-only endpoints use it through
+# common.read_routing.read_session(); writes and everything else stay on `engine`
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+replica_engine = _make_engine(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else None
+ReplicaSessionLocal = (sessionmaker(bind=replica_engine, autocommit=False, autoflush=False)
+                       if replica_engine is not None else None)
+
+
+@contextmanager
+def session_scope(replica=False):
+    """Session that is rolled back on error and always returned to the pool.
+
+    replica=True reads from the replica when one is configured.
+    """
+    db = ReplicaSessionLocal() if replica and ReplicaSessionLocal is not None else SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_db():
+    # FastAPI dependency: one session per request
+    with session_scope() as db:
+        yield db
+
+
+def dispose_after_fork():
+    """Drop the connections a forked worker inherited; they belong to the parent."""
+    engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
+
+
+def lock_schema(conn):
+    """Hold the schema lock until `conn`'s transaction ends (Postgres only)."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def pool_status(target=None):
+    pool = (target or engine).pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": DB_POOL_TIMEOUT,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update({
+            "checkouts": stats["checkouts"],
+            "checkout_wait_seconds_total": round(stats["wait_seconds_total"], 6),
+            "checkout_wait_seconds_max": round(stats["wait_seconds_max"], 6),
+            "checkout_timeouts": stats["timeouts"],
+        })
+    if target is None and replica_engine is not None:
+        status["replica_pool"] = pool_status(replica_engine)
+    return status
+
+
+# Per-request query counters: count_queries() installs a counter in the current
+# context and every statement sent through an instrumented engine (the primary,
+# the replica, the evaluator's async engine) bumps it, along with any enclosing
+# counters, and adds its time.
+_query_counters = ContextVar("query_counters", default=())
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counters = _query_counters.get()
+    if counters:
+        for counter in counters:
+            counter["queries"] += 1
+        context._query_started = time.perf_counter()
+
+
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for counter in _query_counters.get():
+        counter["seconds"] += elapsed
+        if counter["statements"] is not None:
+            counter["statements"].append((statement, elapsed))
+
+
+def instrument(target):
+    """Report the statements run through `target` (a sync Engine) to count_queries()."""
+    event.listen(target, "before_cursor_execute", _count_query)
+    event.listen(target, "after_cursor_execute", _time_query)
+
+
+for _target in [engine] + ([replica_engine] if replica_engine is not None else []):
+    instrument(_target)
+
+
+@contextmanager
+def count_queries(record_statements=False):
+    """Count (and time) the queries run in this context; nests."""
+    counter = {"queries": 0, "seconds": 0.0, "statements": [] if record_statements else None}
+    token = _query_counters.set(_query_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _query_counters.reset(token)
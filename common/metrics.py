@@ -0,0 +1,73 @@
+# common/metrics.py
+# Prometheus plumbing shared by both services: a registry per service, the
+# per-request latency / query histograms and slow-request log (fed by
+# common.db.count_queries), the metrics of the shared layer and the GET
+# /metrics body.
+#
+# With PROMETHEUS_MULTIPROC_DIR set, every process writes its samples there
+# and /metrics adds them up.
+# SLOW_REQUEST_SECONDS > 0 logs slower requests with their query breakdown.
+import os
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, GCCollector, Histogram,
+                               ProcessCollector, generate_latest, multiprocess)
+
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "0"))
+
+# metrics of the code in common/, served by whichever service runs it
+shared_registry = CollectorRegistry()
+# database: primary / replica; reason: replica / recent_write / no_replica
+DB_READ_ROUTING = Counter("db_read_routing_total", "Read-only sessions by the database they used",
+                          ["database", "reason"], registry=shared_registry)
+
+
+def service_registry():
+    """A registry of the service's own, so the Flask and FastAPI apps can share a
+    process (tests, the in-process load test) without clashing metric names."""
+    registry = CollectorRegistry()
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        ProcessCollector(registry=registry)
+        GCCollector(registry=registry)
+    return registry
+
+
+def query_breakdown(statements, top=5):
+    """The `top` statements by total time: [(seconds, count, statement)]."""
+    totals = {}
+    for statement, seconds in statements:
+        entry = totals.setdefault(statement, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    ranked = sorted(((s, n, st) for st, (s, n) in totals.items()), reverse=True)
+    return [(round(s, 6), n, " ".join(st.split())[:200]) for s, n, st in ranked[:top]]
+
+
+class RequestMetrics:
+    """Latency, database queries and database time per request, on a service's registry."""
+
+    def __init__(self, registry, slow_log):
+        self.seconds = Histogram("http_request_duration_seconds", "Request latency",
+                                 ["method", "route", "status"], registry=registry)
+        self.db_queries = Histogram("http_request_db_queries", "Database queries per request", ["method", "route"],
+                                    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 89, 144), registry=registry)
+        self.db_seconds = Histogram("http_request_db_seconds", "Database time per request", ["method", "route"],
+                                    registry=registry)
+        self.slow_log = slow_log
+
+    def observe(self, method, route, path, status, elapsed, counter):
+        """Record one request; `counter` is the request's count_queries() counter."""
+        self.seconds.labels(method, route, str(status)).observe(elapsed)
+        self.db_queries.labels(method, route).observe(counter["queries"])
+        self.db_seconds.labels(method, route).observe(counter["seconds"])
+        if 0 < SLOW_REQUEST_SECONDS <= elapsed:
+            self.slow_log.warning("slow request %s %s status=%s seconds=%.3f db_queries=%d db_seconds=%.3f top=%s",
+                                  method, path, status, elapsed, counter["queries"], counter["seconds"],
+                                  query_breakdown(counter["statements"]))
+
+
+def render(registry):
+    """(body, content type) for GET /metrics."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        combined = CollectorRegistry()
+        multiprocess.MultiProcessCollector(combined)
+        return generate_latest(combined), CONTENT_TYPE_LATEST
+    return generate_latest(registry) + generate_latest(shared_registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,103 @@
+# common/notifications.py
+# Cross-process change notifications over Postgres LISTEN/NOTIFY. Every
+# service process that caches database state listens here so a write made by
+# any process (or by the evaluator) drops the stale entries everywhere.
+# On other databases publishing is a no-op and caches rely on their TTL.
+import select
+import threading
+import traceback
+from sqlalchemy import text
+
+INTERVIEW_CHANGED = "interview_changed"
+QUESTION_BANK_CHANGED = "question_bank_changed"
+# NOTIFY payloads are limited to 8000 bytes
+_MAX_PAYLOAD = 7000
+
+
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+
+
+def notify_params(channel, ids):
+    """Split `ids` into pg_notify parameter sets that fit the payload limit."""
+    params = []
+    payload = ""
+    for i in ids:
+        part = str(i)
+        if payload and len(payload) + len(part) + 1 > _MAX_PAYLOAD:
+            params.append({"channel": channel, "payload": payload})
+            payload = ""
+        payload = f"{payload},{part}" if payload else part
+    if payload:
+        params.append({"channel": channel, "payload": payload})
+    return params
+
+
+def publish(db, channel, ids):
+    """Queue a notification for `ids` on the session's transaction; sent on commit."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for params in notify_params(channel, ids):
+        db.execute(_NOTIFY, params)
+
+
+async def publish_async(db, channel, ids):
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for params in notify_params(channel, ids):
+        await db.execute(_NOTIFY, params)
+
+
+class NotificationListener(threading.Thread):
+    """Daemon thread that LISTENs on channels and calls handler(ids) per notification.
+
+    Channels in `payload_handlers` carry something other than ids; their
+    handler gets the raw payload string.
+    `on_reconnect` runs after every (re)connect because notifications sent
+    while disconnected are lost; callers use it to clear their caches.
+    """
+
+    def __init__(self, engine, handlers, on_reconnect=None, poll_seconds=5.0, payload_handlers=None):
+        super().__init__(name="notification-listener", daemon=True)
+        self.engine = engine
+        self.handlers = handlers
+        self.payload_handlers = payload_handlers or {}
+        self.on_reconnect = on_reconnect
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                traceback.print_exc()
+                self._stop.wait(self.poll_seconds)
+
+    def _listen(self):
+        # a dedicated connection outside the pool; it stays in LISTEN forever
+        proxied = self.engine.raw_connection()
+        raw = proxied.driver_connection
+        proxied.detach()
+        try:
+            raw.autocommit = True
+            cur = raw.cursor()
+            for channel in [*self.handlers, *self.payload_handlers]:
+                cur.execute(f'LISTEN "{channel}"')
+            if self.on_reconnect:
+                self.on_reconnect()
+            while not self._stop.is_set():
+                if select.select([raw], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    note = raw.notifies.pop(0)
+                    handler = self.handlers.get(note.channel)
+                    if handler:
+                        handler([int(i) for i in note.payload.split(",") if i])
+                    elif note.channel in self.payload_handlers:
+                        self.payload_handlers[note.channel](note.payload)
+        finally:
+            proxied.close()
@@ -0,0 +1,36 @@
+# common/process_pool.py
+# Lazily started process pools for CPU-bound work that should not hold the
+# GIL of a server process (bulk scoring in the evaluator, text extraction in
+# flask_service).
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class SpawnPool:
+    """A ProcessPoolExecutor of `processes` workers, started on first use.
+
+    Workers are started with spawn: server processes run threads (job
+    workers, notification listeners, gthread workers), and fork() would copy
+    their locks in whatever state they are in. processes=0 means no pool:
+    get() returns None and callers do the work inline.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._executor is None and self.processes > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def shutdown(self):
+        """Drop the pool without waiting; the next get() starts a fresh one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,78 @@
+# common/question_bank.py
+import os
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import column, select, table
+from .db import session_scope
+
+QUESTION_BANK_MAX_AGE = float(os.getenv("QUESTION_BANK_MAX_AGE", "300"))
+
+# the columns both services read; the table itself belongs to flask_service.models
+questions = table("interview_questions", column("id"), column("skill"), column("text"),
+                  column("expected_keywords"), column("reference_answer"))
+
+Question = namedtuple("Question", ["id", "skill", "text", "expected_keywords", "reference_answer"])
+
+
+class QuestionBank:
+    """In-memory copy of interview_questions, indexed by skill and by id.
+
+    The question bank almost never changes, so it is loaded once and reused
+    until its version counter is bumped (a local write or a
+    question_bank_changed notification) or it is older than `max_age`.
+    """
+
+    def __init__(self, max_age=QUESTION_BANK_MAX_AGE):
+        self.max_age = max_age
+        self.version = 0
+        self._index = None  # (by_skill, by_id, version, loaded_at)
+        self._lock = threading.Lock()
+
+    def invalidate(self, _ids=None):
+        with self._lock:
+            self.version += 1
+
+    def load(self):
+        with self._lock:
+            version = self.version
+            with session_scope() as db:
+                rows = db.execute(
+                    select(questions.c.id, questions.c.skill, questions.c.text,
+                           questions.c.expected_keywords, questions.c.reference_answer)
+                    .order_by(questions.c.id)
+                ).all()
+            by_skill, by_id = {}, {}
+            for row in rows:
+                q = Question(*row)
+                by_id[q.id] = q
+                by_skill.setdefault(q.skill, []).append({"id": q.id, "text": q.text})
+            self._index = (by_skill, by_id, version, time.monotonic())
+            return self._index
+
+    def _current(self):
+        index = self._index
+        if index is None or index[2] != self.version or time.monotonic() - index[3] > self.max_age:
+            index = self.load()
+        return index
+
+    def questions_for(self, skill):
+        return self._current()[0].get(skill, [])
+
+    def all(self):
+        return list(self._current()[1].values())
+
+    def get(self, question_id):
+        index = self._current()
+        q = index[1].get(question_id)
+        if q is None and time.monotonic() - index[3] > 1.0:
+            # unknown id: the question may have been added since the last load
+            q = self.load()[1].get(question_id)
+        return q
+
+    def expected_keywords(self, question_id):
+        q = self.get(question_id)
+        return q.expected_keywords if q else None
+
+
+question_bank = QuestionBank()
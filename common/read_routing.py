@@ -0,0 +1,73 @@
+# common/read_routing.py
+# Where a read-only request reads from. With REPLICA_DATABASE_URL set, reads go
+# to the replica, except reads of an interview written in the last
+# READ_YOUR_WRITES_SECONDS: those go to the primary, so a candidate always sees
+# their own submission while the replica catches up. A write is marked here
+# once it commits in this process and, on Postgres, in every other process
+# through the INTERVIEW_CHANGED notification, which each service's listener
+# hands to recent_writes.mark.
+import os
+import threading
+import time
+
+from .db import session_scope, replica_engine
+from .metrics import DB_READ_ROUTING
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+# past this many marks, expired ones are dropped on the next mark
+_PRUNE_AT = 10000
+
+
+class RecentWrites:
+    """Interview ids written in the last `window` seconds."""
+
+    def __init__(self, window):
+        self.window = window
+        self._until = {}
+        self._all_until = 0.0
+        self._lock = threading.Lock()
+
+    def mark(self, interview_ids):
+        deadline = time.monotonic() + self.window
+        with self._lock:
+            for interview_id in interview_ids:
+                self._until[int(interview_id)] = deadline
+            if len(self._until) > _PRUNE_AT:
+                now = time.monotonic()
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def mark_all(self):
+        # notifications may have been missed (listener reconnect): treat every
+        # interview as just written for one window
+        with self._lock:
+            self._all_until = time.monotonic() + self.window
+
+    def __contains__(self, interview_id):
+        now = time.monotonic()
+        return now < self._all_until or now < self._until.get(interview_id, 0.0)
+
+
+recent_writes = RecentWrites(READ_YOUR_WRITES_SECONDS)
+
+
+def use_replica(interview_id=None):
+    """Whether a read-only request goes to the replica: yes unless `interview_id` was just written."""
+    if replica_engine is None:
+        reason = "no_replica"
+    elif interview_id is not None and interview_id in recent_writes:
+        reason = "recent_write"
+    else:
+        reason = "replica"
+    DB_READ_ROUTING.labels("replica" if reason == "replica" else "primary", reason).inc()
+    return reason == "replica"
+
+
+def read_session(interview_id=None):
+    """session_scope() for a read-only request, routed by use_replica()."""
+    return session_scope(replica=use_replica(interview_id))
+
+
+def get_read_db():
+    # FastAPI dependency for read-only endpoints
+    with read_session() as db:
+        yield db
@@ -0,0 +1,15 @@
+# common/retry.py
+# Retry pacing shared by the Flask service's outbound client and the
+# evaluator's job queue.
+import random
+
+
+def backoff_delay(base_seconds, retry):
+    """Seconds to wait before retry number `retry` (0 for the first retry).
+
+    Exponential backoff with equal jitter: half of base_seconds * 2**retry is
+    fixed and the other half is random, so retries spread out but never come
+    sooner than half the nominal delay.
+    """
+    step = base_seconds * (2 ** retry)
+    return step / 2 + random.uniform(0, step / 2)
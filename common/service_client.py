@@ -0,0 +1,152 @@
+# common/service_client.py
+# HTTP client for calls between the services (Flask -> evaluator, and the
+# Streamlit frontend -> both). Each target gets one pooled keep-alive
+# session, connect and read timeouts, retries with jittered exponential
+# backoff on connection errors and 502/503/504, and a circuit breaker, so a
+# slow or dead service fails fast instead of holding every caller for the
+# full timeout. Only requests is needed, so the frontend image can use it too;
+# metrics are passed in by services that export them.
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.retry import backoff_delay
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class ServiceError(Exception):
+    """The call failed after its retries, or was not attempted."""
+
+
+class CircuitOpenError(ServiceError):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failed calls.
+
+    While open, calls are rejected without touching the network. After
+    `reset_seconds` a single trial call is let through (half-open); its
+    outcome closes the circuit or opens it for another period.
+    """
+
+    def __init__(self, failure_threshold=5, reset_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class ServiceClient:
+    """Calls to one target service.
+
+    `retry_methods` limits retries to those HTTP methods (None: all of them),
+    for targets whose writes are not safe to repeat. `seconds_metric` and
+    `retries_metric` are optional Prometheus histogram/counter objects
+    labelled (target, outcome) and (target).
+    """
+
+    def __init__(self, name, base_url, connect_timeout=1.0, read_timeout=3.0, retries=2,
+                 backoff_seconds=0.1, pool_size=10, breaker=None, retry_methods=None,
+                 seconds_metric=None, retries_metric=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_methods = retry_methods
+        self.seconds_metric = seconds_metric
+        self.retries_metric = retries_metric
+        # requests.Session is safe to share between threads for plain calls;
+        # the adapter keeps up to pool_size idle connections to the target
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, **kwargs):
+        """The response of the first attempt that is not a connection error or 502/503/504.
+
+        Raises CircuitOpenError while the breaker is open and ServiceError
+        when every attempt failed or the request failed in a way a retry will
+        not fix (e.g. an invalid URL or a broken response body). Other statuses (including 4xx and 500) are
+        returned to the caller; a 5xx still counts as a failure for the breaker.
+        A `timeout` keyword overrides the client's (connect, read) timeouts.
+        """
+        if not self.breaker.allow():
+            self._observe("rejected", 0)
+            raise CircuitOpenError(f"{self.name}: circuit open")
+        start = time.perf_counter()
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.retries if self.retry_methods is None or method in self.retry_methods else 0
+        error = None
+        outcome = None
+        # every call that got past allow() ends in record_success or
+        # record_failure, or a half-open breaker would never leave that state
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    if self.retries_metric is not None:
+                        self.retries_metric.labels(self.name).inc()
+                    time.sleep(backoff_delay(self.backoff_seconds, attempt - 1))
+                try:
+                    resp = self.session.request(method, self.base_url + path, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                    continue
+                except requests.RequestException as e:
+                    # not worth a retry (bad URL, broken body, redirect loop)
+                    error = e
+                    break
+                if resp.status_code in RETRY_STATUSES:
+                    error = requests.HTTPError(f"{resp.status_code} from {self.name}", response=resp)
+                    continue
+                outcome = "error" if resp.status_code >= 500 else "ok"
+                return resp
+            raise ServiceError(f"{self.name}: {error}") from error
+        finally:
+            if outcome == "ok":
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            self._observe(outcome or "error", time.perf_counter() - start)
+
+    def _observe(self, outcome, seconds):
+        if self.seconds_metric is not None:
+            self.seconds_metric.labels(self.name, outcome).observe(seconds)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
@@ -0,0 +1,48 @@
+# fastapi_service/async_routes.py
+# Async variants of the evaluation endpoints, mounted instead of the sync ones
+# when EVALUATOR_DB_MODE=async. Database I/O awaits on the asyncio engine so a
+# request no longer holds a threadpool slot while it waits; scoring (CPU-bound)
+# still runs on the threadpool.
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import get_async_db, async_read_connection, InterviewAnswer, ExtractedText
+from evaluation import run_interview_evaluation_async, score_answer
+import results
+
+router = APIRouter()
+
+
+@router.post("/evaluate/answer")
+async def evaluate_answer(answer_id: int, db: AsyncSession = Depends(get_async_db)):
+    ans = await db.get(InterviewAnswer, answer_id)
+    if not ans:
+        raise HTTPException(status_code=404, detail="Answer not found")
+    extracted = await db.get(ExtractedText, ans.uploaded_file_path) if ans.uploaded_file_path else None
+    score, notes, fingerprint = await run_in_threadpool(score_answer, ans.question_id, ans.answer_text,
+                                                        extracted.text if extracted else None)
+    ans.score = score
+    ans.scored = True
+    ans.evaluator_notes = notes
+    ans.score_fingerprint = fingerprint
+    await db.commit()
+    return {"answer_id": ans.id, "score": ans.score, "notes": notes}
+
+
+@router.post("/evaluate/interview/{interview_id}")
+async def evaluate_interview(interview_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await run_interview_evaluation_async(db, interview_id)
+
+
+@router.get("/results/{interview_id}")
+async def get_results(interview_id: int):
+    # from the replica unless this interview was just evaluated
+    async with async_read_connection(interview_id) as conn:
+        res = (await conn.execute(results.result_query(interview_id))).first()
+        if not res:
+            raise HTTPException(status_code=404, detail="Result not found")
+        body = results.response_cache.get(res.interview_id, res.version)
+        if body is None:
+            body = results.result_body(res, (await conn.execute(results.details_query(interview_id))).all())
+    return Response(body, media_type="application/json")
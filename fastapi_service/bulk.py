@@ -0,0 +1,135 @@
+# fastapi_service/bulk.py
+# Bulk re-scoring: walk the matching answers in keyset-paginated chunks, score
+# each chunk in a process pool (engines.score_rows) and write it back with one executemany UPDATE,
+# so memory stays bounded by the chunk size however many interviews match.
+# Answers whose score fingerprint is unchanged are skipped unless `force` is set.
+import logging
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from common.notifications import publish, INTERVIEW_CHANGED
+from common.process_pool import SpawnPool
+from common.read_routing import recent_writes
+from models import Interview, InterviewAnswer, ExtractedText
+from results import refresh_results
+from engines import fingerprint, score_rows
+from evaluation import answer_for, scored_text
+
+log = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+# 0 scores inline in the request thread
+BULK_PROCESSES = int(os.getenv("BULK_PROCESSES", str(os.cpu_count() or 1)))
+
+scoring_pool = SpawnPool(BULK_PROCESSES)
+
+
+class BulkEvaluationRequest(BaseModel):
+    skill: Optional[str] = None
+    question_id: Optional[int] = None
+    interview_ids: Optional[List[int]] = None
+    completed_from: Optional[datetime] = None
+    completed_to: Optional[datetime] = None
+    chunk_size: int = BULK_CHUNK_SIZE
+    # re-score even answers whose inputs and engine are unchanged
+    force: bool = False
+
+
+def _answers_query(flt: BulkEvaluationRequest):
+    # only interviews that already have an evaluation are re-scored
+    stmt = (
+        select(InterviewAnswer.id, InterviewAnswer.interview_id, InterviewAnswer.question_id,
+               InterviewAnswer.answer_text, InterviewAnswer.score_fingerprint, ExtractedText.text)
+        .join(Interview, Interview.id == InterviewAnswer.interview_id)
+        .outerjoin(ExtractedText, ExtractedText.file_ref == InterviewAnswer.uploaded_file_path)
+        .where(Interview.status == "done")
+    )
+    if flt.skill:
+        stmt = stmt.where(Interview.skill == flt.skill)
+    if flt.question_id is not None:
+        stmt = stmt.where(InterviewAnswer.question_id == flt.question_id)
+    if flt.interview_ids:
+        stmt = stmt.where(InterviewAnswer.interview_id.in_(flt.interview_ids))
+    if flt.completed_from:
+        stmt = stmt.where(Interview.completed_at >= flt.completed_from)
+    if flt.completed_to:
+        stmt = stmt.where(Interview.completed_at < flt.completed_to)
+    return stmt.order_by(InterviewAnswer.id)
+
+
+def _stale_rows(chunk, force):
+    """The chunk's answers to re-score as score_rows tuples, their new
+    fingerprints and the interviews they belong to."""
+    rows, prints, interview_ids = [], {}, set()
+    for a_id, interview_id, q_id, text, stored, file_text in chunk:
+        answer = answer_for(q_id, scored_text(text, file_text))
+        new = fingerprint(answer)
+        if new == stored and not force:
+            continue
+        rows.append((a_id, *answer))
+        prints[a_id] = new
+        interview_ids.add(interview_id)
+    return rows, prints, interview_ids
+
+
+def _submit(pool, rows, parts):
+    if not rows:
+        return []
+    if pool is None:
+        return [score_rows(rows)]
+    size = -(-len(rows) // parts)
+    return [pool.submit(score_rows, rows[i:i + size]) for i in range(0, len(rows), size)]
+
+
+def run_bulk_evaluation(db, flt: BulkEvaluationRequest):
+    chunk_size = max(1, flt.chunk_size)
+    stmt = _answers_query(flt)
+    pool = scoring_pool.get()
+    started = time.perf_counter()
+    answers_scored = answers_unchanged = result_writes = chunks = 0
+    last_id = 0
+
+    def fetch():
+        return db.execute(stmt.where(InterviewAnswer.id > last_id).limit(chunk_size)).all()
+
+    chunk = fetch()
+    while chunk:
+        last_id = chunk[-1][0]
+        rows, prints, interview_ids = _stale_rows(chunk, flt.force)
+        pending = _submit(pool, rows, BULK_PROCESSES or 1)
+        # read the next chunk while the pool scores this one
+        next_chunk = fetch() if len(chunk) == chunk_size else []
+        scored = []
+        for part in pending:
+            scored.extend(part if pool is None else part.result())
+        if scored:
+            db.execute(update(InterviewAnswer), [
+                {"id": a_id, "score": score, "scored": True, "evaluator_notes": notes,
+                 "score_fingerprint": prints[a_id]}
+                for a_id, score, notes in scored
+            ])
+            result_writes += refresh_results(db, sorted(interview_ids))
+            publish(db, INTERVIEW_CHANGED, sorted(interview_ids))
+            db.commit()
+            recent_writes.mark(interview_ids)
+        answers_scored += len(scored)
+        answers_unchanged += len(chunk) - len(scored)
+        chunks += 1
+        elapsed = time.perf_counter() - started
+        log.info("bulk evaluation: chunk %d, %d answers in %.1fs (%.0f answers/sec)",
+                 chunks, answers_scored, elapsed, answers_scored / elapsed if elapsed else 0.0)
+        chunk = next_chunk
+
+    elapsed = time.perf_counter() - started
+    return {
+        "answers_scored": answers_scored,
+        "answers_unchanged": answers_unchanged,
+        # an interview whose answers span several chunks is counted once per chunk
+        "result_writes": result_writes,
+        "chunks": chunks,
+        "elapsed_seconds": round(elapsed, 3),
+        "answers_per_sec": round(answers_scored / elapsed, 1) if elapsed else 0.0,
+    }
@@ -0,0 +1,163 @@
+# fastapi_service/engines.py
+# Scoring engines. An engine scores a batch of answers at once and returns a
+# (score, notes) pair per answer; which engine scores an answer is chosen by
+# the skill of its question (SCORING_ENGINES), falling back to SCORING_ENGINE.
+import hashlib
+import os
+import time
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+import numpy as np
+from scoring import compile_keywords
+from metrics import observe_scoring
+
+# default engine, and per-skill overrides as "skill=engine,skill=engine"
+SCORING_ENGINE = os.getenv("SCORING_ENGINE", "keyword")
+SCORING_ENGINES = os.getenv("SCORING_ENGINES", "")
+
+Answer = namedtuple("Answer", ["question_id", "skill", "answer_text", "expected_keywords", "reference_answer"],
+                    defaults=(None,))
+
+ENGINES = {}
+
+
+def register_engine(cls):
+    ENGINES[cls.name] = cls
+    return cls
+
+
+class ScoringEngine:
+    """Scores answers in batches; subclasses implement score_batch.
+
+    `version` is part of what a stored score depends on, so bump it whenever
+    an engine's scores change for the same input.
+    """
+
+    name = None
+    version = "1"
+
+    def prepare(self, questions):
+        """Precompute per-question state from the question bank; called at startup."""
+
+    def score_batch(self, answers: Sequence[Answer]) -> List[Tuple[float, str]]:
+        raise NotImplementedError
+
+
+@register_engine
+class KeywordEngine(ScoringEngine):
+    """The keyword heuristic of score_answer_text, computed for a whole batch.
+
+    Answers are grouped by question; each group yields a boolean
+    answers x keywords hit matrix (with up to SCAN_MAX_KEYWORDS keywords,
+    KeywordMatcher.hit_matrix scans the group's answers together, one pass
+    per keyword), and the keyword
+    fractions and length bonuses of the batch are then computed as arrays.
+    Scores and notes are identical to score_answer_text's.
+    """
+
+    name = "keyword"
+
+    def score_batch(self, answers):
+        n = len(answers)
+        matched = np.zeros(n)
+        totals = np.zeros(n)
+        lengths = np.fromiter((len(a.answer_text or "") for a in answers), dtype=float, count=n)
+
+        by_question = {}
+        for i, a in enumerate(answers):
+            if a.answer_text and a.expected_keywords:
+                by_question.setdefault((a.question_id, a.expected_keywords), []).append(i)
+        for (question_id, expected_keywords), rows in by_question.items():
+            matcher = compile_keywords(question_id, expected_keywords)
+            if not matcher.keywords:
+                continue
+            hits = matcher.hit_matrix([answers[i].answer_text for i in rows])
+            matched[rows] = hits.sum(axis=1)
+            totals[rows] = len(matcher.keywords)
+
+        keyword_scores = np.divide(matched, totals, out=np.zeros(n), where=totals > 0) * 70.0
+        # length bonus: normalize to 0..30 (answers > 200 chars get full)
+        length_bonuses = np.minimum(30.0, (lengths / 200.0) * 30.0)
+        scores = keyword_scores + length_bonuses
+
+        out = []
+        # plain Python floats from here on: indexing numpy arrays per element is slow
+        for a, score, bonus, hit, total in zip(answers, scores.tolist(), length_bonuses.tolist(),
+                                               matched.tolist(), totals.tolist()):
+            if not a.answer_text:
+                out.append((0.0, "Empty answer"))
+                continue
+            length_note = f"length_bonus={round(bonus, 2)}"
+            if total:
+                notes = f"{int(hit)}/{int(total)} keywords matched; {length_note}"
+            else:
+                notes = length_note
+            out.append((round(score, 2), notes))
+        return out
+
+
+@lru_cache(maxsize=None)
+def get_engine(name):
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown scoring engine {name!r} (available: {', '.join(sorted(ENGINES))})")
+
+
+@lru_cache(maxsize=1)
+def _skill_engines():
+    pairs = (item.split("=", 1) for item in SCORING_ENGINES.split(",") if item.strip())
+    return {skill.strip(): name.strip() for skill, name in pairs}
+
+
+def prepare_engines(questions):
+    """Instantiate and prepare every configured engine; a typo fails at startup, not mid-request."""
+    for name in {SCORING_ENGINE, *_skill_engines().values()}:
+        get_engine(name).prepare(questions)
+
+
+def engine_for(skill):
+    return get_engine(_skill_engines().get(skill, SCORING_ENGINE))
+
+
+def fingerprint(answer: Answer):
+    """Hash of everything an answer's score depends on: the engine that scores
+    it (name and version), the answer text, the expected keywords and the
+    reference answer. An unchanged fingerprint means the stored score stands."""
+    engine = engine_for(answer.skill)
+    h = hashlib.sha1()
+    for part in (engine.name, engine.version, answer.answer_text or "",
+                 answer.expected_keywords or "", answer.reference_answer or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def score_answers(answers: Sequence[Answer]) -> List[Tuple[float, str]]:
+    """Score answers with the engine of each answer's skill, in input order."""
+    groups = {}
+    for i, a in enumerate(answers):
+        groups.setdefault(engine_for(a.skill), []).append(i)
+    out = [None] * len(answers)
+    for engine, rows in groups.items():
+        start = time.perf_counter()
+        scored_batch = engine.score_batch([answers[i] for i in rows])
+        observe_scoring(engine.name, len(rows), time.perf_counter() - start)
+        for i, scored in zip(rows, scored_batch):
+            out[i] = scored
+    return out
+
+
+def score_rows(rows):
+    """Score (answer_id, question_id, skill, answer_text, expected_keywords, reference_answer) tuples.
+
+    Module-level so it can be shipped to a process pool; returns
+    (answer_id, score, notes) tuples in the same order.
+    """
+    scored = score_answers([Answer(*row[1:]) for row in rows])
+    return [(row[0], score, notes) for row, (score, notes) in zip(rows, scored)]
+
+
+# engines defined in their own modules register themselves on import
+import semantic  # noqa: E402,F401
@@ -0,0 +1,172 @@
+# fastapi_service/evaluation.py
+# Evaluating one interview: load its answers in one query, re-score the ones
+# whose fingerprint changed, write those back with one executemany UPDATE and
+# upsert the result row. Nothing is written when nothing changed.
+# The sync version serves the threadpool endpoints and the job workers; the
+# async version serves EVALUATOR_DB_MODE=async and keeps scoring off the loop.
+# An answer's uploaded file counts through the text flask_service extracted
+# from it (extracted_texts); while that is still pending the evaluation raises
+# ExtractionPending, which the job queue retries with backoff.
+import os
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from common.db import count_queries
+from common.notifications import publish, publish_async, INTERVIEW_CHANGED
+from common.question_bank import question_bank
+from common.read_routing import recent_writes
+from models import Interview, InterviewAnswer, InterviewResult, ExtractedText
+from results import verdict_for, upsert_results
+from engines import Answer, fingerprint, score_answers
+from events import publish_events
+
+
+# how long an evaluation waits for a pending extraction before scoring the
+# answer without its file (keep it within the job queue's retry span)
+EXTRACT_WAIT_SECONDS = float(os.getenv("EXTRACT_WAIT_SECONDS", "20"))
+
+
+class ExtractionPending(Exception):
+    """An answer file's text is still being extracted; evaluate again shortly."""
+
+
+def _answers_query(interview_id):
+    # the interview, its current result (if any) and all of its answers with
+    # their stored scores and the text of their files; keywords come from the
+    # in-memory question bank
+    return (
+        select(Interview.id, Interview.status, InterviewResult.id.label("result_id"),
+               InterviewAnswer.id.label("answer_id"), InterviewAnswer.question_id, InterviewAnswer.answer_text,
+               InterviewAnswer.score, InterviewAnswer.evaluator_notes, InterviewAnswer.score_fingerprint,
+               ExtractedText.status.label("file_status"), ExtractedText.text.label("file_text"),
+               ExtractedText.created_at.label("file_created_at"))
+        .outerjoin(InterviewAnswer, InterviewAnswer.interview_id == Interview.id)
+        .outerjoin(InterviewResult, InterviewResult.interview_id == Interview.id)
+        .outerjoin(ExtractedText, ExtractedText.file_ref == InterviewAnswer.uploaded_file_path)
+        .where(Interview.id == interview_id)
+        .order_by(InterviewAnswer.id)
+    )
+
+
+def scored_text(answer_text, file_text):
+    """What an answer is scored on: the typed text followed by its file's text."""
+    if not file_text:
+        return answer_text or ""
+    return f"{answer_text}\n{file_text}" if answer_text else file_text
+
+
+def file_text_for(db, file_ref):
+    if not file_ref:
+        return None
+    row = db.get(ExtractedText, file_ref)
+    return row.text if row else None
+
+
+def answer_for(question_id, answer_text):
+    """An engines.Answer with the question's skill, keywords and reference answer from the question bank."""
+    question = question_bank.get(question_id)
+    if question is None:
+        return Answer(question_id, None, answer_text or "", None)
+    return Answer(question_id, question.skill, answer_text or "", question.expected_keywords,
+                  question.reference_answer)
+
+
+def score_answer(question_id, answer_text, file_text=None):
+    """Score one answer; returns (score, notes, fingerprint)."""
+    answer = answer_for(question_id, scored_text(answer_text, file_text))
+    score, notes = score_answers([answer])[0]
+    return score, notes, fingerprint(answer)
+
+
+def score_interview(interview_id, rows):
+    """Re-score the answers of _answers_query whose fingerprint changed.
+
+    Returns (answer updates, result row, response, status events). The result
+    row is None when no answer changed and the interview already has its
+    result, i.e. there is nothing to write.
+    """
+    if not rows:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    answers = [r for r in rows if r.answer_id is not None]
+    if not answers:
+        raise HTTPException(status_code=400, detail="No answers submitted for this interview")
+
+    waiting_since = datetime.utcnow() - timedelta(seconds=EXTRACT_WAIT_SECONDS)
+    pending = [r.answer_id for r in answers if r.file_status == "pending" and r.file_created_at > waiting_since]
+    if pending:
+        raise ExtractionPending(f"text extraction pending for answers {pending}")
+
+    inputs = [answer_for(r.question_id, scored_text(r.answer_text, r.file_text)) for r in answers]
+    prints = [fingerprint(a) for a in inputs]
+    stale = [i for i, r in enumerate(answers) if r.score is None or r.score_fingerprint != prints[i]]
+    scores = [r.score for r in answers]
+    notes = [r.evaluator_notes for r in answers]
+    # one batch through the scoring engines, for the changed answers only
+    for i, (score, note) in zip(stale, score_answers([inputs[i] for i in stale])):
+        scores[i], notes[i] = score, note
+    updates = [{"id": answers[i].answer_id, "score": scores[i], "scored": True,
+                "evaluator_notes": notes[i], "score_fingerprint": prints[i]} for i in stale]
+
+    per_answer_results = [{"answer_id": r.answer_id, "question_id": r.question_id, "score": score, "notes": note}
+                          for r, score, note in zip(answers, scores, notes)]
+    # average score across answers, normalise to 100 (max per question we gave 100)
+    avg_score = round(sum(scores) / max(len(answers),1), 2)
+    verdict = verdict_for(avg_score)
+    response = {"interview_id": interview_id, "total_score": avg_score, "verdict": verdict,
+                "details": per_answer_results, "answers_rescored": len(stale)}
+    # for GET /interviews/{id}/events subscribers, sent on commit
+    events = [
+        {"interview_id": interview_id, "event": "answer_scored", "answer_id": answers[i].answer_id,
+         "question_id": answers[i].question_id, "score": scores[i]} for i in stale
+    ] + [{"interview_id": interview_id, "event": "done", "total_score": avg_score, "verdict": verdict,
+          "answers_rescored": len(stale)}]
+    if not stale and rows[0].result_id is not None and rows[0].status == "done":
+        return updates, None, response, events
+    result = {
+        "interview_id": interview_id,
+        "total_score": avg_score,
+        "verdict": verdict,
+        "details": per_answer_results,
+        "created_at": datetime.utcnow()
+    }
+    return updates, result, response, events
+
+
+def run_interview_evaluation(db, interview_id: int):
+    """Re-score the changed answers of an interview and write its result; commits on success."""
+    with count_queries() as counter:
+        rows = db.execute(_answers_query(interview_id)).all()
+        updates, result, response, events = score_interview(interview_id, rows)
+        if result is not None:
+            if updates:
+                # bulk UPDATE by primary key (one executemany)
+                db.execute(update(InterviewAnswer), updates)
+            # write interview_results (update if exists)
+            upsert_results(db, [result])
+            # mark interview status to done
+            db.execute(update(Interview).where(Interview.id == interview_id).values(status="done"))
+            publish(db, INTERVIEW_CHANGED, [interview_id])
+        publish_events(db, events)
+        db.commit()
+    recent_writes.mark([interview_id])
+    response["queries"] = counter["queries"]
+    return response
+
+
+async def run_interview_evaluation_async(db, interview_id: int):
+    with count_queries() as counter:
+        rows = (await db.execute(_answers_query(interview_id))).all()
+        updates, result, response, events = await run_in_threadpool(score_interview, interview_id, rows)
+        if result is not None:
+            if updates:
+                await db.execute(update(InterviewAnswer), updates)
+            # the sync writer on the session's greenlet, so the leaderboard update is shared
+            await db.run_sync(upsert_results, [result])
+            await db.execute(update(Interview).where(Interview.id == interview_id).values(status="done"))
+            await publish_async(db, INTERVIEW_CHANGED, [interview_id])
+        await db.run_sync(publish_events, events)
+        await db.commit()
+    recent_writes.mark([interview_id])
+    response["queries"] = counter["queries"]
+    return response
@@ -0,0 +1,158 @@
+# fastapi_service/events.py
+# Interview status events (queued, evaluating, answer_scored, done, failed)
+# pushed to GET /interviews/{id}/events subscribers as server-sent events.
+#
+# Events are published on the session of the write they describe and only
+# go out when it commits. On Postgres they travel as pg_notify on
+# INTERVIEW_EVENTS, so a subscriber connected to any process hears about
+# work done in every other one; each process's NotificationListener hands
+# them to the local broker. On other databases delivery is in-process.
+import asyncio
+import json
+import os
+import threading
+from sqlalchemy import event, select, text, true
+from sqlalchemy.orm import Session
+from models import Interview, InterviewResult, EvaluationJob
+
+INTERVIEW_EVENTS = "interview_events"
+TERMINAL_EVENTS = ("done", "failed")
+# comment line sent to idle subscribers so proxies and clients keep the stream open
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+_NOTIFY_MANY = text("SELECT pg_notify(:channel, p) FROM unnest(CAST(:payloads AS text[])) AS p")
+
+
+class EventBroker:
+    """Fans events out to the asyncio queues of this process's subscribers."""
+
+    def __init__(self):
+        self._subscribers = {}  # interview_id -> set of (loop, queue)
+        self._lock = threading.Lock()
+
+    def subscribe(self, interview_id):
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(interview_id, set()).add(entry)
+        return entry
+
+    def unsubscribe(self, interview_id, entry):
+        with self._lock:
+            subscribers = self._subscribers.get(interview_id)
+            if subscribers is not None:
+                subscribers.discard(entry)
+                if not subscribers:
+                    del self._subscribers[interview_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def dispatch(self, message):
+        # called from any thread: workers, the notification listener, request threads
+        with self._lock:
+            subscribers = list(self._subscribers.get(message["interview_id"], ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                pass  # the subscriber's loop is closed
+
+    def dispatch_payload(self, payload):
+        self.dispatch(json.loads(payload))
+
+
+broker = EventBroker()
+
+
+def publish_events(db, messages):
+    """Queue events ({"interview_id", "event", ...}) on the session's transaction; sent on commit."""
+    if not messages:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # one statement however many events (NOTIFY payloads are limited to 8000 bytes)
+        db.execute(_NOTIFY_MANY, {"channel": INTERVIEW_EVENTS,
+                                  "payloads": [json.dumps(m) for m in messages]})
+    else:
+        db.info.setdefault("pending_events", []).extend(messages)
+
+
+def publish_event(db, interview_id, kind, **data):
+    publish_events(db, [{"interview_id": interview_id, "event": kind, **data}])
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session):
+    for message in session.info.pop("pending_events", ()):
+        broker.dispatch(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop("pending_events", None)
+
+
+def interview_snapshot(db, interview_id):
+    """The interview's current state as an event, or None if it does not exist."""
+    latest_job = (
+        select(EvaluationJob.status, EvaluationJob.attempts, EvaluationJob.last_error)
+        .where(EvaluationJob.interview_id == interview_id)
+        .order_by(EvaluationJob.id.desc()).limit(1).subquery()
+    )
+    row = db.execute(
+        select(Interview.status, InterviewResult.total_score, InterviewResult.verdict,
+               latest_job.c.status.label("job_status"), latest_job.c.attempts, latest_job.c.last_error)
+        .outerjoin(InterviewResult, InterviewResult.interview_id == Interview.id)
+        .outerjoin(latest_job, true())
+        .where(Interview.id == interview_id)
+    ).first()
+    if row is None:
+        return None
+    message = {"interview_id": interview_id}
+    # "done" before "running": the evaluation commits its result just before
+    # the worker marks the job finished
+    if row.job_status == "queued":
+        message.update(event="queued", attempts=row.attempts)
+    elif row.status == "done" and row.total_score is not None:
+        message.update(event="done", total_score=row.total_score, verdict=row.verdict)
+    elif row.job_status == "running":
+        message.update(event="evaluating", attempt=row.attempts)
+    elif row.job_status == "failed":
+        message.update(event="failed", error=row.last_error)
+    else:
+        message.update(event="status", status=row.status)
+    return message
+
+
+def format_event(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+
+async def stream_events(interview_id, snapshot):
+    """SSE body: the state from `await snapshot()`, then live events until done or failed.
+
+    Subscribes before taking the snapshot so nothing that happens in between
+    is missed; a terminal snapshot ends the stream at once. While idle the
+    snapshot is re-read every EVENTS_KEEPALIVE_SECONDS.
+    """
+    entry = broker.subscribe(interview_id)
+    try:
+        message = await snapshot()
+        yield format_event(message)
+        if message["event"] in TERMINAL_EVENTS:
+            return
+        while True:
+            try:
+                message = await asyncio.wait_for(entry[1].get(), EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # re-check while idle: a notification sent while the listener
+                # was reconnecting is lost
+                message = await snapshot()
+                if message["event"] not in TERMINAL_EVENTS:
+                    yield ": keepalive\n\n"
+                    continue
+            yield format_event(message)
+            if message["event"] in TERMINAL_EVENTS:
+                return
+    finally:
+        broker.unsubscribe(interview_id, entry)
@@ -0,0 +1,161 @@
+# fastapi_service/export.py
+# Streaming exports of interview results and answers as CSV, NDJSON or Parquet
+# (GET /export/results, GET /export/answers). Rows come from a server-side
+# cursor (yield_per, which turns on stream_results) EXPORT_BATCH_SIZE at a
+# time, and each batch is encoded and handed to the response before the next
+# one is fetched, so memory is bounded by the batch size however many rows
+# match. Parquet needs the optional pyarrow; every batch becomes a row group.
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import select
+from common.read_routing import read_session
+from models import Interview, InterviewAnswer, InterviewResult
+from metrics import EXPORT_ROWS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet exports are then refused
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+# dataset: [(output column, selected expression, parquet type)]
+COLUMNS = {
+    "results": [
+        ("interview_id", InterviewResult.interview_id, "int"),
+        ("candidate_id", Interview.candidate_id, "int"),
+        ("skill", Interview.skill, "str"),
+        ("total_score", InterviewResult.total_score, "float"),
+        ("verdict", InterviewResult.verdict, "str"),
+        ("completed_at", Interview.completed_at, "time"),
+        ("evaluated_at", InterviewResult.created_at, "time"),
+    ],
+    "answers": [
+        ("answer_id", InterviewAnswer.id, "int"),
+        ("interview_id", InterviewAnswer.interview_id, "int"),
+        ("candidate_id", Interview.candidate_id, "int"),
+        ("skill", Interview.skill, "str"),
+        ("question_id", InterviewAnswer.question_id, "int"),
+        ("answer_text", InterviewAnswer.answer_text, "str"),
+        ("uploaded_file_path", InterviewAnswer.uploaded_file_path, "str"),
+        ("score", InterviewAnswer.score, "float"),
+        ("evaluator_notes", InterviewAnswer.evaluator_notes, "str"),
+        ("verdict", InterviewResult.verdict, "str"),
+        ("completed_at", Interview.completed_at, "time"),
+    ],
+}
+
+
+class ExportFilter(BaseModel):
+    skill: Optional[str] = None
+    verdict: Optional[str] = None
+    completed_from: Optional[datetime] = None
+    completed_to: Optional[datetime] = None
+
+
+def _export_query(dataset, flt: ExportFilter):
+    stmt = select(*(expr for _, expr, _ in COLUMNS[dataset]))
+    if dataset == "results":
+        stmt = stmt.join(Interview, Interview.id == InterviewResult.interview_id)
+        order = InterviewResult.id
+    else:
+        stmt = (stmt.join(Interview, Interview.id == InterviewAnswer.interview_id)
+                .outerjoin(InterviewResult, InterviewResult.interview_id == InterviewAnswer.interview_id))
+        order = InterviewAnswer.id
+    if flt.skill:
+        stmt = stmt.where(Interview.skill == flt.skill)
+    if flt.verdict:
+        stmt = stmt.where(InterviewResult.verdict == flt.verdict)
+    if flt.completed_from:
+        stmt = stmt.where(Interview.completed_at >= flt.completed_from)
+    if flt.completed_to:
+        stmt = stmt.where(Interview.completed_at < flt.completed_to)
+    return stmt.order_by(order)
+
+
+def _batches(dataset, fmt, flt):
+    # the session lives as long as the response body: it is opened by the
+    # first chunk, not by the endpoint. Exports read the replica when there is one
+    with read_session() as db:
+        result = db.execute(_export_query(dataset, flt).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            EXPORT_ROWS.labels(dataset, fmt).inc(len(rows))
+            yield rows
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv(names, batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(names)
+    for rows in batches:
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()  # header only: nothing matched
+
+
+def _ndjson(names, batches):
+    for rows in batches:
+        yield "".join(json.dumps(dict(zip(names, map(_plain, row)))) + "\n" for row in rows).encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink for the Parquet writer whose bytes are taken after each row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet(columns, batches):
+    types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "str": pyarrow.string(),
+             "time": pyarrow.timestamp("us")}
+    schema = pyarrow.schema([(name, types[kind]) for name, _, kind in columns])
+    sink = _Drain()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    for rows in batches:
+        writer.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)], schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+def stream_export(dataset, fmt, flt: ExportFilter):
+    """The encoded export as an iterator of byte chunks (lazy: no query runs until it is iterated)."""
+    columns = COLUMNS[dataset]
+    batches = _batches(dataset, fmt, flt)
+    if fmt == "parquet":
+        return _parquet(columns, batches)
+    names = [name for name, _, _ in columns]
+    return _csv(names, batches) if fmt == "csv" else _ndjson(names, batches)
@@ -0,0 +1,41 @@
+# fastapi_service/gunicorn.conf.py
+# gunicorn settings for the evaluator, with uvicorn workers (run from this
+# directory, with the repo root on PYTHONPATH for common/):
+#
+#   PYTHONPATH=.. python prestart.py
+#   PYTHONPATH=.. gunicorn -c gunicorn.conf.py main:app
+#
+# The app is imported once in the master and the workers are forked from it;
+# each worker then runs the startup event (question index, engines, job
+# workers, notification listener) on its own.
+import multiprocessing
+import os
+import shutil
+
+bind = f"{os.getenv('FASTAPI_HOST', '0.0.0.0')}:{os.getenv('FASTAPI_PORT', '8000')}"
+workers = int(os.getenv("FASTAPI_WEB_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("FASTAPI_WEB_TIMEOUT", "60"))
+preload_app = True
+
+# samples left by a previous run would be added to this one's; cleared here
+# because the config is read before the app (and its metrics) is imported
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def post_fork(server, worker):
+    from common.db import dispose_after_fork
+    from models import async_engine, async_read_engine, async_replica_engine
+    # connections the master may have opened belong to the master
+    dispose_after_fork()
+    for target in (async_engine, async_read_engine, async_replica_engine):
+        if target is not None:
+            target.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
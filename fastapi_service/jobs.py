@@ -0,0 +1,218 @@
+# fastapi_service/jobs.py
+# Durable evaluation job queue: jobs live in the evaluation_jobs table and are
+# picked up by a pool of worker threads, so callers never wait on scoring.
+import os
+import threading
+import logging
+import traceback
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select, update, or_, and_, exists
+from common.db import SessionLocal
+from common.retry import backoff_delay
+from models import EvaluationJob, Interview
+from events import publish_event
+
+log = logging.getLogger(__name__)
+
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("EVAL_JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("EVAL_JOB_BACKOFF_SECONDS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("EVAL_JOB_POLL_SECONDS", "0.5"))
+# a job still "running" after this long belongs to a worker that died; retry it
+JOB_LEASE_SECONDS = float(os.getenv("EVAL_JOB_LEASE_SECONDS", "300"))
+# completions the Flask service could not hand over (evaluator down, circuit
+# open) are found by a periodic sweep; the grace period leaves time for the
+# normal enqueue call to land first
+JOB_SWEEP_SECONDS = float(os.getenv("EVAL_JOB_SWEEP_SECONDS", "30"))
+JOB_SWEEP_GRACE_SECONDS = float(os.getenv("EVAL_JOB_SWEEP_GRACE_SECONDS", "10"))
+
+
+def enqueue_job(db, interview_id):
+    # a job that is still waiting will pick up the latest answers anyway
+    job = db.query(EvaluationJob).filter(
+        EvaluationJob.interview_id == interview_id,
+        EvaluationJob.status == "queued"
+    ).first()
+    if job:
+        return job
+    job = EvaluationJob(interview_id=interview_id, status="queued", attempts=0,
+                        max_attempts=JOB_MAX_ATTEMPTS, next_run_at=datetime.utcnow())
+    db.add(job)
+    db.flush()
+    publish_event(db, interview_id, "queued", job_id=job.id, attempts=0)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def enqueue_deferred(db, limit=500):
+    """Enqueue completed interviews that have no job since they were completed."""
+    has_job = exists().where(EvaluationJob.interview_id == Interview.id,
+                             EvaluationJob.created_at >= Interview.completed_at)
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_SWEEP_GRACE_SECONDS)
+    interview_ids = db.scalars(
+        select(Interview.id)
+        .where(Interview.status == "completed", Interview.completed_at <= cutoff, ~has_job)
+        .order_by(Interview.completed_at)
+        .limit(limit)
+    ).all()
+    db.rollback()
+    for interview_id in interview_ids:
+        enqueue_job(db, interview_id)
+    return len(interview_ids)
+
+
+def job_to_dict(job):
+    return {
+        "job_id": job.id,
+        "interview_id": job.interview_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "next_run_at": job.next_run_at.isoformat() if job.next_run_at else None,
+        "last_error": job.last_error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def claim_job(db):
+    """Atomically move one due job to "running" and return (id, interview_id, attempts, started_at).
+
+    attempts and started_at identify this claim: a worker that outlives its
+    lease finds them changed once another worker has reclaimed the job.
+    """
+    now = datetime.utcnow()
+    due = or_(
+        and_(EvaluationJob.status == "queued", EvaluationJob.next_run_at <= now),
+        and_(EvaluationJob.status == "running",
+             EvaluationJob.started_at < now - timedelta(seconds=JOB_LEASE_SECONDS)),
+    )
+    row = db.execute(
+        select(EvaluationJob.id, EvaluationJob.interview_id, EvaluationJob.status, EvaluationJob.attempts)
+        .where(due)
+        .order_by(EvaluationJob.next_run_at, EvaluationJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if not row:
+        db.rollback()
+        return None
+    # conditional update so two workers can never both claim the same job
+    claimed = db.execute(
+        update(EvaluationJob)
+        .where(EvaluationJob.id == row.id, EvaluationJob.status == row.status,
+               EvaluationJob.attempts == row.attempts)
+        .values(status="running", attempts=row.attempts + 1, started_at=now)
+    ).rowcount
+    if claimed == 1:
+        publish_event(db, row.interview_id, "evaluating", job_id=row.id, attempt=row.attempts + 1)
+    db.commit()
+    if claimed != 1:
+        return None
+    return row.id, row.interview_id, row.attempts + 1, now
+
+
+def _held(job_id, attempt, started_at):
+    # the job is still running under the claim (attempt, started_at)
+    return and_(EvaluationJob.id == job_id, EvaluationJob.status == "running",
+                EvaluationJob.attempts == attempt, EvaluationJob.started_at == started_at)
+
+
+class JobWorkerPool:
+    def __init__(self, evaluate, workers=EVAL_WORKERS):
+        # evaluate(db, interview_id) does the scoring and commits its own writes
+        self.evaluate = evaluate
+        self.workers = workers
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"eval-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        if self.workers:
+            t = threading.Thread(target=self._sweep, name="eval-sweeper", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception:
+                traceback.print_exc()
+                worked = False
+            if not worked:
+                self._stop.wait(JOB_POLL_SECONDS)
+
+    def _sweep(self):
+        while not self._stop.wait(JOB_SWEEP_SECONDS):
+            try:
+                with SessionLocal() as db:
+                    enqueue_deferred(db)
+            except Exception:
+                traceback.print_exc()
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            claimed = claim_job(db)
+            if not claimed:
+                return False
+            job_id, interview_id, attempt, started_at = claimed
+            try:
+                self.evaluate(db, interview_id)
+            except HTTPException as e:
+                # missing interview / no answers: retrying will not help
+                db.rollback()
+                self._finish(db, claimed, "failed", error=str(e.detail))
+            except Exception as e:
+                db.rollback()
+                self._retry_or_fail(db, claimed, f"{type(e).__name__}: {e}")
+            else:
+                self._finish(db, claimed, "done")
+            return True
+        finally:
+            db.close()
+
+    def _settle(self, db, claimed, **values):
+        # write the job's next state only while this worker still holds it
+        job_id, interview_id, attempt, started_at = claimed
+        updated = db.execute(update(EvaluationJob).where(_held(job_id, attempt, started_at)).values(**values)).rowcount
+        if updated != 1:
+            db.rollback()
+            log.warning("job %d was reclaimed after its lease expired; dropping attempt %d's outcome",
+                        job_id, attempt)
+        return updated == 1
+
+    def _finish(self, db, claimed, status, error=None):
+        job_id, interview_id = claimed[:2]
+        if not self._settle(db, claimed, status=status, last_error=error, finished_at=datetime.utcnow()):
+            return
+        if status == "failed":
+            # "done" was published by the evaluation itself
+            publish_event(db, interview_id, "failed", job_id=job_id, error=error)
+        db.commit()
+
+    def _retry_or_fail(self, db, claimed, error):
+        job_id, interview_id, attempt = claimed[:3]
+        max_attempts = db.scalar(select(EvaluationJob.max_attempts).where(EvaluationJob.id == job_id))
+        if attempt >= max_attempts:
+            self._finish(db, claimed, "failed", error=error)
+            return
+        if not self._settle(db, claimed, status="queued", last_error=error,
+                            next_run_at=datetime.utcnow() + timedelta(seconds=backoff_delay(JOB_BACKOFF_SECONDS, attempt - 1))):
+            return
+        publish_event(db, interview_id, "queued", job_id=job_id, attempts=attempt, error=error)
+        db.commit()
@@ -0,0 +1,184 @@
+# fastapi_service/leaderboard.py
+# Per-skill leaderboard and score statistics, maintained incrementally.
+#
+# Every interview_results write also upserts the interview's leaderboard entry
+# and moves it between score buckets (one row per skill and whole point of
+# score, holding a count and the sum of the scores in it). Top-K reads the
+# (skill, total_score) index. Rank and percentiles add up at most 101 bucket
+# rows of one skill, then finish inside one bucket with a short range of the
+# same index; none of the reads scan the results table.
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import case, func, select
+from models import Interview, LeaderboardEntry, SkillScoreBucket
+from results import verdict_for
+
+
+def score_bucket(score):
+    # whole points: 87.25 -> 87 (scores carry two decimals; going through the
+    # rounded centi-score keeps 0.29 * 100 == 28.999... out of the wrong bucket)
+    return int(round(score * 100)) // 100
+
+
+def _bucket_range(bucket):
+    # the scores of a bucket, with half a centi-point of slack on each side
+    return (bucket * 100 - 0.5) / 100, (bucket * 100 + 99.5) / 100
+
+
+def _insert(dialect_name):
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+def update_leaderboard(db, rows):
+    """Apply interview_results rows (as written by upsert_results) to the leaderboard."""
+    dialect_name = db.get_bind().dialect.name
+    stmt = (
+        select(Interview.id, Interview.skill, Interview.candidate_id,
+               LeaderboardEntry.skill.label("old_skill"), LeaderboardEntry.total_score.label("old_score"))
+        .outerjoin(LeaderboardEntry, LeaderboardEntry.interview_id == Interview.id)
+        .where(Interview.id.in_(sorted(r["interview_id"] for r in rows)))
+        .order_by(Interview.id)
+    )
+    if dialect_name == "postgresql":
+        # concurrent evaluations of one interview must not both move it out of
+        # the same old bucket
+        stmt = stmt.with_for_update(of=Interview)
+    current = {r.id: r for r in db.execute(stmt)}
+
+    now = datetime.utcnow()
+    entries, deltas, sums = [], Counter(), Counter()
+    for row in rows:
+        iv = current.get(row["interview_id"])
+        if iv is None or iv.skill is None:
+            continue
+        if iv.old_score == row["total_score"] and iv.old_skill == iv.skill:
+            continue
+        if iv.old_score is not None:
+            old = (iv.old_skill, score_bucket(iv.old_score))
+            deltas[old] -= 1
+            sums[old] -= iv.old_score
+        new = (iv.skill, score_bucket(row["total_score"]))
+        deltas[new] += 1
+        sums[new] += row["total_score"]
+        entries.append({"interview_id": iv.id, "skill": iv.skill, "candidate_id": iv.candidate_id,
+                        "total_score": row["total_score"], "updated_at": now})
+    if not entries:
+        return 0
+
+    # executemany rather than one multi-row VALUES: the statement compiles
+    # once and stays in the compiled cache whatever the batch size
+    insert = _insert(dialect_name)
+    stmt = insert(LeaderboardEntry)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[LeaderboardEntry.interview_id],
+        set_={k: stmt.excluded[k] for k in ("skill", "candidate_id", "total_score", "updated_at")},
+    ), entries)
+    # a score moving inside its bucket changes only the sum
+    changes = [{"skill": skill, "bucket": bucket, "count": n, "score_sum": sums[(skill, bucket)]}
+               for (skill, bucket), n in sorted(deltas.items()) if n or sums[(skill, bucket)]]
+    if changes:
+        stmt = insert(SkillScoreBucket)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[SkillScoreBucket.skill, SkillScoreBucket.bucket],
+            set_={"count": SkillScoreBucket.count + stmt.excluded["count"],
+                  "score_sum": SkillScoreBucket.score_sum + stmt.excluded["score_sum"]},
+        ), changes)
+    return len(entries)
+
+
+def top(db, skill, limit):
+    """The best `limit` entries of a skill with their (competition) rank."""
+    rows = db.execute(
+        select(LeaderboardEntry.interview_id, LeaderboardEntry.candidate_id, LeaderboardEntry.total_score)
+        .where(LeaderboardEntry.skill == skill)
+        .order_by(LeaderboardEntry.total_score.desc(), LeaderboardEntry.interview_id.desc())
+        .limit(limit)
+    ).all()
+    out = []
+    for i, r in enumerate(rows):
+        rank = out[-1]["rank"] if out and out[-1]["total_score"] == r.total_score else i + 1
+        out.append({"rank": rank, "interview_id": r.interview_id, "candidate_id": r.candidate_id,
+                    "total_score": r.total_score, "verdict": verdict_for(r.total_score)})
+    return out
+
+
+def rank_of(db, skill, candidate_id=None, interview_id=None):
+    """Rank of an interview, or of a candidate's best interview, within a skill; None if absent."""
+    stmt = select(LeaderboardEntry.interview_id, LeaderboardEntry.candidate_id, LeaderboardEntry.total_score) \
+        .where(LeaderboardEntry.skill == skill)
+    if interview_id is not None:
+        stmt = stmt.where(LeaderboardEntry.interview_id == interview_id)
+    else:
+        stmt = stmt.where(LeaderboardEntry.candidate_id == candidate_id) \
+            .order_by(LeaderboardEntry.total_score.desc()).limit(1)
+    entry = db.execute(stmt).first()
+    if entry is None:
+        return None
+    bucket = score_bucket(entry.total_score)
+    above, total = db.execute(
+        select(func.coalesce(func.sum(case((SkillScoreBucket.bucket > bucket, SkillScoreBucket.count), else_=0)), 0),
+               func.coalesce(func.sum(SkillScoreBucket.count), 0))
+        .where(SkillScoreBucket.skill == skill)
+    ).one()
+    # higher scores that share the entry's bucket
+    above += db.execute(
+        select(func.count()).select_from(LeaderboardEntry)
+        .where(LeaderboardEntry.skill == skill, LeaderboardEntry.total_score > entry.total_score,
+               LeaderboardEntry.total_score < _bucket_range(bucket)[1])
+    ).scalar()
+    return {"skill": skill, "interview_id": entry.interview_id, "candidate_id": entry.candidate_id,
+            "total_score": entry.total_score, "rank": above + 1, "out_of": total,
+            "top_percent": round(100.0 * (above + 1) / total, 2) if total else None}
+
+
+def skill_stats(db, skill, percentiles=(25, 50, 75, 90, 99)):
+    """Count, mean, min/max, percentiles and verdict distribution of a skill's scores."""
+    buckets = db.execute(
+        select(SkillScoreBucket.bucket, SkillScoreBucket.count, SkillScoreBucket.score_sum)
+        .where(SkillScoreBucket.skill == skill, SkillScoreBucket.count > 0)
+        .order_by(SkillScoreBucket.bucket)
+    ).all()
+    buckets = [tuple(b) for b in buckets]
+    count = sum(n for _, n, _ in buckets)
+    if not count:
+        return None
+    # verdict thresholds fall on bucket boundaries
+    verdicts = Counter()
+    for bucket, n, _ in buckets:
+        verdicts[verdict_for(bucket)] += n
+
+    def nth(bucket, n):
+        # the n-th lowest score (from 0) inside one bucket
+        low, high = _bucket_range(bucket)
+        return (
+            select(LeaderboardEntry.total_score)
+            .where(LeaderboardEntry.skill == skill, LeaderboardEntry.total_score > low,
+                   LeaderboardEntry.total_score < high)
+            .order_by(LeaderboardEntry.total_score).offset(n).limit(1)
+            .scalar_subquery()
+        )
+
+    # nearest-rank percentiles: walk the cumulative counts to the bucket, then
+    # read the exact scores from the index, all in one statement
+    targets = sorted((max(1, -(-p * count // 100)), p) for p in percentiles)
+    lookups = {"min": nth(buckets[0][0], 0), "max": nth(buckets[-1][0], buckets[-1][1] - 1)}
+    seen, t = 0, 0
+    for bucket, n, _ in buckets:
+        while t < len(targets) and targets[t][0] <= seen + n:
+            lookups[f"p{targets[t][1]}"] = nth(bucket, targets[t][0] - seen - 1)
+            t += 1
+        seen += n
+    values = db.execute(select(*(q.label(k) for k, q in lookups.items()))).one()._asdict()
+    return {
+        "skill": skill,
+        "count": count,
+        "mean": round(sum(total for _, _, total in buckets) / count, 2),
+        "min": values.pop("min"),
+        "max": values.pop("max"),
+        "percentiles": values,
+        "verdicts": {v: verdicts.get(v, 0) for v in ("pass", "consider", "fail")},
+    }
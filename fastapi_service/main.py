@@ -1,137 +1,225 @@
 # fastapi_service/main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from models import SessionLocal, InterviewAnswer, InterviewQuestion, InterviewResult, Interview
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from common.db import get_db, session_scope, pool_status, engine
+from common.notifications import NotificationListener, INTERVIEW_CHANGED, QUESTION_BANK_CHANGED
+from common.question_bank import question_bank
+from common.read_routing import get_read_db, read_session, recent_writes
+from models import (async_engine, async_read_engine, async_replica_engine, EVALUATOR_DB_MODE,
+                    InterviewAnswer, InterviewResult, InterviewResultDetail, Interview, EvaluationJob)
+from evaluation import run_interview_evaluation, score_answer, file_text_for, ExtractionPending
+from engines import prepare_engines
+from jobs import JobWorkerPool, enqueue_job, job_to_dict
+from events import INTERVIEW_EVENTS, broker, interview_snapshot, stream_events
+from bulk import BulkEvaluationRequest, run_bulk_evaluation, scoring_pool
+import export
+import leaderboard
+import metrics
+import results
 from typing import Optional
-from datetime import datetime
-import json
+import logging
+import os
+import time
 
 app = FastAPI(title="Evaluator Service")
+app.add_middleware(metrics.MetricsMiddleware)
 
-# Simple scoring heuristic:
-# - If expected_keywords exists, score = fraction of keywords present * 70
-# - Plus a length bonus (answer length normalized) up to 30 points
-# final score in [0,100]
-
-def score_answer_text(answer_text: str, expected_keywords: Optional[str]):
-    if not answer_text:
-        return 0.0, "Empty answer"
-    score = 0.0
-    notes = []
-    # keyword match
-    if expected_keywords:
-        expected = [k.strip().lower() for k in expected_keywords.split(",") if k.strip()]
-        matched = 0
-        ans_lower = answer_text.lower()
-        for k in expected:
-            if k and k in ans_lower:
-                matched += 1
-        if expected:
-            kw_score = (matched / len(expected)) * 70.0
-            notes.append(f"{matched}/{len(expected)} keywords matched")
-        else:
-            kw_score = 0.0
-    else:
-        kw_score = 0.0
-
-    # length bonus: normalize to 0..30 (answers > 200 chars get full)
-    length = len(answer_text)
-    length_bonus = min(30.0, (length / 200.0) * 30.0)
-    score = kw_score + length_bonus
-    notes.append(f"length_bonus={round(length_bonus,2)}")
-    return round(score,2), "; ".join(notes)
-
-@app.post("/evaluate/answer")
-def evaluate_answer(answer_id: int):
-    db = SessionLocal()
+@app.exception_handler(ExtractionPending)
+def extraction_pending(request, exc):
+    # an answer file is still being extracted by flask_service
+    return JSONResponse(status_code=409, content={"detail": str(exc)}, headers={"Retry-After": "2"})
+
+# evaluate_answer / evaluate_interview / get_results; replaced by the
+# async_routes versions when EVALUATOR_DB_MODE=async
+sync_router = APIRouter()
+
+@sync_router.post("/evaluate/answer")
+def evaluate_answer(answer_id: int, db: Session = Depends(get_db)):
     ans = db.query(InterviewAnswer).filter(InterviewAnswer.id==answer_id).first()
     if not ans:
-        db.close()
         raise HTTPException(status_code=404, detail="Answer not found")
-    # fetch question expected_keywords
-    q = db.query(InterviewQuestion).filter(InterviewQuestion.id==ans.question_id).first()
-    expected_keywords = q.expected_keywords if q else None
-    score, notes = score_answer_text(ans.answer_text or "", expected_keywords)
+    # the question's skill picks the scoring engine
+    score, notes, fingerprint = score_answer(ans.question_id, ans.answer_text,
+                                             file_text_for(db, ans.uploaded_file_path))
     ans.score = score
     ans.scored = True
     ans.evaluator_notes = notes
+    ans.score_fingerprint = fingerprint
     db.add(ans)
     db.commit()
     db.refresh(ans)
-    db.close()
     return {"answer_id": ans.id, "score": ans.score, "notes": notes}
 
-@app.post("/evaluate/interview/{interview_id}")
-def evaluate_interview(interview_id: int):
-    db = SessionLocal()
-    interview = db.query(Interview).filter(Interview.id==interview_id).first()
-    if not interview:
-        db.close()
+@sync_router.post("/evaluate/interview/{interview_id}")
+def evaluate_interview(interview_id: int, db: Session = Depends(get_db)):
+    return run_interview_evaluation(db, interview_id)
+
+@app.post("/evaluate/bulk")
+def evaluate_bulk(flt: BulkEvaluationRequest, db: Session = Depends(get_db)):
+    return run_bulk_evaluation(db, flt)
+
+@app.post("/jobs/evaluate/{interview_id}", status_code=202)
+def enqueue_evaluation(interview_id: int, db: Session = Depends(get_db)):
+    if not db.get(Interview, interview_id):
         raise HTTPException(status_code=404, detail="Interview not found")
-    answers = db.query(InterviewAnswer).filter(InterviewAnswer.interview_id==interview_id).all()
-    if not answers:
-        db.close()
-        raise HTTPException(status_code=400, detail="No answers submitted for this interview")
-
-    per_answer_results = []
-    total = 0.0
-    for a in answers:
-        # fetch question to get expected keywords
-        q = db.query(InterviewQuestion).filter(InterviewQuestion.id==a.question_id).first()
-        expected = q.expected_keywords if q else None
-        score, notes = score_answer_text(a.answer_text or "", expected)
-        a.score = score
-        a.scored = True
-        a.evaluator_notes = notes
-        total += score
-        per_answer_results.append({"answer_id": a.id, "question_id": a.question_id, "score": score, "notes": notes})
-        db.add(a)
-    # average score across answers, normalise to 100 (max per question we gave 100)
-    avg_score = round(total / max(len(answers),1), 2)
-    # simple verdict rules
-    if avg_score >= 75:
-        verdict = "pass"
-    elif avg_score >= 50:
-        verdict = "consider"
-    else:
-        verdict = "fail"
-    details = json.dumps(per_answer_results)
-    # write interview_results (update if exists)
-    existing = db.query(InterviewResult).filter(InterviewResult.interview_id==interview_id).first()
-    if existing:
-        existing.total_score = avg_score
-        existing.verdict = verdict
-        existing.details = details
-        existing.created_at = datetime.utcnow()
-        db.add(existing)
-    else:
-        res = InterviewResult(
-            interview_id=interview_id,
-            total_score=avg_score,
-            verdict=verdict,
-            details=details,
-            created_at=datetime.utcnow()
-        )
-        db.add(res)
-    # mark interview status to done
-    interview.status = "done"
-    db.add(interview)
-    db.commit()
-    # read the final result to return
-    result = db.query(InterviewResult).filter(InterviewResult.interview_id==interview_id).first()
-    db.close()
-    return {"interview_id": interview_id, "total_score": result.total_score, "verdict": result.verdict, "details": json.loads(result.details)}
+    job = enqueue_job(db, interview_id)
+    return {"job_id": job.id, "interview_id": interview_id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(EvaluationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
 
-@app.get("/results/{interview_id}")
+@sync_router.get("/results/{interview_id}")
 def get_results(interview_id: int):
-    db = SessionLocal()
-    res = db.query(InterviewResult).filter(InterviewResult.interview_id==interview_id).first()
-    db.close()
-    if not res:
-        raise HTTPException(status_code=404, detail="Result not found")
-    import json
-    try:
-        details = json.loads(res.details)
-    except:
-        details = res.details
-    return {"interview_id": res.interview_id, "total_score": res.total_score, "verdict": res.verdict, "details": details, "created_at": res.created_at.isoformat()}
+    # from the replica unless this interview was just evaluated
+    with read_session(interview_id) as db:
+        res = db.execute(results.result_query(interview_id)).first()
+        if not res:
+            raise HTTPException(status_code=404, detail="Result not found")
+        # serialized once per result version
+        body = results.response_cache.get(res.interview_id, res.version)
+        if body is None:
+            body = results.result_body(res, db.execute(results.details_query(interview_id)).all())
+    return Response(body, media_type="application/json")
+
+@app.get("/results")
+def list_results(verdict: Optional[str] = None, question_id: Optional[int] = None,
+                 question_score_lt: Optional[float] = None, question_score_gte: Optional[float] = None,
+                 cursor: Optional[int] = None, limit: int = Query(50, ge=1, le=500),
+                 db: Session = Depends(get_read_db)):
+    # newest first; the cursor is the last id of the previous page (keyset, no OFFSET)
+    stmt = select(InterviewResult.id, InterviewResult.interview_id, InterviewResult.total_score,
+                  InterviewResult.verdict, InterviewResult.created_at)
+    if verdict:
+        stmt = stmt.where(InterviewResult.verdict == verdict)
+    if question_id is not None:
+        # e.g. every result where question 7 scored under 30; one range of
+        # ix_interview_result_details_question_score
+        matching = select(InterviewResultDetail.interview_id).where(InterviewResultDetail.question_id == question_id)
+        if question_score_lt is not None:
+            matching = matching.where(InterviewResultDetail.score < question_score_lt)
+        if question_score_gte is not None:
+            matching = matching.where(InterviewResultDetail.score >= question_score_gte)
+        stmt = stmt.where(InterviewResult.interview_id.in_(matching))
+    elif question_score_lt is not None or question_score_gte is not None:
+        raise HTTPException(status_code=400, detail="question score filters need question_id")
+    if cursor is not None:
+        stmt = stmt.where(InterviewResult.id < cursor)
+    rows = db.execute(stmt.order_by(InterviewResult.id.desc()).limit(limit + 1)).all()
+    page = rows[:limit]
+    return {
+        "results": [{"interview_id": r.interview_id, "total_score": r.total_score, "verdict": r.verdict,
+                     "created_at": r.created_at.isoformat() if r.created_at else None} for r in page],
+        "next_cursor": page[-1].id if len(rows) > limit else None,
+    }
+
+@app.get("/export/{dataset}")
+def export_rows(dataset: str, format: str = Query("csv", regex="^(csv|ndjson|parquet)$"),
+                flt: export.ExportFilter = Depends()):
+    # streamed from a server-side cursor; filters as query parameters
+    if dataset not in export.COLUMNS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if format == "parquet" and export.pyarrow is None:
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow")
+    filename = f"{dataset}.{format}"
+    return StreamingResponse(export.stream_export(dataset, format, flt), media_type=export.MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/leaderboard/{skill}")
+def leaderboard_top(skill: str, limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_read_db)):
+    return {"skill": skill, "entries": leaderboard.top(db, skill, limit)}
+
+@app.get("/leaderboard/{skill}/rank")
+def leaderboard_rank(skill: str, candidate_id: Optional[int] = None, interview_id: Optional[int] = None):
+    if candidate_id is None and interview_id is None:
+        raise HTTPException(status_code=400, detail="candidate_id or interview_id is required")
+    with read_session(interview_id) as db:
+        rank = leaderboard.rank_of(db, skill, candidate_id=candidate_id, interview_id=interview_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="No leaderboard entry")
+    return rank
+
+@app.get("/leaderboard/{skill}/stats")
+def leaderboard_stats(skill: str, db: Session = Depends(get_read_db)):
+    stats = leaderboard.skill_stats(db, skill)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No results for this skill")
+    return stats
+
+@app.get("/interviews/{interview_id}/events")
+async def interview_events(interview_id: int):
+    # server-sent events: the current state, then queued / evaluating /
+    # answer_scored / done / failed as they are committed
+    def snapshot():
+        with session_scope() as db:
+            return interview_snapshot(db, interview_id)
+
+    if await run_in_threadpool(snapshot) is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return StreamingResponse(stream_events(interview_id, lambda: run_in_threadpool(snapshot)),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/metrics")
+def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
+
+@app.get("/metrics/pool")
+def metrics_pool():
+    status = pool_status()
+    if async_engine is not None:
+        status["async_pool"] = pool_status(async_engine)
+        status["async_read_pool"] = pool_status(async_read_engine)
+    if async_replica_engine is not None:
+        status["async_replica_pool"] = pool_status(async_replica_engine)
+    return status
+
+if EVALUATOR_DB_MODE == "async":
+    from async_routes import router as evaluation_router
+else:
+    evaluation_router = sync_router
+app.include_router(evaluation_router)
+
+startup_log = logging.getLogger("uvicorn.error")
+
+# background evaluation workers (EVAL_WORKERS=0 disables them in this process)
+worker_pool = JobWorkerPool(evaluate=run_interview_evaluation)
+
+def _drop_caches():
+    question_bank.invalidate()
+    # writes made while disconnected are unknown: read from the primary for a while
+    recent_writes.mark_all()
+
+# the evaluation_jobs DDL runs once per deployment in prestart.py; this runs
+# in every server process
+@app.on_event("startup")
+def start_workers():
+    start = time.perf_counter()
+    question_bank.load()
+    prepare_engines(question_bank.all())
+    if engine.dialect.name == "postgresql":
+        NotificationListener(engine, {QUESTION_BANK_CHANGED: question_bank.invalidate,
+                                      INTERVIEW_CHANGED: recent_writes.mark},
+                             on_reconnect=_drop_caches,
+                             payload_handlers={INTERVIEW_EVENTS: broker.dispatch_payload}).start()
+    worker_pool.start()
+    startup_log.info("evaluator process %d ready in %.3f s", os.getpid(), time.perf_counter() - start)
+
+@app.on_event("shutdown")
+def stop_workers():
+    worker_pool.stop()
+    scoring_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    for target in (async_engine, async_read_engine, async_replica_engine):
+        if target is not None:
+            await target.dispose()
@@ -0,0 +1,62 @@
+# fastapi_service/metrics.py
+# Prometheus metrics for the evaluator, served on GET /metrics: latency per
+# route, database queries and database time per request (the plumbing is in
+# common.metrics) and scoring time per engine. The bulk scoring pool's
+# processes write their samples to PROMETHEUS_MULTIPROC_DIR as well.
+import logging
+import time
+from prometheus_client import Counter, Histogram
+from common.db import count_queries
+from common.metrics import SLOW_REQUEST_SECONDS, RequestMetrics, render as render_registry, service_registry
+
+registry = service_registry()
+HTTP_REQUESTS = RequestMetrics(registry, logging.getLogger("evaluator.slow_requests"))
+SCORING_SECONDS = Histogram("evaluator_scoring_seconds", "Time to score one batch of answers", ["engine"],
+                            buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+                            registry=registry)
+ANSWERS_SCORED = Counter("evaluator_answers_scored_total", "Answers scored", ["engine"], registry=registry)
+EXPORT_ROWS = Counter("export_rows_total", "Rows streamed by the export endpoints", ["dataset", "format"],
+                      registry=registry)
+
+
+def observe_scoring(engine_name, answers, seconds):
+    SCORING_SECONDS.labels(engine_name).observe(seconds)
+    ANSWERS_SCORED.labels(engine_name).inc(answers)
+
+
+def render():
+    """(body, content type) for GET /metrics."""
+    return render_registry(registry)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording every HTTP request under its route template."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None  # endpoint -> path template
+
+    def _route(self, scope):
+        if self._routes is None:
+            self._routes = {r.endpoint: r.path for r in scope["app"].routes if hasattr(r, "endpoint")}
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with count_queries(record_statements=SLOW_REQUEST_SECONDS > 0) as counter:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                HTTP_REQUESTS.observe(scope["method"], self._route(scope), scope["path"], status, elapsed, counter)
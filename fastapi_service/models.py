@@ -1,20 +1,15 @@
 # fastapi_service/models.py
+# The evaluator's view of the interview tables (owned by flask_service) and its
+# own job table. The engine and sessions shared with flask_service are in
+# common.db.
 import os
-from sqlalchemy import (Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean)
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import (Column, Integer, String, DateTime, Text, Float, Boolean, Index)
+from sqlalchemy.orm import declarative_base
 from datetime import datetime
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
 
-load_dotenv()
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "interviewdb")
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-
-DATABASE_URL = f"postgresql://{POSTGRES_USER}:{quote_plus(POSTGRES_PASSWORD)}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+from common.db import (DATABASE_URL, REPLICA_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                       DB_POOL_RECYCLE, DB_POOL_PRE_PING, engine, instrument, lock_schema)
+from common.read_routing import use_replica
 
 Base = declarative_base()
 
@@ -33,6 +28,7 @@ class InterviewQuestion(Base):
     skill = Column(String(100))
     text = Column(Text)
     expected_keywords = Column(Text)
+    reference_answer = Column(Text)
 
 class InterviewAnswer(Base):
     __tablename__ = "interview_answers"
@@ -44,15 +40,131 @@ class InterviewAnswer(Base):
     scored = Column(Boolean)
     score = Column(Float)
     evaluator_notes = Column(Text)
+    score_fingerprint = Column(String(40))
+
+    __table_args__ = (Index("ix_interview_answers_interview_id", "interview_id", "id"),)
 
 class InterviewResult(Base):
     __tablename__ = "interview_results"
     id = Column(Integer, primary_key=True)
-    interview_id = Column(Integer)
+    interview_id = Column(Integer, unique=True)
     total_score = Column(Float)
     verdict = Column(String(50))
-    details = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, default=1)
+
+    __table_args__ = (Index("ix_interview_results_verdict", "verdict", "id"),)
+
+class InterviewResultDetail(Base):
+    __tablename__ = "interview_result_details"
+    interview_id = Column(Integer, primary_key=True)
+    answer_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer)
+    score = Column(Float)
+    notes = Column(Text)
+
+    __table_args__ = (
+        Index("ix_interview_result_details_question_score", "question_id", "score", "interview_id"),
+    )
+
+class LeaderboardEntry(Base):
+    __tablename__ = "leaderboard_entries"
+    interview_id = Column(Integer, primary_key=True)
+    skill = Column(String(100))
+    candidate_id = Column(Integer)
+    total_score = Column(Float)
+    updated_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_leaderboard_entries_skill_score", "skill", "total_score", "interview_id"),
+        Index("ix_leaderboard_entries_candidate", "candidate_id", "skill", "total_score"),
+    )
+
+class SkillScoreBucket(Base):
+    __tablename__ = "skill_score_buckets"
+    skill = Column(String(100), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer)
+    score_sum = Column(Float)
+
+class ExtractedText(Base):
+    # written by flask_service's extraction pool; the evaluator scores answer
+    # files from it
+    __tablename__ = "extracted_texts"
+    file_ref = Column(String(80), primary_key=True)
+    status = Column(String(20))
+    text = Column(Text)
+    created_at = Column(DateTime)
+
+class EvaluationJob(Base):
+    __tablename__ = "evaluation_jobs"
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(50), nullable=False, default="queued")  # queued / running / done / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    next_run_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# EVALUATOR_DB_MODE=async serves the evaluation endpoints from an asyncio engine
+# (asyncpg / aiosqlite) instead of blocking sessions on the threadpool
+EVALUATOR_DB_MODE = os.getenv("EVALUATOR_DB_MODE", "sync").lower()
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgresql+psycopg2": "postgresql+asyncpg",
+                  "sqlite": "sqlite+aiosqlite"}
+async_engine = None
+AsyncSessionLocal = None
+# Read-only endpoints (GET /results/<id>) use engines in autocommit mode: no
+# BEGIN/ROLLBACK around their SELECTs, and asyncpg's pool pre-ping is then a
+# single round trip instead of being wrapped in a transaction of its own.
+async_read_engine = None
+# async twin of common.db.replica_engine, for the async read-only endpoints
+async_replica_engine = None
+if EVALUATOR_DB_MODE == "async":
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    def _make_async_engine(url, **kwargs):
+        url = make_url(url)
+        return create_async_engine(
+            url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername)),
+            echo=False,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            **kwargs,
+        )
+
+    async_engine = _make_async_engine(DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    async_read_engine = _make_async_engine(DATABASE_URL, isolation_level="AUTOCOMMIT")
+    if REPLICA_DATABASE_URL:
+        async_replica_engine = _make_async_engine(REPLICA_DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+async def get_async_db():
+    # FastAPI dependency for the async endpoints
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def async_read_connection(interview_id=None):
+    """Autocommit AsyncConnection for a read-only request, routed like common.read_routing.read_session."""
+    replica = use_replica(interview_id) and async_replica_engine is not None
+    return (async_replica_engine if replica else async_read_engine).connect()
+
+def create_tables():
+    # the shared interview tables are owned by flask_service; only create ours
+    with engine.begin() as conn:
+        # one schema change at a time across processes and services
+        lock_schema(conn)
+        Base.metadata.create_all(bind=conn, tables=[EvaluationJob.__table__])
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# their statements count towards common.db.count_queries like the sync ones
+for _async_target in (async_engine, async_read_engine, async_replica_engine):
+    if _async_target is not None:
+        instrument(_async_target.sync_engine)
@@ -0,0 +1,20 @@
+# fastapi_service/prestart.py
+# One-off work done once per deployment, before the server forks its workers:
+# creates the evaluator's own table (the interview tables are migrated by
+# flask_service). Workers never repeat it.
+#
+#   PYTHONPATH=.. python prestart.py
+import time
+
+from models import create_tables
+
+
+def prestart():
+    """Create the evaluator's tables; returns the seconds it took."""
+    start = time.perf_counter()
+    create_tables()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"evaluator prestart done in {prestart():.3f} s")
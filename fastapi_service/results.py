@@ -0,0 +1,155 @@
+# fastapi_service/results.py
+# Writing interview_results rows: verdict rules and the ON CONFLICT upsert,
+# shared by the single-interview evaluator and bulk re-scoring. Every result
+# write also replaces the result's interview_result_details rows, bumps its
+# version and goes to the leaderboard, all in the same transaction.
+#
+# Reading: GET /results/{id} bodies are serialized once per result version
+# (orjson when installed) and kept in a per-process LRU, so a repeated read is
+# one primary-key SELECT and no JSON encoding.
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import delete, insert, select
+from models import InterviewAnswer, InterviewResult, InterviewResultDetail
+
+try:
+    import orjson
+except ImportError:  # the json module is used instead
+    orjson = None
+
+RESULTS_CACHE_SIZE = int(os.getenv("RESULTS_CACHE_SIZE", "10000"))
+
+
+def verdict_for(avg_score):
+    # simple verdict rules
+    if avg_score >= 75:
+        return "pass"
+    elif avg_score >= 50:
+        return "consider"
+    return "fail"
+
+
+def upsert_statement(dialect_name, rows):
+    """INSERT ... ON CONFLICT (interview_id) DO UPDATE for one or many result rows."""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    # "details" is not a column: replace_details writes it
+    rows = [{k: v for k, v in r.items() if k != "details"} for r in rows]
+    stmt = insert(InterviewResult).values(rows)
+    set_ = {k: stmt.excluded[k] for k in rows[0] if k != "interview_id"}
+    set_["version"] = InterviewResult.version + 1
+    return stmt.on_conflict_do_update(index_elements=[InterviewResult.interview_id], set_=set_)
+
+
+def replace_details(db, rows):
+    """Rewrite interview_result_details for the result rows that carry "details"."""
+    rows = [r for r in rows if "details" in r]
+    if not rows:
+        return
+    db.execute(delete(InterviewResultDetail)
+               .where(InterviewResultDetail.interview_id.in_([r["interview_id"] for r in rows])))
+    details = [{"interview_id": r["interview_id"], "answer_id": d["answer_id"], "question_id": d["question_id"],
+                "score": d["score"], "notes": d["notes"]} for r in rows for d in r["details"]]
+    if details:
+        db.execute(insert(InterviewResultDetail), details)
+
+
+def upsert_results(db, rows):
+    # imported here: leaderboard uses verdict_for from this module
+    from leaderboard import update_leaderboard
+    if rows:
+        db.execute(upsert_statement(db.get_bind().dialect.name, rows))
+        replace_details(db, rows)
+        update_leaderboard(db, rows)
+
+
+def refresh_results(db, interview_ids):
+    """Recompute the results of the given interviews from their stored answer scores."""
+    if not interview_ids:
+        return 0
+    answers = db.execute(
+        select(InterviewAnswer.interview_id, InterviewAnswer.id, InterviewAnswer.question_id,
+               InterviewAnswer.score, InterviewAnswer.evaluator_notes)
+        .where(InterviewAnswer.interview_id.in_(interview_ids))
+        .order_by(InterviewAnswer.interview_id, InterviewAnswer.id)
+    ).all()
+    per_interview = {}
+    for interview_id, answer_id, question_id, score, notes in answers:
+        per_interview.setdefault(interview_id, []).append(
+            {"answer_id": answer_id, "question_id": question_id, "score": score or 0.0, "notes": notes})
+    now = datetime.utcnow()
+    rows = []
+    for interview_id, details in per_interview.items():
+        avg_score = round(sum(d["score"] for d in details) / len(details), 2)
+        rows.append({"interview_id": interview_id, "total_score": avg_score, "verdict": verdict_for(avg_score),
+                     "details": details, "created_at": now})
+    upsert_results(db, rows)
+    return len(rows)
+
+
+def result_query(interview_id):
+    return (select(InterviewResult.interview_id, InterviewResult.total_score, InterviewResult.verdict,
+                   InterviewResult.created_at, InterviewResult.version)
+            .where(InterviewResult.interview_id == interview_id))
+
+
+def details_query(interview_id):
+    return (select(InterviewResultDetail.answer_id, InterviewResultDetail.question_id,
+                   InterviewResultDetail.score, InterviewResultDetail.notes)
+            .where(InterviewResultDetail.interview_id == interview_id)
+            .order_by(InterviewResultDetail.answer_id))
+
+
+def dumps(obj):
+    """JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class ResponseCache:
+    """LRU of response bodies keyed by (interview_id, version); a new version simply misses."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, interview_id, version):
+        with self._lock:
+            entry = self._entries.get(interview_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(interview_id)
+            return entry[1]
+
+    def put(self, interview_id, version, body):
+        with self._lock:
+            self._entries[interview_id] = (version, body)
+            self._entries.move_to_end(interview_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(RESULTS_CACHE_SIZE)
+
+
+def result_body(result, details):
+    """The GET /results/{id} body for a result_query row and its details_query rows; cached."""
+    body = dumps({
+        "interview_id": result.interview_id, "total_score": result.total_score, "verdict": result.verdict,
+        "details": [{"answer_id": d.answer_id, "question_id": d.question_id, "score": d.score, "notes": d.notes}
+                    for d in details],
+        "created_at": result.created_at.isoformat(), "version": result.version,
+    })
+    response_cache.put(result.interview_id, result.version, body)
+    return body
@@ -0,0 +1,226 @@
+# fastapi_service/scoring.py
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from typing import Optional
+import numpy as np
+
+# Simple scoring heuristic:
+# - If expected_keywords exists, score = fraction of keywords present * 70
+# - Plus a length bonus (answer length normalized) up to 30 points
+# final score in [0,100]
+
+# Every non-word character below U+3000 becomes a separator, so one
+# translate() + split() turns an answer into its lowercase word tokens.
+_SEPARATORS = {c: " " for c in range(0x3000) if not (chr(c).isalnum() or chr(c) == "_")}
+# plural forms still count ("decorators" matches "decorator")
+_SUFFIXES = ("", "s", "es")
+# the same word boundary as a regex character class: characters from U+3001
+# up are never separators (U+3000 is whitespace, so split() drops it)
+_WORD = r"[\w\u3001-\U0010ffff]"
+_SEPARATOR_RUN = r"[^\w\u3001-\U0010ffff]+"
+# Up to this many keywords, each one is looked up with str.find plus a regex
+# check where it is found, which is cheaper than tokenizing the answer; with
+# more keywords, one tokenization serves them all.
+SCAN_MAX_KEYWORDS = 12
+_SCAN_FIND_TRIES = 8
+
+
+def _tokens(text):
+    return text.lower().translate(_SEPARATORS).split()
+
+
+def _scan_pattern(words, word, separator_run):
+    """Regex for a keyword, starting with its first word as a literal so the
+    regex engine can skip ahead to it; the word boundary in front of it is
+    checked by a fixed-width lookbehind instead of a leading (?<!...)."""
+    first = re.escape(words[0])
+    return re.compile(first + r"(?<!%s(?s:.){%d})" % (word, len(words[0]))
+                      + "".join(separator_run + re.escape(w) for w in words[1:])
+                      + r"(?:e?s)?(?!%s)" % word)
+
+
+def _scan(text, first, pattern, pos):
+    """First match of a _scan_pattern regex at or after pos, or None.
+
+    str.find skips to each occurrence of the first word (and rejects a
+    missing keyword) faster than the regex engine; after a few occurrences
+    that are not a whole-word match, the regex takes over the rest.
+    """
+    pos = text.find(first, pos)
+    tries = _SCAN_FIND_TRIES
+    while pos != -1:
+        m = pattern.match(text, pos)
+        if m or not tries:
+            return m or pattern.search(text, pos + 1)
+        tries -= 1
+        pos = text.find(first, pos + 1)
+    return None
+
+
+class KeywordMatcher:
+    """A question's expected keywords compiled for whole-word matching.
+
+    With few keywords (SCAN_MAX_KEYWORDS) each is looked up with str.find,
+    and a regex anchored on its first word checks the word boundaries from
+    there. With more, the answer is tokenized once: plain keywords are found
+    with one set intersection and phrases are checked only where their
+    first word occurs, so the cost no longer grows with answer length times
+    keyword count. Keywords containing punctuation ("c++", "node.js") keep
+    their characters and are matched with a word-bounded regex instead.
+    Both ways give the same matches.
+    """
+
+    def __init__(self, expected_keywords: str):
+        self.keywords = [k.strip().lower() for k in expected_keywords.split(",") if k.strip()]
+        self._words = {}    # word variant -> keywords it satisfies
+        self._phrases = {}  # first word -> [(keyword, middle words, last-word variants)]
+        self._patterns = []
+        self._scans = []    # (keyword, first word, regex) for the str.find path
+        self._columns = None  # keyword -> hit_matrix columns, built on first use
+        for kw in dict.fromkeys(self.keywords):
+            words = kw.split()
+            if _tokens(kw) != words:
+                self._patterns.append((kw, re.compile(
+                    r"(?<!\w)" + r"\s+".join(map(re.escape, words)) + r"(?:e?s)?(?!\w)")))
+                self._scans.append((kw, words[0], _scan_pattern(words, r"\w", r"\s+")))
+                continue
+            self._scans.append((kw, words[0], _scan_pattern(words, _WORD, _SEPARATOR_RUN)))
+            if len(words) == 1:
+                for suffix in _SUFFIXES:
+                    self._words.setdefault(kw + suffix, set()).add(kw)
+            else:
+                last = {words[-1] + suffix for suffix in _SUFFIXES}
+                self._phrases.setdefault(words[0], []).append((kw, words[1:-1], last))
+
+    def matches(self, answer_text: str):
+        """Return the set of keywords present in answer_text as whole words."""
+        if len(self._scans) <= SCAN_MAX_KEYWORDS:
+            lowered = answer_text.lower()
+            found = set()
+            for kw, first, pattern in self._scans:
+                # _scan() inlined: this loop is the whole cost for short answers
+                pos = lowered.find(first)
+                tries = _SCAN_FIND_TRIES
+                while pos != -1:
+                    if pattern.match(lowered, pos):
+                        found.add(kw)
+                        break
+                    if not tries:
+                        if pattern.search(lowered, pos + 1):
+                            found.add(kw)
+                        break
+                    tries -= 1
+                    pos = lowered.find(first, pos + 1)
+            return found
+        tokens = _tokens(answer_text)
+        present = set(tokens)
+        found = set()
+        for word in self._words.keys() & present:
+            found |= self._words[word]
+        for first in self._phrases.keys() & present:
+            for kw, middle, last in self._phrases[first]:
+                if kw not in found and self._phrase_at(tokens, first, middle, last):
+                    found.add(kw)
+        if self._patterns:
+            lowered = answer_text.lower()
+            found.update(kw for kw, pattern in self._patterns if pattern.search(lowered))
+        return found
+
+    def count(self, answer_text: str):
+        found = self.matches(answer_text)
+        if len(self._scans) == len(self.keywords):
+            return len(found)  # no keyword listed twice
+        return sum(1 for k in self.keywords if k in found)
+
+    def hit_matrix(self, answer_texts):
+        """Boolean matrix of answers x keywords: True where the keyword is present.
+
+        On the str.find path the answers are joined into one text and each
+        keyword is searched across the whole batch, skipping to the next
+        answer after a hit, so the work is one scan per keyword rather than
+        one call per answer.
+        """
+        if self._columns is None:
+            self._columns = {}
+            for j, k in enumerate(self.keywords):
+                self._columns.setdefault(k, []).append(j)
+        hits = np.zeros((len(answer_texts), len(self.keywords)), dtype=bool)
+        if not answer_texts:
+            return hits
+        if len(self._scans) > SCAN_MAX_KEYWORDS:
+            rows, cols = [], []
+            for i, answer_text in enumerate(answer_texts):
+                for k in self.matches(answer_text):
+                    for j in self._columns[k]:
+                        rows.append(i)
+                        cols.append(j)
+            hits[rows, cols] = True
+            return hits
+
+        # lowered one by one: lower() can change a text's length
+        lowered = [text.lower() for text in answer_texts]
+        joined = "\n".join(lowered)
+        # ends[i]: offset of the newline after answer i (len(joined) for the last)
+        ends = [end - 1 for end in accumulate(len(text) + 1 for text in lowered)]
+        for kw, first, pattern in self._scans:
+            rows = []
+            pos = 0
+            while True:
+                m = _scan(joined, first, pattern, pos)
+                if m is None:
+                    break
+                row = bisect_left(ends, m.start())
+                if m.end() <= ends[row]:
+                    rows.append(row)
+                    pos = ends[row] + 1
+                else:
+                    # a phrase running on into the next answer
+                    pos = m.start() + 1
+            if rows:
+                hits[np.ix_(rows, self._columns[kw])] = True
+        return hits
+
+    @staticmethod
+    def _phrase_at(tokens, first, middle, last):
+        n = len(middle)
+        i = tokens.index(first)
+        while True:
+            if tokens[i + 1:i + 1 + n] == middle and i + 1 + n < len(tokens) and tokens[i + 1 + n] in last:
+                return True
+            try:
+                i = tokens.index(first, i + 1)
+            except ValueError:
+                return False
+
+
+@lru_cache(maxsize=4096)
+def compile_keywords(question_id: Optional[int], expected_keywords: str):
+    return KeywordMatcher(expected_keywords)
+
+
+def score_answer_text(answer_text: str, expected_keywords: Optional[str], question_id: Optional[int] = None):
+    if not answer_text:
+        return 0.0, "Empty answer"
+    score = 0.0
+    notes = []
+    # keyword match
+    if expected_keywords:
+        matcher = compile_keywords(question_id, expected_keywords)
+        if matcher.keywords:
+            matched = matcher.count(answer_text)
+            kw_score = (matched / len(matcher.keywords)) * 70.0
+            notes.append(f"{matched}/{len(matcher.keywords)} keywords matched")
+        else:
+            kw_score = 0.0
+    else:
+        kw_score = 0.0
+
+    # length bonus: normalize to 0..30 (answers > 200 chars get full)
+    length = len(answer_text)
+    length_bonus = min(30.0, (length / 200.0) * 30.0)
+    score = kw_score + length_bonus
+    notes.append(f"length_bonus={round(length_bonus,2)}")
+    return round(score,2), "; ".join(notes)
+
@@ -0,0 +1,263 @@
+# fastapi_service/semantic.py
+# Semantic scoring engine: an answer is compared with its question's reference
+# answer instead of a keyword list, so paraphrases still earn credit.
+#
+# Texts become hashed bag-of-words vectors (stemmed unigrams + bigrams,
+# sublinear tf, signed feature hashing, L2-normalised) and the similarity is
+# their cosine. It is all local NumPy, with no model download or network.
+# Reference vectors are precomputed into a memory-mapped matrix shared by every
+# process on the host; answer vectors are cached by content hash.
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+from engines import ScoringEngine, KeywordEngine, register_engine
+from scoring import _tokens
+
+SEMANTIC_DIM = 2 ** 14
+SEMANTIC_INDEX_DIR = os.getenv("SEMANTIC_INDEX_DIR", os.path.join(tempfile.gettempdir(), "semantic_index"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "20000"))
+# cosine similarity at which an answer earns the full 70 points
+SEMANTIC_FULL_SIMILARITY = float(os.getenv("SEMANTIC_FULL_SIMILARITY", "0.6"))
+
+_STOPWORDS = frozenset(
+    "a an the and or but of to in on for is are was were be been being it its this that these those "
+    "with as by at from can could will would should do does did you your we our i me my they them "
+    "their he she his her not no so if then than there here what which who how when where".split())
+_EMPTY = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32))
+_MIX_A = np.uint64(0x9E3779B97F4A7C15)
+_MIX_B = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+@lru_cache(maxsize=65536)
+def _stem(word):
+    # a few English suffix rules, enough for "decorators" ~ "decorating" ~ "decorate"
+    if len(word) <= 4:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("ing") and len(word) > 6:
+        word = word[:-3]
+    elif word.endswith("ed") and len(word) > 5:
+        word = word[:-2]
+    elif word.endswith(("ses", "xes", "zes", "ches", "shes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=262144)
+def _feature(term):
+    # crc32 rather than hash(): the index must agree across processes and restarts
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def embed(text):
+    """Sparse (indices, values) vector of a text, L2-normalised."""
+    terms = [_stem(t) for t in _tokens(text) if t not in _STOPWORDS]
+    if not terms:
+        return _EMPTY
+    unigrams = np.fromiter(map(_feature, terms), dtype=np.uint64, count=len(terms))
+    # bigram codes are mixed from the two unigram codes rather than hashing
+    # "a b" strings, which would miss the _feature cache every time
+    bigrams = ((unigrams[:-1] * _MIX_A + unigrams[1:] * _MIX_B) >> np.uint64(16)) & np.uint64(0xFFFFFFFF)
+    codes = np.concatenate((unigrams, bigrams))
+    signs = np.where(codes & np.uint64(0x80000000), -1.0, 1.0)
+    idx, inverse = np.unique(codes & np.uint64(SEMANTIC_DIM - 1), return_inverse=True)
+    tf = np.bincount(inverse, weights=signs)
+    values = np.sign(tf) * np.log1p(np.abs(tf))
+    norm = np.linalg.norm(values)
+    if not norm:
+        return _EMPTY
+    return idx.astype(np.int32), (values / norm).astype(np.float32)
+
+
+def embed_dense(text):
+    idx, values = embed(text)
+    vector = np.zeros(SEMANTIC_DIM, dtype=np.float32)
+    vector[idx] = values
+    return vector
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """LRU of answer vectors keyed by the hash of the answer text."""
+
+    def __init__(self, maxsize=SEMANTIC_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        key = content_hash(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+        vector = embed(text)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = vector
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return vector
+
+
+class ReferenceMatrix:
+    """Reference-answer vectors as rows of a memory-mapped float32 matrix.
+
+    The matrix for a set of reference answers is written once to
+    SEMANTIC_INDEX_DIR under a name derived from its contents, so restarts and
+    the other processes on the host (workers, the bulk scoring pool) map the
+    same file instead of re-vectorizing. References that appear later (a
+    question edited since startup) are vectorized on first use and kept in
+    memory.
+    """
+
+    def __init__(self, directory=SEMANTIC_INDEX_DIR):
+        self.directory = directory
+        # (content hash -> row, matrix), replaced as one tuple so a reader
+        # never pairs the rows of one matrix with another
+        self._index = ({}, None)
+        self._extra = {}  # content hash -> dense vector, for references not in the matrix
+        self._lock = threading.Lock()
+        self._open(os.path.join(directory, "current"))
+
+    def _open(self, pointer):
+        try:
+            with open(pointer) as f:
+                name = f.read().strip()
+            with open(os.path.join(self.directory, name + ".json")) as f:
+                keys = json.load(f)
+            matrix = np.load(os.path.join(self.directory, name + ".npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return
+        rows = {bytes.fromhex(k): i for i, k in enumerate(keys)}
+        with self._lock:
+            self._index = (rows, matrix)
+            self._extra = {}
+
+    def build(self, texts):
+        """Precompute the matrix for these reference texts and map it."""
+        keys = sorted({content_hash(t).hex(): t for t in texts if t}.items())
+        digest = hashlib.sha1(f"{SemanticEngine.version}|{SEMANTIC_DIM}".encode())
+        for key, _ in keys:
+            digest.update(key.encode())
+        name = "references-" + digest.hexdigest()[:16]
+        path = os.path.join(self.directory, name + ".npy")
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            matrix = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32,
+                                               shape=(max(len(keys), 1), SEMANTIC_DIM))
+            for row, (_, text) in enumerate(keys):
+                idx, values = embed(text)
+                matrix[row, idx] = values
+            matrix.flush()
+            del matrix
+            # the key list first, so a matrix that exists always has its keys
+            keys_path = os.path.join(self.directory, name + ".json")
+            keys_tmp = f"{keys_path}.{os.getpid()}.tmp"
+            with open(keys_tmp, "w") as f:
+                json.dump([k for k, _ in keys], f)
+            os.replace(keys_tmp, keys_path)
+            os.replace(tmp, path)
+        pointer = os.path.join(self.directory, f"current.{os.getpid()}.tmp")
+        with open(pointer, "w") as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(self.directory, "current"))
+        self._open(os.path.join(self.directory, "current"))
+        return len(keys)
+
+    def vector(self, text):
+        key = content_hash(text)
+        rows, matrix = self._index
+        row = rows.get(key)
+        if row is not None:
+            return matrix[row]
+        vector = self._extra.get(key)
+        if vector is None:
+            vector = embed_dense(text)
+            with self._lock:
+                self._extra[key] = vector
+        return vector
+
+
+@register_engine
+class SemanticEngine(ScoringEngine):
+    """Cosine similarity to the question's reference answer (70 points) plus
+    the keyword engine's length bonus (30 points).
+
+    Questions without a reference answer are scored by the keyword engine.
+    """
+
+    name = "semantic"
+    version = f"1-{SEMANTIC_DIM}-{SEMANTIC_FULL_SIMILARITY}"
+
+    def __init__(self):
+        self.references = ReferenceMatrix()
+        self.cache = EmbeddingCache()
+        self._fallback = KeywordEngine()
+
+    def prepare(self, questions):
+        self.references.build(q.reference_answer for q in questions)
+
+    def score_batch(self, answers):
+        out = [None] * len(answers)
+        semantic, fallback = [], []
+        for i, a in enumerate(answers):
+            if not a.answer_text:
+                out[i] = (0.0, "Empty answer")
+            elif a.reference_answer:
+                semantic.append(i)
+            else:
+                fallback.append(i)
+        if fallback:
+            for i, scored in zip(fallback, self._fallback.score_batch([answers[i] for i in fallback])):
+                out[i] = scored
+        if not semantic:
+            return out
+
+        # one row per distinct reference in the batch, then one gather over all
+        # answer features: sims[k] = sum of answer values * reference[their indices]
+        ref_rows, refs, positions = {}, [], []
+        indices, values, owners = [], [], []
+        for k, i in enumerate(semantic):
+            reference = answers[i].reference_answer
+            if reference not in ref_rows:
+                ref_rows[reference] = len(refs)
+                refs.append(self.references.vector(reference))
+            idx, vals = self.cache.get(answers[i].answer_text)
+            indices.append(idx)
+            values.append(vals)
+            owners.append(np.full(len(idx), k, dtype=np.int32))
+            positions.append(ref_rows[reference])
+        stacked = np.stack(refs)
+        owners = np.concatenate(owners)
+        indices = np.concatenate(indices)
+        gathered = stacked[np.asarray(positions, dtype=np.int32)[owners], indices]
+        sims = np.bincount(owners, weights=np.concatenate(values) * gathered, minlength=len(semantic))
+        sims = np.clip(sims, 0.0, 1.0)
+
+        lengths = np.fromiter((len(answers[i].answer_text) for i in semantic), dtype=float, count=len(semantic))
+        similarity_scores = np.minimum(1.0, sims / SEMANTIC_FULL_SIMILARITY) * 70.0
+        length_bonuses = np.minimum(30.0, (lengths / 200.0) * 30.0)
+        scores = similarity_scores + length_bonuses
+        for i, score, sim, bonus in zip(semantic, scores.tolist(), sims.tolist(), length_bonuses.tolist()):
+            out[i] = (round(score, 2), f"similarity={round(sim, 2)}; length_bonus={round(bonus, 2)}")
+        return out
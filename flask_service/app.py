@@ -2,47 +2,63 @@ from flask import Flask, jsonify
 import os
 from dotenv import load_dotenv
 
-from .models import create_tables, SessionLocal, InterviewQuestion
-from .routes import bp
+from common.db import engine
+from common.notifications import NotificationListener, INTERVIEW_CHANGED, QUESTION_BANK_CHANGED
+from common.question_bank import question_bank
+from common.read_routing import recent_writes
+from .routes import bp, dashboard_cache, invalidate_interviews
+from .utils import StreamingRequest
+from . import metrics
 
 load_dotenv()
 
 app = Flask(__name__)
+# multipart uploads stream straight to content-addressed storage
+app.request_class = StreamingRequest
 app.register_blueprint(bp)
+# request latency / query / upload metrics on GET /metrics
+metrics.init_app(app)
 
-# initialize DB tables
-create_tables()
-
-# seed questions only once
-def seed_questions():
-    db = SessionLocal()
-    existing = db.query(InterviewQuestion).count()
-    if existing == 0:
-        qs = [
-            InterviewQuestion(skill="python",
-                text="Explain list comprehensions and give an example.",
-                expected_keywords="list comprehension,for,in"),
-            InterviewQuestion(skill="python",
-                text="What are decorators and when do you use them?",
-                expected_keywords="decorator,function,wrap"),
-            InterviewQuestion(skill="ml",
-                text="What is overfitting and how to prevent it?",
-                expected_keywords="overfitting,regularization,validation"),
-            InterviewQuestion(skill="sql",
-                text="Explain INNER JOIN vs LEFT JOIN.",
-                expected_keywords="inner join,left join,rows"),
-        ]
-        db.add_all(qs)
-        db.commit()
-    db.close()
-
-seed_questions()
+# schema migrations and the question seed are not done here: they run once per
+# deployment in `python -m flask_service.prestart`, before any worker starts
+
+def _drop_caches():
+    dashboard_cache.clear()
+    question_bank.invalidate()
+    # writes made while disconnected are unknown: read from the primary for a while
+    recent_writes.mark_all()
+
+_started_pid = None
+
+def start_background():
+    """Per-process startup: warm the question index and listen for changes.
+
+    Called in each server process after it is forked (gunicorn's post_fork
+    hook, see gunicorn.conf.py), since threads and connections do not survive
+    a fork. A second call in the same process does nothing.
+    """
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    _started_pid = os.getpid()
+    # warm the question index so the first get_questions call does not pay for it
+    question_bank.load()
+    # drop cached state when another process (or the evaluator) writes
+    if engine.dialect.name == "postgresql":
+        NotificationListener(engine, {
+            INTERVIEW_CHANGED: invalidate_interviews,
+            QUESTION_BANK_CHANGED: question_bank.invalidate,
+        }, on_reconnect=_drop_caches).start()
 
 @app.get("/")
 def home():
     return jsonify({"status": "ok", "service": "flask_interview_service"})
 
 if __name__ == "__main__":
+    # development server; production runs gunicorn on flask_service.wsgi
+    from .prestart import prestart
+    prestart()
+    start_background()
     host = os.getenv("FLASK_HOST", "0.0.0.0")
     port = int(os.getenv("FLASK_PORT", "5001"))
-    app.run(host=host, port=port, debug=True)
+    app.run(host=host, port=port, debug=os.getenv("FLASK_DEBUG", "").lower() in ("1", "true", "yes"))
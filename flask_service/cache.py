@@ -0,0 +1,72 @@
+# flask_service/cache.py
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Every key has a generation that invalidate() (and clear()) moves forward.
+    A reader takes generation(key) before querying and passes it to set(); the
+    value is stored only if no invalidation happened in between, so a result
+    read before a write cannot be cached after that write's invalidation.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        # key -> generation of its last invalidation, most recent last; keys
+        # dropped from here fall back to _floor, which is never lower than
+        # any generation dropped, so an old generation still fails to match
+        self._generations = OrderedDict()
+        self._floor = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(key, self._floor)
+
+    def set(self, key, value, generation=None):
+        """Store `value`; if `generation` is given, only while it is still current."""
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key, self._floor):
+                return False
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] = next(self._counter)
+            self._generations.move_to_end(key)
+            while len(self._generations) > self.maxsize:
+                _, dropped = self._generations.popitem(last=False)
+                self._floor = max(self._floor, dropped)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+            self._floor = next(self._counter)
+
+    def __len__(self):
+        return len(self._data)
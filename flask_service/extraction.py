@@ -0,0 +1,234 @@
+# flask_service/extraction.py
+# Text extraction for uploaded answer files, so the evaluator can score answers
+# that are only a file. Plain text (.txt, .py, .md, ...), PDF (with the
+# optional pypdf) and .docx are supported with local libraries only.
+#
+# Extraction runs in a process pool right after the upload is saved. The result
+# goes to extracted_texts under the upload's content reference, so the same
+# content uploaded again, or an interview evaluated again, is never parsed twice.
+# Every file has a budget: plain text is memory-mapped and read up to
+# EXTRACT_MAX_FILE_BYTES, .docx is parsed as a stream, PDFs page by page.
+# Parsing stops at EXTRACT_MAX_CHARS or after EXTRACT_MAX_SECONDS (checked
+# between pages / paragraphs); the text so far is kept and marked truncated.
+import codecs
+import logging
+import mmap
+import os
+import time
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from common.db import session_scope
+from common.process_pool import SpawnPool
+from .models import ExtractedText
+from .utils import resolve_upload
+from .metrics import EXTRACTION_SECONDS
+
+try:
+    import pypdf
+except ImportError:  # PDFs are then recorded as failed extractions
+    pypdf = None
+
+log = logging.getLogger(__name__)
+
+# 0 extracts inline in the request thread
+EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", "2"))
+EXTRACT_MAX_FILE_BYTES = int(os.getenv("EXTRACT_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+EXTRACT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "200000"))
+EXTRACT_MAX_SECONDS = float(os.getenv("EXTRACT_MAX_SECONDS", "10"))
+# a "pending" row this old belongs to a process that died; a re-upload extracts again
+EXTRACT_STALE_SECONDS = float(os.getenv("EXTRACT_STALE_SECONDS", "300"))
+
+CHUNK_SIZE = 64 * 1024
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+extraction_pool = SpawnPool(EXTRACT_PROCESSES)
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class _Budget:
+    """Collects extracted text until the character or time budget runs out."""
+
+    def __init__(self, max_chars, max_seconds):
+        self.max_chars = max_chars
+        self.deadline = time.monotonic() + max_seconds
+        self.parts = []
+        self.chars = 0
+        self.truncated = False
+
+    def add(self, text):
+        """Keep `text`; False once the budget is spent and parsing should stop."""
+        if self.truncated:
+            return False
+        if time.monotonic() > self.deadline:
+            self.truncated = True
+            return False
+        room = self.max_chars - self.chars
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        self.parts.append(text)
+        self.chars += len(text)
+        return not self.truncated
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def _kind(path):
+    with open(path, "rb") as f:
+        head = f.read(8192)
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        with zipfile.ZipFile(path) as z:
+            if "word/document.xml" in z.namelist():
+                return "docx"
+        raise ExtractionError("unsupported archive")
+    if b"\x00" in head:
+        raise ExtractionError("unsupported binary file")
+    return "text"
+
+
+def _extract_plain(path, size, budget):
+    if size == 0:
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    end = min(size, EXTRACT_MAX_FILE_BYTES)
+    # memory-mapped: only the pages actually decoded are read from disk
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        for start in range(0, end, CHUNK_SIZE):
+            if not budget.add(decoder.decode(m[start:min(start + CHUNK_SIZE, end)])):
+                return
+    budget.add(decoder.decode(b"", final=True))
+    if size > end:
+        budget.truncated = True
+
+
+def _extract_pdf(path, budget):
+    if pypdf is None:
+        raise ExtractionError("pypdf is not installed")
+    for page in pypdf.PdfReader(path).pages:
+        if not budget.add((page.extract_text() or "") + "\n"):
+            return
+
+
+def _extract_docx(path, budget):
+    # streamed through the zip member: paragraphs are emitted and dropped as they end
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as xml:
+        paragraph = []
+        for _, elem in iterparse(xml, events=("end",)):
+            if elem.tag == _DOCX_NS + "t":
+                paragraph.append(elem.text or "")
+            elif elem.tag == _DOCX_NS + "tab":
+                paragraph.append("\t")
+            elif elem.tag == _DOCX_NS + "p":
+                if not budget.add("".join(paragraph) + "\n"):
+                    return
+                paragraph = []
+                elem.clear()
+
+
+def extract_file(path):
+    """Extract one file (runs in the pool); returns the extracted_texts values."""
+    start = time.perf_counter()
+    budget = _Budget(EXTRACT_MAX_CHARS, EXTRACT_MAX_SECONDS)
+    extractor = None
+    try:
+        size = os.path.getsize(path)
+        extractor = _kind(path)
+        if extractor == "text":
+            _extract_plain(path, size, budget)
+        elif size > EXTRACT_MAX_FILE_BYTES:
+            raise ExtractionError(f"{extractor} file larger than {EXTRACT_MAX_FILE_BYTES} bytes")
+        elif extractor == "pdf":
+            _extract_pdf(path, budget)
+        else:
+            _extract_docx(path, budget)
+    except Exception as e:
+        return {"status": "failed", "extractor": extractor, "text": None, "truncated": False,
+                "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - start}
+    return {"status": "done", "extractor": extractor, "text": budget.text().strip(),
+            "truncated": budget.truncated, "error": None, "seconds": time.perf_counter() - start}
+
+
+def _claim(file_ref):
+    """True if this process should extract `file_ref`: never seen, or a stale pending claim."""
+    now = datetime.utcnow()
+    with session_scope() as db:
+        row = db.get(ExtractedText, file_ref)
+        if row is None:
+            db.add(ExtractedText(file_ref=file_ref, status="pending", created_at=now))
+            try:
+                db.commit()
+            except IntegrityError:
+                return False  # a concurrent upload of the same content claimed it
+            return True
+        if row.status != "pending" or row.created_at > now - timedelta(seconds=EXTRACT_STALE_SECONDS):
+            return False
+        # take the stale claim over; the conditional update lets one process win
+        taken = db.execute(
+            update(ExtractedText)
+            .where(ExtractedText.file_ref == file_ref, ExtractedText.created_at == row.created_at)
+            .values(created_at=now)
+        ).rowcount
+        db.commit()
+        return taken == 1
+
+
+def _store(file_ref, result):
+    EXTRACTION_SECONDS.labels(result["extractor"] or "unknown", result["status"]).observe(result["seconds"])
+    with session_scope() as db:
+        db.execute(update(ExtractedText).where(ExtractedText.file_ref == file_ref)
+                   .values(finished_at=datetime.utcnow(), **result))
+        db.commit()
+
+
+def _failed(e):
+    return {"status": "failed", "extractor": None, "text": None, "truncated": False,
+            "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+
+
+def _finished(file_ref, future):
+    # runs on the pool's result thread in this process. Whatever happened, the
+    # row must leave "pending", or the evaluator waits on it until it goes stale
+    try:
+        result = future.result()
+    except BrokenProcessPool as e:
+        # a worker died (e.g. killed for memory); the next upload gets a fresh pool
+        extraction_pool.shutdown()
+        result = _failed(e)
+    except Exception as e:
+        # cancelled at pool shutdown, or the call or its result failed to pickle
+        log.warning("extracting %s failed: %s", file_ref, e)
+        result = _failed(e)
+    try:
+        _store(file_ref, result)
+    except Exception:
+        log.exception("storing the text extracted from %s failed", file_ref)
+
+
+def submit(file_ref):
+    """Start extracting an uploaded file unless its content was extracted before."""
+    if not file_ref or not _claim(file_ref):
+        return
+    path = os.path.abspath(resolve_upload(file_ref))
+    pool = extraction_pool.get()
+    if pool is None:
+        _store(file_ref, extract_file(path))
+        return
+    try:
+        future = pool.submit(extract_file, path)
+    except Exception as e:
+        # the pool broke or was shut down since extraction_pool.get()
+        extraction_pool.shutdown()
+        _store(file_ref, _failed(e))
+        return
+    future.add_done_callback(lambda future: _finished(file_ref, future))
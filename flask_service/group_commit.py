@@ -0,0 +1,119 @@
+# flask_service/group_commit.py
+# Group commit for POST /answers/create, switched on with ANSWER_GROUP_COMMIT=1.
+# Request threads hand their row to a writer thread in this process and wait.
+# The writer takes the first waiting row, gathers whatever else arrives within
+# ANSWER_BATCH_DELAY_MS (at most ANSWER_BATCH_SIZE rows) and inserts the lot
+# with one executemany ... RETURNING and one COMMIT, so a single fsync serves
+# the whole batch. A caller gets its id only after that commit: an id handed
+# out is as durable as with a commit per request.
+#
+# A batch that fails (e.g. one row with an unknown interview) is retried row
+# by row in savepoints, as bulk ingestion does; only the offending callers
+# see the error.
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+from common.db import session_scope
+from common.notifications import publish, INTERVIEW_CHANGED
+from .models import InterviewAnswer
+from .metrics import GROUP_COMMIT_ROWS
+
+log = logging.getLogger(__name__)
+
+ANSWER_GROUP_COMMIT = os.getenv("ANSWER_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+ANSWER_BATCH_SIZE = int(os.getenv("ANSWER_BATCH_SIZE", "100"))
+ANSWER_BATCH_DELAY_MS = float(os.getenv("ANSWER_BATCH_DELAY_MS", "5"))
+
+
+class GroupCommitWriter:
+    """Batches single-row inserts into `model`; submit() returns the committed row's columns.
+
+    before_commit(db, rows) runs in each batch's transaction with the
+    RETURNING rows that went in.
+    """
+
+    def __init__(self, model, returning, max_batch, max_delay, before_commit=None, enabled=True):
+        self.model = model
+        self.returning = returning
+        self.before_commit = before_commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        # one writer per process, started on first use (after a fork the
+        # parent's thread does not exist in the child)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self._queue,), name="group-commit", daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, values):
+        """Insert `values` with the next batch; blocks until it commits and returns the RETURNING row."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((values, future))
+        return future.result()
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(pending.get(timeout=timeout) if timeout > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                log.exception("group commit of %d rows failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch):
+        stmt = insert(self.model).returning(*self.returning, sort_by_parameter_order=True)
+        with session_scope() as db:
+            try:
+                rows = db.execute(stmt, [values for values, _ in batch]).all()
+                done = list(zip(batch, rows))
+                if self.before_commit:
+                    self.before_commit(db, rows)
+                db.commit()
+            except DBAPIError:
+                db.rollback()
+                done = []
+                for values, future in batch:
+                    try:
+                        with db.begin_nested():
+                            done.append(((values, future), db.execute(stmt, values).one()))
+                    except DBAPIError as e:
+                        future.set_exception(e)
+                if done and self.before_commit:
+                    self.before_commit(db, [row for _, row in done])
+                db.commit()
+        GROUP_COMMIT_ROWS.observe(len(done))
+        for (_, future), row in done:
+            future.set_result(row)
+
+
+answer_writer = GroupCommitWriter(
+    InterviewAnswer, (InterviewAnswer.id, InterviewAnswer.interview_id),
+    max_batch=ANSWER_BATCH_SIZE, max_delay=ANSWER_BATCH_DELAY_MS / 1000,
+    before_commit=lambda db, rows: publish(db, INTERVIEW_CHANGED, sorted({r.interview_id for r in rows})),
+    enabled=ANSWER_GROUP_COMMIT,
+)
@@ -0,0 +1,41 @@
+# flask_service/gunicorn.conf.py
+# gunicorn settings for the Flask service (run from the directory above the package):
+#
+#   python -m flask_service.prestart
+#   gunicorn -c flask_service/gunicorn.conf.py flask_service.wsgi:app
+#
+# The app is imported once in the master and the workers are forked from it;
+# each worker then opens its own connections and background threads.
+import multiprocessing
+import os
+import shutil
+import time
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5001')}"
+workers = int(os.getenv("FLASK_WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("FLASK_WEB_THREADS", "4"))
+timeout = int(os.getenv("FLASK_WEB_TIMEOUT", "30"))
+preload_app = True
+
+# samples left by a previous run would be added to this one's; cleared here
+# because the config is read before the app (and its metrics) is imported
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def post_fork(server, worker):
+    start = time.perf_counter()
+    from common.db import dispose_after_fork
+    from flask_service.app import start_background
+    # connections the master may have opened belong to the master
+    dispose_after_fork()
+    start_background()
+    server.log.info("worker %s ready in %.3f s", worker.pid, time.perf_counter() - start)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
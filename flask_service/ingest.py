@@ -0,0 +1,124 @@
+# flask_service/ingest.py
+# Streaming bulk ingestion: rows are decoded from the request body one at a
+# time, validated, and inserted in executemany batches; invalid rows are
+# reported by line number without aborting the rest of the upload.
+import csv
+import io
+import json
+import os
+import time
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from .schemas import RowError
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+# only the first errors are listed in the response; all are counted
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson")
+CSV_TYPES = ("text/csv",)
+
+
+def iter_rows(stream, mimetype):
+    """Yield (line number, row dict or RowError) from an NDJSON or CSV body."""
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8", newline="")
+    if mimetype in CSV_TYPES:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, RowError("expected a JSON object")
+            continue
+        yield line_no, row
+
+
+class _Report:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": round(self.inserted / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def ingest(db, rows, model, validate, check_batch=None, before_commit=None, after_commit=None,
+           batch_size=INGEST_BATCH_SIZE):
+    """Insert validated rows into `model` in batches and return the ingestion report.
+
+    check_batch(db, batch) may reject rows that need a database lookup (it
+    returns the accepted (line, values) pairs and (line, message) errors);
+    before_commit / after_commit receive each committed batch's values.
+    """
+    report = _Report()
+    batch = []
+    for line, row in rows:
+        if isinstance(row, RowError):
+            report.error(line, str(row))
+            continue
+        try:
+            batch.append((line, validate(row)))
+        except RowError as e:
+            report.error(line, str(e))
+            continue
+        if len(batch) >= batch_size:
+            _flush(db, model, batch, report, check_batch, before_commit, after_commit)
+            batch = []
+    if batch:
+        _flush(db, model, batch, report, check_batch, before_commit, after_commit)
+    return report.as_dict()
+
+
+def _flush(db, model, batch, report, check_batch, before_commit, after_commit):
+    if check_batch:
+        batch, errors = check_batch(db, batch)
+        for line, message in errors:
+            report.error(line, message)
+    if not batch:
+        return
+    values = [v for _, v in batch]
+    try:
+        db.execute(insert(model), values)
+        if before_commit:
+            before_commit(db, values)
+        db.commit()
+    except DBAPIError:
+        # find the offending rows one by one; the rest of the batch still goes in
+        db.rollback()
+        values = []
+        for line, v in batch:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(model).values(**v))
+                values.append(v)
+            except DBAPIError as e:
+                report.error(line, str(e.orig).strip().splitlines()[0])
+        if values and before_commit:
+            before_commit(db, values)
+        db.commit()
+    report.inserted += len(values)
+    if after_commit and values:
+        after_commit(values)
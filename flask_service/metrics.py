@@ -0,0 +1,61 @@
+# flask_service/metrics.py
+# Prometheus metrics for the Flask service, served on GET /metrics: latency
+# per route, database queries and database time per request (the plumbing is
+# in common.metrics), upload sizes and the time spent calling the evaluator.
+import logging
+import time
+from flask import Response, g, request
+from prometheus_client import Counter, Histogram
+from common.db import count_queries
+from common.metrics import SLOW_REQUEST_SECONDS, RequestMetrics, render, service_registry
+
+registry = service_registry()
+HTTP_REQUESTS = RequestMetrics(registry, logging.getLogger("flask_service.slow_requests"))
+UPLOAD_BYTES = Histogram("upload_bytes", "Size of uploaded files", ["field"],
+                         buckets=(1024, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864), registry=registry)
+EXTRACTION_SECONDS = Histogram("text_extraction_seconds", "Time to extract the text of an uploaded file",
+                               ["extractor", "status"], registry=registry,
+                               buckets=(.001, .005, .01, .05, .1, .25, .5, 1, 2.5, 5, 10, 30))
+GROUP_COMMIT_ROWS = Histogram("answer_group_commit_rows", "Answers committed per group commit",
+                              buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512), registry=registry)
+# outcome: ok / error / rejected (circuit breaker open, no request sent)
+OUTBOUND_SECONDS = Histogram("outbound_request_seconds", "Calls to other services", ["target", "outcome"], registry=registry)
+OUTBOUND_RETRIES = Counter("outbound_request_retries_total", "Retried calls to other services", ["target"],
+                           registry=registry)
+
+
+def observe_upload(field, size):
+    UPLOAD_BYTES.labels(field).observe(size)
+
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_queries = count_queries(record_statements=SLOW_REQUEST_SECONDS > 0)
+    g.metrics_counter = g.metrics_queries.__enter__()
+
+
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    if "metrics_start" not in g:
+        return
+    elapsed = time.perf_counter() - g.metrics_start
+    counter = g.metrics_counter
+    g.metrics_queries.__exit__(None, None, None)
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_REQUESTS.observe(request.method, route, request.path, g.get("metrics_status", 500), elapsed, counter)
+
+
+def metrics_view():
+    body, content_type = render(registry)
+    return Response(body, mimetype=content_type)
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
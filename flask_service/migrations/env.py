@@ -0,0 +1,37 @@
+# flask_service/migrations/env.py
+# Runs migrations on the connection handed over by models.create_tables(), or
+# on the service's own engine when invoked from the alembic command line.
+import logging.config
+import os
+import sys
+from alembic import context
+
+config = context.config
+connection = config.attributes.get("connection")
+
+if connection is None:
+    # alembic command line: common/ is imported from the repo root
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    if config.config_file_name:
+        logging.config.fileConfig(config.config_file_name)
+
+from common.db import engine, lock_schema  # noqa: E402
+
+
+def run_migrations(connection):
+    # one schema change at a time across processes and services (Postgres)
+    lock_schema(connection)
+    context.configure(
+        connection=connection,
+        # SQLite can only alter tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if connection is not None:
+    run_migrations(connection)
+else:
+    with engine.begin() as connection:
+        run_migrations(connection)
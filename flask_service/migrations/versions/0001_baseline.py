@@ -0,0 +1,79 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Databases created before migrations existed already have these tables
+(from create_all), so each one is only created when missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table):
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("candidates"):
+        op.create_table(
+            "candidates",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("resume_path", sa.String(1024), nullable=True),
+            sa.Column("created_at", sa.DateTime),
+        )
+    if _missing("interviews"):
+        op.create_table(
+            "interviews",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("candidate_id", sa.Integer, sa.ForeignKey("candidates.id"), nullable=False),
+            sa.Column("skill", sa.String(100), nullable=False),
+            sa.Column("status", sa.String(50)),
+            sa.Column("started_at", sa.DateTime),
+            sa.Column("completed_at", sa.DateTime, nullable=True),
+        )
+    if _missing("interview_questions"):
+        op.create_table(
+            "interview_questions",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("skill", sa.String(100), nullable=False, index=True),
+            sa.Column("text", sa.Text, nullable=False),
+            sa.Column("expected_keywords", sa.Text, nullable=True),
+        )
+    if _missing("interview_answers"):
+        op.create_table(
+            "interview_answers",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("interview_id", sa.Integer, sa.ForeignKey("interviews.id"), nullable=False),
+            sa.Column("question_id", sa.Integer, sa.ForeignKey("interview_questions.id"), nullable=False),
+            sa.Column("answer_text", sa.Text, nullable=True),
+            sa.Column("uploaded_file_path", sa.String(1024), nullable=True),
+            sa.Column("scored", sa.Boolean),
+            sa.Column("score", sa.Float, nullable=True),
+            sa.Column("evaluator_notes", sa.Text, nullable=True),
+        )
+    if _missing("interview_results"):
+        op.create_table(
+            "interview_results",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("interview_id", sa.Integer, sa.ForeignKey("interviews.id"), nullable=False, unique=True),
+            sa.Column("total_score", sa.Float, nullable=False),
+            sa.Column("verdict", sa.String(50), nullable=False),
+            sa.Column("details", sa.Text, nullable=True),
+            sa.Column("created_at", sa.DateTime),
+        )
+
+
+def downgrade() -> None:
+    for table in ("interview_results", "interview_answers", "interview_questions", "interviews", "candidates"):
+        op.drop_table(table)
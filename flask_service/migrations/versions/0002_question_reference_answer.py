@@ -0,0 +1,26 @@
+"""reference answers for semantic scoring
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("interview_questions") as batch:
+        batch.add_column(sa.Column("reference_answer", sa.Text, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("interview_questions") as batch:
+        batch.drop_column("reference_answer")
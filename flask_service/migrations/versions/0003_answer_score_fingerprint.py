@@ -0,0 +1,26 @@
+"""fingerprint of the inputs each answer score was computed from
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("interview_answers") as batch:
+        batch.add_column(sa.Column("score_fingerprint", sa.String(40), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("interview_answers") as batch:
+        batch.drop_column("score_fingerprint")
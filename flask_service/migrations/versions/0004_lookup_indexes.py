@@ -0,0 +1,38 @@
+"""indexes for the hot lookups and the keyset-paginated listings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Listings filter on one column and page by id, so each index ends in id:
+WHERE status = ? AND id < :cursor ORDER BY id DESC LIMIT n is then a
+single index range scan however deep the page. interview_results.interview_id
+is already covered by its unique constraint.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_interview_answers_interview_id", "interview_answers", ["interview_id", "id"]),
+    ("ix_interviews_candidate_id", "interviews", ["candidate_id", "id"]),
+    ("ix_interviews_status", "interviews", ["status", "id"]),
+    ("ix_interviews_skill", "interviews", ["skill", "id"]),
+    ("ix_interviews_started_at", "interviews", ["started_at", "id"]),
+    ("ix_interview_results_verdict", "interview_results", ["verdict", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
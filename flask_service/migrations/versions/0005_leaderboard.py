@@ -0,0 +1,57 @@
+"""leaderboard entries and per-skill score buckets
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+The evaluator keeps both tables in step with interview_results; this
+revision backfills them from the results already stored.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leaderboard_entries",
+        sa.Column("interview_id", sa.Integer, sa.ForeignKey("interviews.id"), primary_key=True),
+        sa.Column("skill", sa.String(100), nullable=False),
+        sa.Column("candidate_id", sa.Integer, nullable=False),
+        sa.Column("total_score", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+    )
+    op.create_index("ix_leaderboard_entries_skill_score", "leaderboard_entries",
+                    ["skill", "total_score", "interview_id"])
+    op.create_index("ix_leaderboard_entries_candidate", "leaderboard_entries",
+                    ["candidate_id", "skill", "total_score"])
+    op.create_table(
+        "skill_score_buckets",
+        sa.Column("skill", sa.String(100), primary_key=True),
+        sa.Column("bucket", sa.Integer, primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False),
+        sa.Column("score_sum", sa.Float, nullable=False),
+    )
+    op.execute(
+        "INSERT INTO leaderboard_entries (interview_id, skill, candidate_id, total_score, updated_at) "
+        "SELECT r.interview_id, i.skill, i.candidate_id, r.total_score, r.created_at "
+        "FROM interview_results r JOIN interviews i ON i.id = r.interview_id"
+    )
+    op.execute(
+        "INSERT INTO skill_score_buckets (skill, bucket, count, score_sum) "
+        "SELECT skill, CAST(ROUND(total_score * 100) AS INTEGER) / 100, COUNT(*), SUM(total_score) "
+        "FROM leaderboard_entries GROUP BY skill, CAST(ROUND(total_score * 100) AS INTEGER) / 100"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("skill_score_buckets")
+    op.drop_index("ix_leaderboard_entries_candidate", table_name="leaderboard_entries")
+    op.drop_index("ix_leaderboard_entries_skill_score", table_name="leaderboard_entries")
+    op.drop_table("leaderboard_entries")
@@ -0,0 +1,38 @@
+"""text extracted from uploaded answer files, keyed by content hash
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+One row per distinct upload (the "sha256:<hex>" reference stored in
+interview_answers.uploaded_file_path), written by the Flask extraction pool
+and read by the evaluator.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "extracted_texts",
+        sa.Column("file_ref", sa.String(80), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("extractor", sa.String(20), nullable=True),
+        sa.Column("text", sa.Text, nullable=True),
+        sa.Column("truncated", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("seconds", sa.Float, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("extracted_texts")
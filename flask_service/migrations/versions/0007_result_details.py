@@ -0,0 +1,106 @@
+"""per-answer result details as rows; result version
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+interview_results.details (a JSON text blob) becomes interview_result_details,
+one row per scored answer, indexed by question and score so results can be
+filtered on a question's score in SQL. interview_results.version is bumped on
+every rewrite of a result and keys the evaluator's cached response bodies.
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+
+results = sa.table(
+    "interview_results",
+    sa.column("id", sa.Integer),
+    sa.column("interview_id", sa.Integer),
+    sa.column("details", sa.Text),
+)
+details = sa.table(
+    "interview_result_details",
+    sa.column("interview_id", sa.Integer),
+    sa.column("answer_id", sa.Integer),
+    sa.column("question_id", sa.Integer),
+    sa.column("score", sa.Float),
+    sa.column("notes", sa.Text),
+)
+
+
+def _batches(bind, stmt, key):
+    # keyset pagination, so large tables are never read in one piece
+    last = None
+    while True:
+        page = bind.execute((stmt if last is None else stmt.where(key > last)).order_by(key).limit(BATCH)).all()
+        if not page:
+            return
+        yield page
+        last = page[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "interview_result_details",
+        sa.Column("interview_id", sa.Integer, sa.ForeignKey("interviews.id"), primary_key=True),
+        sa.Column("answer_id", sa.Integer, primary_key=True),
+        sa.Column("question_id", sa.Integer, nullable=True),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column("notes", sa.Text, nullable=True),
+    )
+    op.create_index("ix_interview_result_details_question_score", "interview_result_details",
+                    ["question_id", "score", "interview_id"])
+
+    bind = op.get_bind()
+    stmt = sa.select(results.c.id, results.c.interview_id, results.c.details).where(results.c.details.isnot(None))
+    for page in _batches(bind, stmt, results.c.id):
+        rows = []
+        for _, interview_id, blob in page:
+            try:
+                entries = json.loads(blob)
+            except ValueError:
+                continue
+            rows.extend({"interview_id": interview_id, "answer_id": d["answer_id"], "question_id": d.get("question_id"),
+                         "score": d.get("score") or 0.0, "notes": d.get("notes")}
+                        for d in entries if isinstance(d, dict) and d.get("answer_id") is not None)
+        if rows:
+            op.bulk_insert(details, rows)
+
+    with op.batch_alter_table("interview_results") as batch:
+        batch.add_column(sa.Column("version", sa.Integer, nullable=False, server_default="1"))
+        batch.drop_column("details")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("interview_results") as batch:
+        batch.add_column(sa.Column("details", sa.Text, nullable=True))
+        batch.drop_column("version")
+
+    bind = op.get_bind()
+    stmt = sa.select(details.c.interview_id, details.c.answer_id, details.c.question_id,
+                     details.c.score, details.c.notes)
+    per_interview = {}
+    for page in _batches(bind, sa.select(results.c.interview_id), results.c.interview_id):
+        ids = [r[0] for r in page]
+        per_interview.clear()
+        for interview_id, answer_id, question_id, score, notes in bind.execute(
+                stmt.where(details.c.interview_id.in_(ids)).order_by(details.c.interview_id, details.c.answer_id)):
+            per_interview.setdefault(interview_id, []).append(
+                {"answer_id": answer_id, "question_id": question_id, "score": score, "notes": notes})
+        for interview_id, entries in per_interview.items():
+            bind.execute(results.update().where(results.c.interview_id == interview_id)
+                         .values(details=json.dumps(entries)))
+
+    op.drop_index("ix_interview_result_details_question_score", table_name="interview_result_details")
+    op.drop_table("interview_result_details")
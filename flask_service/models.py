@@ -1,21 +1,12 @@
 # flask_service/models.py
+# The interview schema. The engine and sessions shared with the evaluator are
+# in common.db.
 import os
-from sqlalchemy import (Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean)
+from sqlalchemy import (Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index)
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
 
-load_dotenv()
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "interviewdb")
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-
-DATABASE_URL = f"postgresql://{POSTGRES_USER}:{quote_plus(POSTGRES_PASSWORD)}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+from common.db import engine, lock_schema
 
 Base = declarative_base()
 
@@ -37,6 +28,17 @@ class Interview(Base):
     completed_at = Column(DateTime, nullable=True)
 
     candidate = relationship("Candidate")
+    answers = relationship("InterviewAnswer", order_by="InterviewAnswer.id")
+    result = relationship("InterviewResult", uselist=False)
+
+    # (filter column, id) so keyset-paginated listings are one index range scan;
+    # created by migration 0004
+    __table_args__ = (
+        Index("ix_interviews_candidate_id", "candidate_id", "id"),
+        Index("ix_interviews_status", "status", "id"),
+        Index("ix_interviews_skill", "skill", "id"),
+        Index("ix_interviews_started_at", "started_at", "id"),
+    )
 
 class InterviewQuestion(Base):
     __tablename__ = "interview_questions"
@@ -44,6 +46,7 @@ class InterviewQuestion(Base):
     skill = Column(String(100), nullable=False, index=True)
     text = Column(Text, nullable=False)
     expected_keywords = Column(Text, nullable=True)  # comma separated
+    reference_answer = Column(Text, nullable=True)   # model answer for semantic scoring
 
 class InterviewAnswer(Base):
     __tablename__ = "interview_answers"
@@ -55,6 +58,10 @@ class InterviewAnswer(Base):
     scored = Column(Boolean, default=False)
     score = Column(Float, nullable=True)
     evaluator_notes = Column(Text, nullable=True)
+    # hash of what the score was computed from; written by the evaluator
+    score_fingerprint = Column(String(40), nullable=True)
+
+    __table_args__ = (Index("ix_interview_answers_interview_id", "interview_id", "id"),)
 
 class InterviewResult(Base):
     __tablename__ = "interview_results"
@@ -62,11 +69,76 @@ class InterviewResult(Base):
     interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False, unique=True)
     total_score = Column(Float, nullable=False)
     verdict = Column(String(50), nullable=False)
-    details = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # bumped by the evaluator on every rewrite; created by migration 0007
+    version = Column(Integer, nullable=False, default=1)
+
+    details = relationship(
+        "InterviewResultDetail", order_by="InterviewResultDetail.answer_id", viewonly=True,
+        primaryjoin="InterviewResult.interview_id == foreign(InterviewResultDetail.interview_id)")
+
+    __table_args__ = (Index("ix_interview_results_verdict", "verdict", "id"),)
+
+class InterviewResultDetail(Base):
+    # per-answer part of an interview result, written by the evaluator; created by migration 0007
+    __tablename__ = "interview_result_details"
+    interview_id = Column(Integer, ForeignKey("interviews.id"), primary_key=True)
+    answer_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, nullable=True)
+    score = Column(Float, nullable=False)
+    notes = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_interview_result_details_question_score", "question_id", "score", "interview_id"),
+    )
+
+class LeaderboardEntry(Base):
+    # one row per evaluated interview, maintained by the evaluator alongside
+    # interview_results; created by migration 0005
+    __tablename__ = "leaderboard_entries"
+    interview_id = Column(Integer, ForeignKey("interviews.id"), primary_key=True)
+    skill = Column(String(100), nullable=False)
+    candidate_id = Column(Integer, nullable=False)
+    total_score = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_leaderboard_entries_skill_score", "skill", "total_score", "interview_id"),
+        Index("ix_leaderboard_entries_candidate", "candidate_id", "skill", "total_score"),
+    )
+
+class SkillScoreBucket(Base):
+    # leaderboard entries per skill and whole point of score (87.25 -> 87)
+    __tablename__ = "skill_score_buckets"
+    skill = Column(String(100), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+class ExtractedText(Base):
+    # text pulled out of an uploaded answer file, one row per distinct content
+    # (file_ref is the "sha256:<hex>" upload reference); created by migration 0006
+    __tablename__ = "extracted_texts"
+    file_ref = Column(String(80), primary_key=True)
+    status = Column(String(20), nullable=False)  # pending / done / failed
+    extractor = Column(String(20), nullable=True)  # text / pdf / docx
+    text = Column(Text, nullable=True)
+    truncated = Column(Boolean, nullable=False, default=False)  # size or time budget reached
+    error = Column(Text, nullable=True)
+    seconds = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
 
 def create_tables():
-    Base.metadata.create_all(bind=engine)
+    """Bring the schema up to date by running the alembic migrations."""
+    from alembic import command
+    from alembic.config import Config
+    cfg = Config()
+    cfg.set_main_option("script_location", MIGRATIONS_DIR)
+    with engine.begin() as conn:
+        # one schema change at a time across processes and services
+        lock_schema(conn)
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, "head")
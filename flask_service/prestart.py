@@ -0,0 +1,56 @@
+# flask_service/prestart.py
+# One-off work done once per deployment, before the server forks its workers:
+# schema migrations and the question bank seed. Workers never repeat it.
+#
+#   python -m flask_service.prestart
+import time
+
+from common.db import session_scope
+from common.notifications import publish, QUESTION_BANK_CHANGED
+from .models import create_tables, InterviewQuestion
+
+
+# seed questions only once
+def seed_questions():
+    with session_scope() as db:
+        existing = db.query(InterviewQuestion).count()
+        if existing == 0:
+            qs = [
+                InterviewQuestion(skill="python",
+                    text="Explain list comprehensions and give an example.",
+                    expected_keywords="list comprehension,for,in",
+                    reference_answer="A list comprehension builds a new list from an iterable in one expression, "
+                                     "with a for clause and an optional if filter, e.g. [x * x for x in nums if x > 0]."),
+                InterviewQuestion(skill="python",
+                    text="What are decorators and when do you use them?",
+                    expected_keywords="decorator,function,wrap",
+                    reference_answer="A decorator is a function that takes another function and wraps it to add "
+                                     "behaviour such as logging, caching or access checks without changing its code."),
+                InterviewQuestion(skill="ml",
+                    text="What is overfitting and how to prevent it?",
+                    expected_keywords="overfitting,regularization,validation",
+                    reference_answer="Overfitting is when a model learns noise in the training data and generalises "
+                                     "poorly; prevent it with regularization, more data, simpler models, early stopping "
+                                     "and cross validation."),
+                InterviewQuestion(skill="sql",
+                    text="Explain INNER JOIN vs LEFT JOIN.",
+                    expected_keywords="inner join,left join,rows",
+                    reference_answer="An INNER JOIN returns only rows with matches in both tables, while a LEFT JOIN "
+                                     "returns all rows of the left table and NULLs where the right table has no match."),
+            ]
+            db.add_all(qs)
+            db.flush()
+            publish(db, QUESTION_BANK_CHANGED, [q.id for q in qs])
+            db.commit()
+
+
+def prestart():
+    """Migrate and seed; returns the seconds it took."""
+    start = time.perf_counter()
+    create_tables()
+    seed_questions()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"flask_service prestart done in {prestart():.3f} s")
@@ -1,39 +1,68 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+import hashlib
 import os
 import requests
 
+from common.db import session_scope, pool_status
+from common.notifications import publish, INTERVIEW_CHANGED
+from common.question_bank import question_bank
+from common.read_routing import read_session, recent_writes
+from common.service_client import ServiceError
 from .models import (
-    SessionLocal, create_tables,
     Candidate, Interview,
-    InterviewQuestion, InterviewAnswer,
+    InterviewAnswer,
     InterviewResult
 )
 from .utils import save_file
+from . import extraction
+from .cache import TTLCache
+from .ingest import ingest, iter_rows, NDJSON_TYPES, CSV_TYPES
+from .schemas import candidate_row, answer_row
+from .service_client import evaluator
+from .group_commit import answer_writer
 
 bp = Blueprint("api", __name__)
 
+# assembled dashboard payloads: interview_id -> (etag, body)
+dashboard_cache = TTLCache(
+    maxsize=int(os.getenv("DASHBOARD_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "30")),
+)
+
+
+# listing page sizes
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 500
+
+
+def invalidate_interviews(interview_ids):
+    for interview_id in interview_ids:
+        dashboard_cache.invalidate(interview_id)
+    # read them from the primary until the replica has caught up
+    recent_writes.mark(interview_ids)
+
 # CREATE CANDIDATE
 @bp.route("/candidates/create", methods=["POST"])
 def create_candidate():
-    db = SessionLocal()
-
     data = request.form.to_dict() if request.form else request.json
     name = data.get("name")
     email = data.get("email")
 
+    if not name or not email:
+        return jsonify({"error": "name and email required"}), 400
+
     resume_path = None
     if "resume" in request.files:
         resume_path = save_file(request.files["resume"])
 
-    if not name or not email:
-        return jsonify({"error": "name and email required"}), 400
-
-    cand = Candidate(name=name, email=email, resume_path=resume_path)
-    db.add(cand)
-    db.commit()
-    db.refresh(cand)
-    db.close()
+    with session_scope() as db:
+        cand = Candidate(name=name, email=email, resume_path=resume_path)
+        db.add(cand)
+        db.commit()
+        db.refresh(cand)
 
     return jsonify({"id": cand.id, "name": cand.name, "email": cand.email})
 
@@ -41,7 +70,6 @@ def create_candidate():
 # CREATE INTERVIEW
 @bp.route("/interviews/create", methods=["POST"])
 def create_interview():
-    db = SessionLocal()
     data = request.json or request.form.to_dict()
 
     candidate_id = data.get("candidate_id")
@@ -50,40 +78,37 @@ def create_interview():
     if not candidate_id or not skill:
         return jsonify({"error": "candidate_id and skill required"}), 400
 
-    iv = Interview(candidate_id=int(candidate_id), skill=skill)
-    db.add(iv)
-    db.commit()
-    db.refresh(iv)
-    db.close()
+    with session_scope() as db:
+        iv = Interview(candidate_id=int(candidate_id), skill=skill)
+        db.add(iv)
+        db.flush()
+        publish(db, INTERVIEW_CHANGED, [iv.id])
+        db.commit()
+        db.refresh(iv)
 
+    invalidate_interviews([iv.id])
     return jsonify({"id": iv.id, "candidate_id": iv.candidate_id, "skill": iv.skill})
 
 
 # GET QUESTIONS FOR INTERVIEW
 @bp.route("/interviews/<int:interview_id>/questions", methods=["GET"])
 def get_questions(interview_id):
-    db = SessionLocal()
-
-    interview = db.query(Interview).filter(Interview.id == interview_id).first()
-    if not interview:
-        db.close()
+    with read_session(interview_id) as db:
+        skill = db.execute(
+            select(Interview.skill).where(Interview.id == interview_id)
+        ).scalar_one_or_none()
+    if skill is None:
         return jsonify({"error": "Interview not found"}), 404
 
-    questions = db.query(InterviewQuestion).filter(
-        InterviewQuestion.skill == interview.skill
-    ).all()
-
-    result = [{"id": q.id, "text": q.text} for q in questions]
+    # served from the warm question index; no query against interview_questions
+    result = question_bank.questions_for(skill)
 
-    db.close()
     return jsonify({"interview_id": interview_id, "questions": result})
 
 
 # SAVE ANSWER
 @bp.route("/answers/create", methods=["POST"])
 def save_answer():
-    db = SessionLocal()
-
     if request.content_type.startswith("multipart/form-data"):
         interview_id = request.form.get("interview_id")
         question_id = request.form.get("question_id")
@@ -98,91 +123,232 @@ def save_answer():
         answer_text = data.get("answer_text")
         file_path = None
 
-    ans = InterviewAnswer(
-        interview_id=interview_id,
-        question_id=question_id,
-        answer_text=answer_text,
-        uploaded_file_path=file_path
-    )
+    if answer_writer.enabled:
+        # committed with whatever other answers arrive within the batch delay
+        ans = answer_writer.submit({
+            "interview_id": interview_id,
+            "question_id": question_id,
+            "answer_text": answer_text,
+            "uploaded_file_path": file_path
+        })
+    else:
+        with session_scope() as db:
+            ans = InterviewAnswer(
+                interview_id=interview_id,
+                question_id=question_id,
+                answer_text=answer_text,
+                uploaded_file_path=file_path
+            )
+
+            db.add(ans)
+            publish(db, INTERVIEW_CHANGED, [ans.interview_id])
+            db.commit()
+            db.refresh(ans)
+
+    invalidate_interviews([ans.interview_id])
+    # the evaluator scores the file's text once the pool has extracted it
+    extraction.submit(file_path)
+    return jsonify({"id": ans.id})
 
-    db.add(ans)
-    db.commit()
-    db.refresh(ans)
-    db.close()
 
-    return jsonify({"id": ans.id})
+# BULK INGESTION (NDJSON or CSV body)
+def _ingest_mimetype():
+    if request.mimetype in NDJSON_TYPES + CSV_TYPES:
+        return request.mimetype
+    return None
+
+
+def _check_answer_refs(db, batch):
+    interview_ids = {v["interview_id"] for _, v in batch}
+    known = set(db.execute(
+        select(Interview.id).where(Interview.id.in_(interview_ids))
+    ).scalars())
+    accepted, errors = [], []
+    for line, v in batch:
+        if v["interview_id"] not in known:
+            errors.append((line, f"interview {v['interview_id']} not found"))
+        elif question_bank.get(v["question_id"]) is None:
+            errors.append((line, f"question {v['question_id']} not found"))
+        else:
+            accepted.append((line, v))
+    return accepted, errors
+
+
+@bp.route("/candidates/bulk", methods=["POST"])
+def bulk_create_candidates():
+    mimetype = _ingest_mimetype()
+    if not mimetype:
+        return jsonify({"error": "send application/x-ndjson or text/csv"}), 415
+
+    with session_scope() as db:
+        report = ingest(db, iter_rows(request.stream, mimetype), Candidate, candidate_row)
+
+    return jsonify(report)
+
+
+@bp.route("/answers/bulk", methods=["POST"])
+def bulk_create_answers():
+    mimetype = _ingest_mimetype()
+    if not mimetype:
+        return jsonify({"error": "send application/x-ndjson or text/csv"}), 415
+
+    def interview_ids(values):
+        return sorted({v["interview_id"] for v in values})
+
+    with session_scope() as db:
+        report = ingest(
+            db, iter_rows(request.stream, mimetype), InterviewAnswer, answer_row,
+            check_batch=_check_answer_refs,
+            before_commit=lambda db, values: publish(db, INTERVIEW_CHANGED, interview_ids(values)),
+            after_commit=lambda values: invalidate_interviews(interview_ids(values)),
+        )
+
+    return jsonify(report)
 
 
 # COMPLETE INTERVIEW & TRIGGER FASTAPI EVALUATION
 @bp.route("/interviews/<int:interview_id>/complete", methods=["PUT"])
 def complete_interview(interview_id):
-    db = SessionLocal()
-    iv = db.query(Interview).filter(Interview.id == interview_id).first()
+    with session_scope() as db:
+        iv = db.query(Interview).filter(Interview.id == interview_id).first()
 
-    if not iv:
-        db.close()
-        return jsonify({"error": "Interview not found"}), 404
+        if not iv:
+            return jsonify({"error": "Interview not found"}), 404
 
-    iv.status = "completed"
-    iv.completed_at = datetime.utcnow()
-    db.commit()
-    db.refresh(iv)
-    db.close()
+        iv.status = "completed"
+        iv.completed_at = datetime.utcnow()
+        publish(db, INTERVIEW_CHANGED, [interview_id])
+        db.commit()
 
-    FASTAPI_URL = os.getenv("FASTAPI_URL", "http://fastapi:8000")
+    invalidate_interviews([interview_id])
 
+    # enqueue only: scoring runs on the evaluator's worker pool. When the
+    # evaluator is unreachable (or its circuit is open) the completion still
+    # stands; the evaluator's sweep enqueues completed interviews without a job
     try:
-        r = requests.post(f"{FASTAPI_URL}/evaluate/interview/{interview_id}", timeout=20)
+        r = evaluator.post(f"/jobs/evaluate/{interview_id}")
         r.raise_for_status()
-    except Exception as e:
-        return jsonify({"status": "completed", "evaluation": "failed", "error": str(e)}), 500
+        job = r.json()
+    except (ServiceError, ValueError, requests.RequestException) as e:
+        return jsonify({"status": "completed", "evaluation": "deferred", "reason": str(e)}), 202
 
-    return jsonify({"status": "completed", "evaluation": "started"})
+    return jsonify({"status": "completed", "evaluation": "queued", "job_id": job["job_id"]}), 202
+
+
+# LIST INTERVIEWS (newest first, keyset pagination)
+@bp.route("/interviews", methods=["GET"])
+def list_interviews():
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", LIST_DEFAULT_LIMIT)), 1), LIST_MAX_LIMIT)
+        cursor = int(args["cursor"]) if args.get("cursor") else None
+        candidate_id = int(args["candidate_id"]) if args.get("candidate_id") else None
+        started_from = datetime.fromisoformat(args["started_from"]) if args.get("started_from") else None
+        started_to = datetime.fromisoformat(args["started_to"]) if args.get("started_to") else None
+    except ValueError as e:
+        return jsonify({"error": f"invalid query parameter: {e}"}), 400
+
+    # the cursor is the last id of the previous page, so page 10,000 costs the
+    # same index seek as page 1 (no OFFSET)
+    stmt = select(Interview.id, Interview.candidate_id, Interview.skill, Interview.status,
+                  Interview.started_at, Interview.completed_at)
+    if args.get("status"):
+        stmt = stmt.where(Interview.status == args["status"])
+    if args.get("skill"):
+        stmt = stmt.where(Interview.skill == args["skill"])
+    if candidate_id is not None:
+        stmt = stmt.where(Interview.candidate_id == candidate_id)
+    if started_from:
+        stmt = stmt.where(Interview.started_at >= started_from)
+    if started_to:
+        stmt = stmt.where(Interview.started_at < started_to)
+    if cursor is not None:
+        stmt = stmt.where(Interview.id < cursor)
+
+    with read_session() as db:
+        rows = db.execute(stmt.order_by(Interview.id.desc()).limit(limit + 1)).all()
+
+    page = rows[:limit]
+    return jsonify({
+        "interviews": [{
+            "id": r.id,
+            "candidate_id": r.candidate_id,
+            "skill": r.skill,
+            "status": r.status,
+            "started_at": r.started_at.isoformat() if r.started_at else None,
+            "completed_at": r.completed_at.isoformat() if r.completed_at else None,
+        } for r in page],
+        "next_cursor": page[-1].id if len(rows) > limit else None,
+    })
 
 
 # DASHBOARD
 @bp.route("/interviews/<int:interview_id>", methods=["GET"])
 def dashboard(interview_id):
-    db = SessionLocal()
-
-    iv = db.query(Interview).filter(Interview.id == interview_id).first()
-    if not iv:
-        return jsonify({"error": "Interview not found"}), 404
-
-    cand = db.query(Candidate).filter(Candidate.id == iv.candidate_id).first()
-    answers = db.query(InterviewAnswer).filter(
-        InterviewAnswer.interview_id == interview_id
-    ).all()
-    result = db.query(InterviewResult).filter(
-        InterviewResult.interview_id == interview_id
-    ).first()
-
-    answer_list = [{
-        "answer_id": a.id,
-        "question_id": a.question_id,
-        "answer_text": a.answer_text,
-        "file": a.uploaded_file_path,
-        "score": a.score,
-        "scored": a.scored
-    } for a in answers]
-
-    dashboard = {
-        "interview": {
-            "id": iv.id,
-            "skill": iv.skill,
-            "status": iv.status
-        },
-        "candidate": {
-            "id": cand.id,
-            "name": cand.name,
-            "email": cand.email
-        },
-        "answers": answer_list,
-        "result": {
-            "total_score": result.total_score,
-            "verdict": result.verdict,
-            "details": result.details
-        } if result else None
-    }
-
-    return jsonify(dashboard)
+    cached = dashboard_cache.get(interview_id)
+    if cached is None:
+        # taken before the query: an invalidation that lands while we read
+        # makes set() below drop the (possibly stale) payload
+        generation = dashboard_cache.generation(interview_id)
+        with read_session(interview_id) as db:
+            # interview, candidate, answers and result in one joined SELECT
+            iv = db.execute(
+                select(Interview)
+                .options(joinedload(Interview.candidate),
+                         joinedload(Interview.answers),
+                         joinedload(Interview.result).joinedload(InterviewResult.details))
+                .where(Interview.id == interview_id)
+            ).unique().scalar_one_or_none()
+            if not iv:
+                return jsonify({"error": "Interview not found"}), 404
+
+            cand = iv.candidate
+            result = iv.result
+            answer_list = [{
+                "answer_id": a.id,
+                "question_id": a.question_id,
+                "answer_text": a.answer_text,
+                "file": a.uploaded_file_path,
+                "score": a.score,
+                "scored": a.scored
+            } for a in iv.answers]
+
+            dashboard = {
+                "interview": {
+                    "id": iv.id,
+                    "skill": iv.skill,
+                    "status": iv.status
+                },
+                "candidate": {
+                    "id": cand.id,
+                    "name": cand.name,
+                    "email": cand.email
+                },
+                "answers": answer_list,
+                "result": {
+                    "total_score": result.total_score,
+                    "verdict": result.verdict,
+                    "details": [{
+                        "answer_id": d.answer_id,
+                        "question_id": d.question_id,
+                        "score": d.score,
+                        "notes": d.notes
+                    } for d in result.details]
+                } if result else None
+            }
+
+        body = jsonify(dashboard).get_data()
+        cached = (hashlib.sha1(body).hexdigest(), body)
+        dashboard_cache.set(interview_id, cached, generation)
+
+    etag, body = cached
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    # answers 304 Not Modified when If-None-Match carries the current ETag
+    return resp.make_conditional(request)
+
+
+# POOL METRICS
+@bp.route("/metrics/pool", methods=["GET"])
+def metrics_pool():
+    return jsonify(pool_status())
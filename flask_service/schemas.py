@@ -0,0 +1,44 @@
+# flask_service/schemas.py
+# Row validation for the bulk ingestion endpoints. Each validator takes one
+# decoded NDJSON object or CSV row and returns the column values to insert,
+# or raises RowError with a message for the per-row error report.
+
+
+class RowError(ValueError):
+    pass
+
+
+def _required_str(row, field, max_length=255):
+    value = row.get(field)
+    if value is None or not str(value).strip():
+        raise RowError(f"{field} required")
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise RowError(f"{field} longer than {max_length} characters")
+    return value
+
+
+def _required_int(row, field):
+    value = row.get(field)
+    if value is None or str(value).strip() == "":
+        raise RowError(f"{field} required")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} must be an integer")
+
+
+def candidate_row(row):
+    return {
+        "name": _required_str(row, "name"),
+        "email": _required_str(row, "email"),
+    }
+
+
+def answer_row(row):
+    answer_text = row.get("answer_text")
+    return {
+        "interview_id": _required_int(row, "interview_id"),
+        "question_id": _required_int(row, "question_id"),
+        "answer_text": str(answer_text) if answer_text not in (None, "") else None,
+    }
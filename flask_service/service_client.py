@@ -0,0 +1,23 @@
+# flask_service/service_client.py
+# The Flask service's client for the evaluator; the retry, timeout and
+# circuit breaker logic is in common.service_client.
+import os
+
+from common.service_client import CircuitBreaker, ServiceClient
+from .metrics import OUTBOUND_RETRIES, OUTBOUND_SECONDS
+
+evaluator = ServiceClient(
+    "evaluator",
+    os.getenv("FASTAPI_URL", "http://fastapi:8000"),
+    connect_timeout=float(os.getenv("EVALUATOR_CONNECT_TIMEOUT", "1")),
+    read_timeout=float(os.getenv("EVALUATOR_READ_TIMEOUT", "3")),
+    retries=int(os.getenv("EVALUATOR_RETRIES", "2")),
+    backoff_seconds=float(os.getenv("EVALUATOR_BACKOFF_SECONDS", "0.1")),
+    pool_size=int(os.getenv("EVALUATOR_POOL_SIZE", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("EVALUATOR_BREAKER_FAILURES", "5")),
+        reset_seconds=float(os.getenv("EVALUATOR_BREAKER_RESET_SECONDS", "30")),
+    ),
+    seconds_metric=OUTBOUND_SECONDS,
+    retries_metric=OUTBOUND_RETRIES,
+)
@@ -1,14 +1,99 @@
 # flask_service/utils.py
+import hashlib
 import os
-from werkzeug.utils import secure_filename
-from datetime import datetime
+import tempfile
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+from .metrics import observe_upload
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+# uploads are stored once per distinct content under objects/<aa>/<bb>/<sha256>
+OBJECTS_DIR = os.path.join(UPLOAD_DIR, "objects")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+os.makedirs(OBJECTS_DIR, exist_ok=True)
+
+
+class HashingFile:
+    """Write-once temp file that hashes and size-checks data as it streams in.
+
+    Used as werkzeug's stream factory, so multipart uploads go straight to
+    disk in the parser's chunks instead of being spooled and copied.
+    """
+
+    def __init__(self, limit=MAX_UPLOAD_BYTES):
+        self._file = None
+        self.ref = None
+        self.limit = limit
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        fd, self.tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+        self._file = os.fdopen(fd, "w+b")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.limit:
+            self.close()
+            raise RequestEntityTooLarge(f"upload exceeds {self.limit} bytes")
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush for werkzeug's FileStorage
+        return getattr(self._file, name)
+
+    def commit(self):
+        """Move the content to its content-addressed path and return its reference."""
+        if self.ref is None:
+            self._file.close()
+            digest = self.sha256.hexdigest()
+            dest = object_path(digest)
+            if os.path.exists(dest):
+                os.remove(self.tmp_path)  # already stored: dedup
+            else:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(self.tmp_path, dest)
+            self.ref = f"sha256:{digest}"
+        return self.ref
+
+    def close(self):
+        # uploads that were never saved must not leave temp files behind
+        if self.ref is None:
+            self._file.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class StreamingRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingFile()
+
+
+def object_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest[2:4], digest)
+
+
+def resolve_upload(ref):
+    """Filesystem path for a stored upload reference (legacy plain paths pass through)."""
+    if ref and ref.startswith("sha256:"):
+        return object_path(ref[len("sha256:"):])
+    return ref
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 def save_file(file_storage):
-    filename = secure_filename(file_storage.filename)
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-    path = os.path.join(UPLOAD_DIR, f"{timestamp}_{filename}")
-    file_storage.save(path)
-    return path
+    stream = file_storage.stream
+    if not isinstance(stream, HashingFile):
+        # not parsed through StreamingRequest: copy it over in fixed-size chunks
+        copy = HashingFile()
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                copy.write(chunk)
+        except Exception:
+            copy.close()
+            raise
+        stream = copy
+    observe_upload(file_storage.name or "file", stream.size)
+    return stream.commit()
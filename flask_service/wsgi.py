@@ -0,0 +1,11 @@
+# flask_service/wsgi.py
+# WSGI entry point for production servers:
+#
+#   python -m flask_service.prestart
+#   gunicorn -c flask_service/gunicorn.conf.py flask_service.wsgi:app
+#
+# Servers without a post-fork hook get the same per-process startup on the
+# first request instead.
+from .app import app, start_background
+
+app.before_request(start_background)
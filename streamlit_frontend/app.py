@@ -1,12 +1,35 @@
 import streamlit as st
 import requests
 import os
+import json
+import time
+
+from common.service_client import CircuitBreaker, ServiceClient, ServiceError
 
 # ---------------------------
-# Correct service URLs for Docker networking
+# Service clients (URLs default to Docker networking)
 # ---------------------------
-FLASK_URL = os.getenv("FLASK_URL", "http://flask:5001")
-FASTAPI_URL = os.getenv("FASTAPI_URL", "http://fastapi:8000")
+@st.cache_resource
+def service_client(name, base_url):
+    """One client per service, shared by every script run: pooled keep-alive
+    connections, timeouts, a circuit breaker, and retries for GETs only
+    (a repeated POST could create a second candidate or answer)."""
+    return ServiceClient(
+        name, base_url,
+        connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3")),
+        read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "30")),
+        retries=int(os.getenv("HTTP_RETRIES", "2")),
+        backoff_seconds=float(os.getenv("HTTP_BACKOFF_SECONDS", "0.2")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("HTTP_BREAKER_FAILURES", "5")),
+            reset_seconds=float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30")),
+        ),
+        retry_methods=("GET",),
+    )
+
+
+flask_api = service_client("flask", os.getenv("FLASK_URL", "http://flask:5001"))
+evaluator = service_client("evaluator", os.getenv("FASTAPI_URL", "http://fastapi:8000"))
 
 st.title("Interview System - Streamlit Frontend")
 
@@ -25,6 +48,8 @@ action = st.sidebar.selectbox("Choose Action", [
 # Helper to display API responses safely
 # ---------------------------------------
 def show_response(resp):
+    if resp is None:
+        return
     st.write("Status:", resp.status_code)
     try:
         st.json(resp.json())
@@ -33,6 +58,35 @@ def show_response(resp):
         st.code(resp.text)
 
 
+def call(client, method, path, **kwargs):
+    """The response, or None after showing why the service could not be reached."""
+    try:
+        return client.request(method, path, **kwargs)
+    except ServiceError as e:
+        st.error(f"Request failed: {e}")
+        return None
+
+
+# ---------------------------------------
+# Follow evaluation status events (server-sent events)
+# ---------------------------------------
+def follow_events(interview_id, timeout=120):
+    """Yield the evaluator's status events for an interview until done/failed."""
+    deadline = time.monotonic() + timeout
+    # the read timeout only has to outlast the server's keepalive interval
+    with evaluator.get(f"/interviews/{interview_id}/events",
+                       stream=True, timeout=(5, 60)) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines(decode_unicode=True):
+            if line and line.startswith("data:"):
+                event = json.loads(line[len("data:"):])
+                yield event
+                if event["event"] in ("done", "failed"):
+                    return
+            if time.monotonic() > deadline:
+                return
+
+
 # ---------------------------------------
 # Create Candidate
 # ---------------------------------------
@@ -50,9 +104,9 @@ if action == "Create Candidate":
         if resume:
             files["resume"] = (resume.name, resume.getvalue())
 
-        resp = requests.post(f"{FLASK_URL}/candidates/create",
-                             data=data,
-                             files=files if files else None)
+        resp = call(flask_api, "POST", "/candidates/create",
+                    data=data,
+                    files=files if files else None)
 
         show_response(resp)
 
@@ -68,7 +122,7 @@ if action == "Create Interview":
 
     if st.button("Create Interview"):
         payload = {"candidate_id": candidate_id, "skill": skill}
-        resp = requests.post(f"{FLASK_URL}/interviews/create", json=payload)
+        resp = call(flask_api, "POST", "/interviews/create", json=payload)
         show_response(resp)
 
 
@@ -81,7 +135,7 @@ if action == "Get Questions":
     interview_id = st.text_input("Interview ID")
 
     if st.button("Get Questions"):
-        resp = requests.get(f"{FLASK_URL}/interviews/{interview_id}/questions")
+        resp = call(flask_api, "GET", f"/interviews/{interview_id}/questions")
         show_response(resp)
 
 
@@ -105,9 +159,9 @@ if action == "Submit Answer":
                 "question_id": question_id,
                 "answer_text": answer_text
             }
-            resp = requests.post(f"{FLASK_URL}/answers/create",
-                                 data=data,
-                                 files=files)
+            resp = call(flask_api, "POST", "/answers/create",
+                        data=data,
+                        files=files)
         else:
             # JSON when no file is uploaded
             payload = {
@@ -115,7 +169,7 @@ if action == "Submit Answer":
                 "question_id": question_id,
                 "answer_text": answer_text
             }
-            resp = requests.post(f"{FLASK_URL}/answers/create", json=payload)
+            resp = call(flask_api, "POST", "/answers/create", json=payload)
 
         show_response(resp)
 
@@ -129,13 +183,35 @@ if action == "Complete Interview":
     interview_id = st.text_input("Interview ID")
 
     if st.button("Complete & Evaluate"):
-        resp = requests.put(f"{FLASK_URL}/interviews/{interview_id}/complete")
+        resp = call(flask_api, "PUT", f"/interviews/{interview_id}/complete")
 
         show_response(resp)
 
-        st.info("Fetching evaluation results from FastAPI...")
-        r = requests.get(f"{FASTAPI_URL}/results/{interview_id}")
-        show_response(r)
+        accepted = resp is not None and resp.status_code == 202
+        job_id = resp.json().get("job_id") if accepted else None
+        if accepted and resp.json().get("evaluation") == "deferred":
+            st.warning("The evaluator is unavailable; the interview is completed and "
+                       "will be evaluated once it recovers.")
+        if job_id:
+            # pushed by the evaluator as they happen, no polling
+            status = st.empty()
+            status.info("Evaluation queued, waiting for the evaluator...")
+            last = {}
+            try:
+                for last in follow_events(interview_id):
+                    if last["event"] == "evaluating":
+                        status.info("Evaluating...")
+                    elif last["event"] == "answer_scored":
+                        st.write(f"Answer {last['answer_id']} (question {last['question_id']}): {last['score']}")
+            except (ServiceError, requests.RequestException) as e:
+                st.error(f"Lost the evaluator's event stream: {e}")
+
+            if last.get("event") == "done":
+                status.success(f"Done: {last['total_score']} ({last['verdict']})")
+                r = call(evaluator, "GET", f"/results/{interview_id}")
+                show_response(r)
+            elif last.get("event") == "failed":
+                status.error(f"Evaluation failed: {last.get('error')}")
 
 
 # ---------------------------------------
@@ -147,5 +223,5 @@ if action == "Get Interview Dashboard":
     interview_id = st.text_input("Interview ID")
 
     if st.button("Get Dashboard"):
-        resp = requests.get(f"{FLASK_URL}/interviews/{interview_id}")
+        resp = call(flask_api, "GET", f"/interviews/{interview_id}")
         show_response(resp)